@@ -1,51 +1,27 @@
 import streamlit as st
 import validators
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import json
 import os
-from PIL import Image
-from io import BytesIO
 import base64
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from seo_auditor.audit import calculate_seo_score, parse_html
+from seo_auditor.document import content_hash
+from seo_auditor.fetch import fetch_html
+from seo_auditor.pipeline import Stage, StageFailed, run_pipeline
+from seo_auditor.screenshots import request_preview
 
 
-def capture_website_screenshot(url):
-    """Capture a screenshot of the website using headless Chrome"""
+# Seconds to wait for the preview before giving up
+SCREENSHOT_TIMEOUT = 60
+
+def capture_website_screenshot(url, job=None):
+    """Website preview thumbnail, from the screenshot store or a pooled headless Chrome"""
     try:
-        # Set up Chrome options for headless browsing
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--window-size=1280,1024")
-        
-        # Initialize the driver
-        from selenium.webdriver.chrome.service import Service as ChromeService
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # Navigate to the URL
-        driver.get(url)
-        
-        # Give the page some time to load
-        time.sleep(3)
-        
-        # Capture screenshot
-        screenshot = driver.get_screenshot_as_png()
-        
-        # Close the driver
-        driver.quit()
-        
-        # Convert to PIL Image
-        img = Image.open(BytesIO(screenshot))
-        
-        return img
+        # Wait for the capture started with the audit, or start one now
+        if job is None:
+            html_content = fetch_html(url)
+            job = request_preview(url, content_hash(html_content or ""))
+        return job.result(timeout=SCREENSHOT_TIMEOUT)
     except Exception as e:
         st.error(f"Failed to capture screenshot: {str(e)}")
         return None
@@ -401,60 +377,6 @@ if 'url' not in st.session_state:
 def is_valid_url(url):
     return validators.url(url)
 
-def fetch_html(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        response = requests.get(url, headers=headers, timeout=5)
-        return response.text if response.status_code == 200 else None
-    except requests.RequestException:
-        return None
-
-def parse_html(html, url):
-    soup = BeautifulSoup(html, "html.parser")
-
-    title = soup.title.text.strip() if soup.title else "No Title Found"
-    meta_desc = soup.find("meta", attrs={"name": "description"})
-    description = meta_desc["content"].strip() if meta_desc else "No Description Found"
-
-    # Get meta keywords
-    meta_keywords = soup.find("meta", attrs={"name": "keywords"})
-    keywords = meta_keywords["content"].strip() if meta_keywords else "No Keywords Found"
-
-    headers = [(f"H{i}", tag.text.strip()) for i in range(1, 7) for tag in soup.find_all(f"h{i}")]
-    page_text = ' '.join([p.get_text(strip=True) for p in soup.find_all(["p", "div", "span"])])
-
-    # Simple readability calculation (words/sentences ratio)
-    sentences = len([s for s in page_text.split('.') if s.strip()]) or 1
-    word_count = len(page_text.split()) if page_text else 0
-    readability_score = min(100, max(0, 206.835 - 1.015 * (word_count / sentences) - 84.6 * (sum(1 for word in page_text.split() if len(word) > 6) / word_count if word_count else 0)))
-
-    paragraph_count = len(soup.find_all("p"))
-    link_count = len(soup.find_all("a"))
-    images = []
-    for img in soup.find_all("img"):
-        src = img.get("src", "")
-        alt = img.get("alt", "No Alt Text")
-        if src:
-            images.append((src, alt))
-
-    # Check for SSL
-    has_ssl = url.startswith("https://")
-
-    return {
-        "title": title,
-        "title_length": len(title),
-        "meta_description": description,
-        "meta_description_length": len(description),
-        "keywords": keywords,
-        "header_structure": headers,
-        "word_count": word_count,
-        "readability_score": readability_score,
-        "paragraph_count": paragraph_count,
-        "link_count": link_count,
-        "image_count": len(images),
-        "images": images,
-        "has_ssl": has_ssl
-    }
     # In the Results Display Section, after you've shown the top metrics, add:
 if st.session_state.audit_complete and st.session_state.audit_data:
     data = st.session_state.audit_data
@@ -476,7 +398,7 @@ if st.session_state.audit_complete and st.session_state.audit_data:
         # Display the website screenshot if available
         if "screenshot" not in st.session_state:
             with st.spinner("Generating website preview..."):
-                screenshot = capture_website_screenshot(st.session_state.url)
+                screenshot = capture_website_screenshot(st.session_state.url, st.session_state.pop("screenshot_job", None))
                 if screenshot:
                     st.session_state.screenshot = screenshot
         
@@ -487,67 +409,6 @@ if st.session_state.audit_complete and st.session_state.audit_data:
         
         st.markdown("</div>", unsafe_allow_html=True)
 
-def calculate_seo_score(data):
-    score = 0
-    max_score = 100
-    
-    # Title score (20%)
-    if data["title_length"] > 0:
-        if 40 <= data["title_length"] <= 60:
-            score += 20
-        elif 30 <= data["title_length"] < 40 or 60 < data["title_length"] <= 70:
-            score += 15
-        else:
-            score += 10
-    
-    # Meta description score (15%)
-    if data["meta_description_length"] > 0:
-        if 140 <= data["meta_description_length"] <= 160:
-            score += 15
-        elif 120 <= data["meta_description_length"] < 140 or 160 < data["meta_description_length"] <= 180:
-            score += 10
-        else:
-            score += 5
-    
-    # Content length score (20%)
-    if data["word_count"] >= 1000:
-        score += 20
-    elif data["word_count"] >= 500:
-        score += 15
-    elif data["word_count"] >= 300:
-        score += 10
-    else:
-        score += 5
-    
-    # Header structure score (15%)
-    header_types = set(h_type for h_type, _ in data["header_structure"])
-    if "H1" in header_types and len(header_types) >= 3:
-        score += 15
-    elif "H1" in header_types:
-        score += 10
-    elif header_types:
-        score += 5
-    
-    # Image optimization score (15%)
-    if data["image_count"] > 0:
-        images_with_alt = sum(1 for _, alt in data["images"] if alt and alt != "No Alt Text")
-        alt_score = (images_with_alt / data["image_count"]) * 15 if data["image_count"] > 0 else 0
-        score += alt_score
-    
-    # SSL score (5%)
-    if data["has_ssl"]:
-        score += 5
-    
-    # Readability score (10%)
-    if data["readability_score"] >= 60:
-        score += 10
-    elif data["readability_score"] >= 40:
-        score += 7
-    else:
-        score += 3
-    
-    return int(min(score, max_score))
-
 def get_score_color(score):
     if score >= 80:
         return "status-good"
@@ -596,45 +457,45 @@ if audit and url:
     if not is_valid_url(url):
         st.error("❌ Please enter a valid URL including http:// or https://")
     else:
-        # Progress bar animation
+        st.session_state.pop("screenshot", None)
+        
+        # Progress bar driven by the audit stages as they actually complete
         st.markdown("<div class='progress-container'>", unsafe_allow_html=True)
         progress_bar = st.progress(0)
         status_text = st.empty()
         
-        for i in range(101):
-            # Update progress bar
-            progress_bar.progress(i)
-            
-            # Update status text based on progress
-            if i < 20:
-                status_text.text("🔍 Fetching website content...")
-            elif i < 40:
-                status_text.text("📊 Analyzing SEO metrics...")
-            elif i < 60:
-                status_text.text("📝 Checking content readability...")
-            elif i < 80:
-                status_text.text("🖼️ Processing images...")
-            elif i < 100:
-                status_text.text("🚀 Generating recommendations...")
-            else:
-                status_text.text("✅ Audit complete!")
-            
-            # Wait for 0.02 seconds
-            time.sleep(0.02)
+        def show_progress(event):
+            progress_bar.progress(event.fraction)
+            status_text.text(event.label)
         
-        st.markdown("</div>", unsafe_allow_html=True)
+        # The preview starts (or is reused for unchanged content) while the page is analysed
+        stages = [
+            Stage("fetch", "🔍 Fetching website content...", lambda results, report: fetch_html(url), weight=3),
+            Stage("preview", "💻 Preparing website preview...",
+                  lambda results, report: request_preview(url, content_hash(results["fetch"])) if results["fetch"] else None,
+                  requires=["fetch"]),
+            Stage("parse", "📊 Analyzing SEO metrics...",
+                  lambda results, report: parse_html(results["fetch"], url) if results["fetch"] else None,
+                  requires=["fetch"], weight=2),
+            Stage("score", "🚀 Calculating SEO score...",
+                  lambda results, report: calculate_seo_score(results["parse"]) if results["parse"] else None,
+                  requires=["parse"]),
+        ]
+        try:
+            results = run_pipeline(stages, progress=show_progress)
+        except StageFailed as e:
+            results = None
+            st.error(f"❌ Audit failed at the {e.stage} stage: {e.error}")
         
-        # Fetch and analyze website
-        html_content = fetch_html(url)
+        st.markdown("</div>", unsafe_allow_html=True)
         
-        if not html_content:
+        if results and not results["fetch"]:
             st.error("❌ Failed to fetch website content. Please check the URL and try again.")
-        else:
-            # Parse HTML and analyze
-            data = parse_html(html_content, url)
+        elif results:
+            st.session_state.screenshot_job = results["preview"]
             
-            # Calculate overall SEO score
-            data["seo_score"] = calculate_seo_score(data)
+            data = results["parse"]
+            data["seo_score"] = results["score"]
             
             # Save data to session state
             save_data_to_session(data)
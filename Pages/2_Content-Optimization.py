@@ -1,17 +1,16 @@
 import streamlit as st
 import validators
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import textstat  # Free readability scoring library
 import plotly.express as px
-from PIL import Image
-from io import BytesIO
 import re
-import urllib.parse  # For handling relative URLs
 from streamlit_lottie import st_lottie
 import json
 from urllib.parse import urlparse
+from seo_auditor.document import get_document
+from seo_auditor.fetch import fetch_html
+from seo_auditor.images import ImageAnalysis
+from seo_auditor.pipeline import Stage, StageFailed, run_pipeline
 
 # --- UI Styling ---
 st.set_page_config(page_title="SEO Audit Tool", layout="wide", initial_sidebar_state="collapsed")
@@ -154,70 +153,42 @@ st.markdown("""
 def is_valid_url(url):
     return validators.url(url)
 
-def fetch_html(url):
-    headers = {"User-Agent": "Mozilla/5.0"}
-    try:
-        response = requests.get(url, headers=headers, timeout=5)
-        return response.text if response.status_code == 200 else None
-    except requests.RequestException:
-        return None
-
 def parse_html(html, url):
-    soup = BeautifulSoup(html, "html.parser")
+    doc = get_document(html, url)
 
-    title = soup.title.text.strip() if soup.title else "No Title Found"
-    meta_desc = soup.find("meta", attrs={"name": "description"})
-    description = meta_desc["content"].strip() if meta_desc else "No Description Found"
+    title = doc.title if doc.title is not None else "No Title Found"
+    description = doc.meta.get("description", "No Description Found")
 
     # Get meta keywords
-    meta_keywords = soup.find("meta", attrs={"name": "keywords"})
-    keywords = meta_keywords["content"].strip() if meta_keywords else "No Keywords Found"
+    keywords = doc.meta.get("keywords", "No Keywords Found")
 
-    headers = [(f"H{i}", tag.text.strip()) for i in range(1, 7) for tag in soup.find_all(f"h{i}")]
-    page_text = ' '.join([p.get_text(strip=True) for p in soup.find_all(["p", "div", "span"])])
+    headers = doc.headings
+    text_stats = doc.text_stats
+    # textstat scores whole strings, so this page (alone) keeps the joined text for its readability panel
+    page_text = doc.text
 
     readability_score = textstat.flesch_reading_ease(page_text) if page_text else None
-    word_count = len(page_text.split()) if page_text else 0
-    paragraph_count = len(soup.find_all("p"))
-    link_count = len(soup.find_all("a"))
-    
-    # Extract sentences for readability analysis
-    sentences = re.split(r'(?<=[.!?]) +', page_text) if page_text else []
-    
-    # Extract common words for keyword analysis
-    words = page_text.lower().split() if page_text else []
-    word_freq = {}
-    stop_words = {'the', 'and', 'to', 'of', 'a', 'in', 'that', 'is', 'it', 'for', 'with', 'as', 'on', 'was', 'are', 'by', 'this', 'from', 'be'}
-    for word in words:
-        if word not in stop_words and len(word) > 3:
-            if word in word_freq:
-                word_freq[word] += 1
-            else:
-                word_freq[word] = 1
-    common_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:20]
+    word_count = text_stats.word_count
+    paragraph_count = doc.paragraph_count
+    link_count = len(doc.links)
+    
+    # Sentences counted while streaming the text, instead of splitting it into a list
+    sentence_count = text_stats.sentence_count
+    
+    # Common words for keyword analysis (counted while streaming the text)
+    common_words = text_stats.common_words(20)
+
+    images = doc.images  # src already resolved to absolute URLs
 
-    image_tags = soup.find_all("img")
-    images = []
-    for img in image_tags:
-        src = img.get("src")
-        alt = img.get("alt", "No Alt Text")
-        if src:
-            src = urllib.parse.urljoin(url, src)  # Convert relative URLs to absolute
-            images.append((src, alt))
+    return title, description, keywords, headers, readability_score, word_count, paragraph_count, images, link_count, page_text, sentence_count, common_words
 
-    return title, description, keywords, headers, readability_score, word_count, paragraph_count, images, link_count, page_text, sentences, common_words
+# Image sizes and dimensions, probed once per audit and shared by every section below
+image_analysis = ImageAnalysis()
 
 def check_image_compression(image_url):
-    try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(image_url, stream=True, timeout=5, headers=headers)
-        if response.status_code == 200:
-            img = Image.open(BytesIO(response.content))
-            size_kb = len(response.content) / 1024
-            dimensions = img.size  # (width, height)
-            return size_kb, dimensions
-    except Exception:
-        return None, None
+    # Reads the size and image header from a ranged GET instead of downloading the image
+    probe = image_analysis.get(image_url)
+    return probe.size_kb, probe.dimensions
 
 def highlight_complex_sentences(text, threshold=50):
     sentences = re.split(r'(?<=[.!?]) +', text)
@@ -357,47 +328,58 @@ with col2:
     st.markdown("-----")
     st.markdown("<div style='margin-top: 40px;'></div>", unsafe_allow_html=True)
 
-# --- Progress Bar Animation ---
+# --- URL Validation ---
 if audit and url:
     if not is_valid_url(url):
         st.error("❌ Please enter a valid URL including http:// or https://")
-    else:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        for i in range(101):
-            # Update progress bar
-            progress_bar.progress(i)
-            
-            # Update status text based on progress
-            if i < 20:
-                status_text.text("🔍 Fetching website content...")
-            elif i < 40:
-                status_text.text("📊 Analyzing SEO metrics...")
-            elif i < 60:
-                status_text.text("📝 Checking content readability...")
-            elif i < 80:
-                status_text.text("🖼️ Processing images...")
-            elif i < 100:
-                status_text.text("🚀 Generating recommendations...")
-            else:
-                status_text.text("✅ Audit complete!")
-            
-            # Wait for 0.05 seconds
-            import time
-            time.sleep(0.05)
-        
-        # Clear progress bar and status text after completion
-        progress_bar.empty()
-        status_text.empty()
+
+def run_content_audit(url):
+    """Fetch, parse, then score readability and probe images concurrently, with a live progress bar"""
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    def show_progress(event):
+        progress_bar.progress(event.fraction)
+        status_text.text(event.label)
+    
+    def analyze_document(results, report):
+        if not results["fetch"]:
+            return None
+        doc = get_document(results["fetch"], url)
+        doc.text_stats  # one walk over the tree, before the stages below share it
+        return doc
+    
+    def probe_images(results, report):
+        if results["document"] is None:
+            return None
+        return image_analysis.run((img_url for img_url, _ in results["document"].images), progress=report)
+    
+    stages = [
+        Stage("fetch", "🔍 Fetching website content...", lambda results, report: fetch_html(url), weight=2),
+        Stage("document", "📊 Analyzing SEO metrics...", analyze_document, requires=["fetch"]),
+        Stage("content", "📝 Checking content readability...",
+              lambda results, report: parse_html(results["fetch"], url) if results["fetch"] else None,
+              requires=["document"]),
+        Stage("images", "🖼️ Processing images...", probe_images, requires=["document"], weight=3),
+    ]
+    try:
+        results = run_pipeline(stages, progress=show_progress)
+    except StageFailed as e:
+        results = {"fetch": None, "content": None}
+        st.error(f"❌ Audit failed at the {e.stage} stage: {e.error}")
+    
+    # Clear progress bar and status text after completion
+    progress_bar.empty()
+    status_text.empty()
+    return results["fetch"], results["content"]
 
 # 🚀 **Audit Trigger**
 if audit:
     if url and is_valid_url(url):
+        html_content, content = run_content_audit(url)
         with st.spinner("Analyzing your website..."):
-            html_content = fetch_html(url)
-
             if html_content:
-                title, description, keywords, headers, readability_score, word_count, paragraph_count, images, link_count, page_text, sentences, common_words = parse_html(html_content, url)
+                title, description, keywords, headers, readability_score, word_count, paragraph_count, images, link_count, page_text, sentence_count, common_words = content
                 
                 # --- Key Metrics ---
                 st.markdown("<h3 style='color:#FF4B4B; margin-top:20px;'>📌 Key Metrics at a Glance</h3>", unsafe_allow_html=True)
@@ -769,30 +751,8 @@ if 'images' in locals() and images:
 # Extract videos
 videos = []
 if 'html_content' in locals() and html_content:
-    soup = BeautifulSoup(html_content, "html.parser")
-    # Find iframe embeds (YouTube, Vimeo, etc.)
-    iframe_videos = soup.find_all("iframe")
-    for video in iframe_videos:
-        src = video.get("src", "")
-        if any(domain in src for domain in ["youtube", "vimeo", "wistia", "dailymotion"]):
-            title = video.get("title", "No Title")
-            width = video.get("width", "Unknown")
-            height = video.get("height", "Unknown")
-            videos.append((src, title, f"{width}x{height}" if width != "Unknown" else "Unknown"))
-    
-    # Find HTML5 video tags
-    html5_videos = soup.find_all("video")
-    for video in html5_videos:
-        src = video.get("src", "")
-        if not src:
-            source = video.find("source")
-            if source:
-                src = source.get("src", "")
-        
-        width = video.get("width", "Unknown")
-        height = video.get("height", "Unknown")
-        title = video.get("title", "No Title")
-        videos.append((src, title, f"{width}x{height}" if width != "Unknown" else "Unknown"))
+    # Iframe embeds (YouTube, Vimeo, etc.) and HTML5 video tags from the shared parse
+    videos = get_document(html_content, url).videos
 
 if videos:
     st.markdown(f"<p>Found {len(videos)} video(s) on this page.</p>", unsafe_allow_html=True)
@@ -824,7 +784,7 @@ if 'images' in locals() and images:
         )
     
     # Check for large images
-    large_images = sum(1 for img_url, _ in images if check_image_compression(img_url)[0] and check_image_compression(img_url)[0] > 100)
+    large_images = sum(1 for img_url, _ in images if (check_image_compression(img_url)[0] or 0) > 100)
     if large_images > 0:
         recommendations.append(
             create_recommendation_card(
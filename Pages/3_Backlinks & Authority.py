@@ -1,13 +1,13 @@
 import streamlit as st
 import validators
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import urllib.parse
-import concurrent.futures
 import time
 import base64
 import json
+from seo_auditor.document import get_document
+from seo_auditor.fetch import fetch_html
+from seo_auditor.links import check_links_sync, dedupe_links
 
 st.set_page_config(page_title="Backlinks & Authority", layout="wide")
 
@@ -222,87 +222,21 @@ with col2:
 def is_valid_url(url):
     return validators.url(url)
 
-def fetch_html(url):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1",
-        "Cache-Control": "max-age=0"
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10, allow_redirects=True)
-        return response.text if response.status_code == 200 else None
-    except requests.RequestException:
-        return None
-
-# Check link status with proper handling
-def check_link_status(href):
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    try:
-        response = requests.head(href, headers=headers, timeout=5, allow_redirects=True)
-        status_code = response.status_code
-        final_url = response.url if response.url != href else "-"
-        
-        if status_code == 200:
-            status = "✅ Active"
-            status_class = "active-status"
-        elif 300 <= status_code < 400:
-            status = "🔄 Redirected"
-            status_class = "redirect-status"
-        else:
-            status = "⚠️ Broken"
-            status_class = "broken-status"
-            
-        # If head request doesn't work, try a GET request
-        if status_code in [403, 405]:
-            try:
-                get_response = requests.get(href, headers=headers, timeout=5, allow_redirects=True)
-                status_code = get_response.status_code
-                final_url = get_response.url if get_response.url != href else "-"
-                
-                if status_code == 200:
-                    status = "✅ Active"
-                    status_class = "active-status"
-                elif 300 <= status_code < 400:
-                    status = "🔄 Redirected"
-                    status_class = "redirect-status"
-            except:
-                pass
-            
-    except requests.RequestException:
-        status = "❌ Broken"
-        status_class = "broken-status"
-        final_url = "-"
-        status_code = "N/A"
-        
-    return {
-        "status": status,
-        "status_class": status_class,
-        "final_url": final_url,
-        "status_code": status_code
-    }
-
 # 🔗 Extract Backlinks & Status with concurrent processing
 def extract_backlinks(html, base_url):
-    soup = BeautifulSoup(html, "html.parser")
     all_links = []
     
     # Get all links first
     links_data = []
-    for link in soup.find_all("a", href=True):
-        href = link.get("href", "").strip()
+    for link in get_document(html, base_url).links:
+        href = (link["href"] or "").strip()
         if not href or href.startswith("#") or href.startswith("javascript:"):
             continue
             
         try:
             href = urllib.parse.urljoin(base_url, href)
-            anchor_text = link.get_text(strip=True) or "No Anchor Text"
-            rel_attr = link.get("rel", [])
-            is_dofollow = "nofollow" not in rel_attr
+            anchor_text = link["text"] or "No Anchor Text"
+            is_dofollow = "nofollow" not in link["rel"]
             
             if is_dofollow:
                 link_type = "Do-Follow"
@@ -326,38 +260,31 @@ def extract_backlinks(html, base_url):
     progress_bar = st.progress(0)
     status_placeholder.text("Checking link statuses...")
     
-    # Process link statuses in parallel
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        # Submit all tasks
-        future_to_link = {executor.submit(check_link_status, link["href"]): link for link in links_data}
-        
-        total = len(future_to_link)
-        completed = 0
-        
-        # Process results as they complete
-        for future in concurrent.futures.as_completed(future_to_link):
-            link_data = future_to_link[future]
-            try:
-                status_data = future.result()
-                
-                all_links.append({
-                    "anchor_text": link_data['anchor_text'],
-                    "url": link_data['href'],
-                    "type": link_data['link_type'],
-                    "status": status_data['status'],
-                    "status_class": status_data['status_class'],
-                    "final_url": status_data['final_url'],
-                    "status_code": status_data['status_code']
-                })
-                
-            except Exception as e:
-                # Handle any exceptions in the future
-                pass
-                
-            # Update progress
-            completed += 1
-            progress_bar.progress(completed / total)
-            status_placeholder.text(f"Checking link statuses... ({completed}/{total})")
+    hrefs = [link["href"] for link in links_data]
+    targets = len(dedupe_links(hrefs)[0])
+
+    async def show_progress(completed, total):
+        progress_bar.progress(completed / total)
+        # Targets with a recent cached result aren't part of ``total``
+        reused = targets - total
+        note = f", {reused} recent results reused" if reused > 0 else ""
+        status_placeholder.text(f"Checking link statuses... ({completed}/{total} URLs to check{note})")
+    
+    # Check link statuses concurrently, limited per host
+    statuses = check_links_sync(hrefs, progress=show_progress)
+    
+    for link_data, status_data in zip(links_data, statuses):
+        all_links.append({
+            "anchor_text": link_data['anchor_text'],
+            "url": status_data['href'],
+            "checked_url": status_data['checked_url'],
+            "type": link_data['link_type'],
+            "status": status_data['status'],
+            "status_class": status_data['status_class'],
+            "final_url": status_data['final_url'],
+            "status_code": status_data['status_code'],
+            "from_cache": status_data['from_cache']
+        })
             
     # Clear progress indicators
     progress_bar.empty()
@@ -423,6 +350,9 @@ if audit:
                 # Calculate analysis time
                 analysis_time = round(time.time() - start_time, 2)
                 st.success(f"✅ Analysis completed in {analysis_time} seconds")
+                cached_count = sum(1 for link in all_links if link["from_cache"])
+                if cached_count:
+                    st.info(f"♻️ {cached_count} of {len(all_links)} link statuses came from the cache of recent checks")
                 
                 # Create DataFrame
                 df = pd.DataFrame(all_links)
@@ -536,20 +466,26 @@ if audit:
                 with st.expander("🔄 **Redirected Links**"):
                     if not df_redirected.empty:
                         # Create a copy for display
-                        df_redirected_display = df_redirected[["anchor_text", "url", "final_url"]].copy()
+                        df_redirected_display = df_redirected[["anchor_text", "url", "checked_url", "final_url"]].copy()
                         
                         # Convert URLs to clickable links with improved styling
                         df_redirected_display["url_formatted"] = df_redirected_display["url"].apply(
                             lambda x: f'<a href="{x}" target="_blank">{x}</a>'
                         )
                         
+                        # Links grouped with an equivalent URL show which form was requested
+                        df_redirected_display["checked_formatted"] = [
+                            checked if checked != url.split("#", 1)[0] else "-"
+                            for url, checked in zip(df_redirected_display["url"], df_redirected_display["checked_url"])
+                        ]
+
                         df_redirected_display["final_url_formatted"] = df_redirected_display["final_url"].apply(
                             lambda x: f'<a href="{x}" target="_blank">{x}</a>' if x != "-" else "-"
                         )
                         
                         # Final dataframe for display
-                        display_df = df_redirected_display[["anchor_text", "url_formatted", "final_url_formatted"]]
-                        display_df.columns = ["Anchor", "URL", "Redirects To"]
+                        display_df = df_redirected_display[["anchor_text", "url_formatted", "checked_formatted", "final_url_formatted"]]
+                        display_df.columns = ["Anchor", "URL", "Checked As", "Redirects To"]
                         
                         st.write(display_df.to_html(escape=False, index=False), unsafe_allow_html=True)
                     else:
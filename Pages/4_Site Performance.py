@@ -2,26 +2,19 @@ from django.urls import get_urlconf
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import requests
 import numpy as np
 from dotenv import load_dotenv
-import os
+from seo_auditor.pagespeed import PageSpeedError, run_pagespeed
 
 load_dotenv()
-API_KEY = os.getenv("Google_ApI_key")
 
 # Function to fetch PageSpeed Insights Data
 def fetch_pagespeed_data(url):
-   
-    API_URL = f"https://www.googleapis.com/pagespeedonline/v5/runPagespeed?url={url}&key={API_KEY}"
     
     try:
-        response = requests.get(API_URL).json()
+        # Cached and shared with other sessions; desktop is what this page has always measured
+        response = run_pagespeed(url, strategy="desktop")
         
-        # Check if 'lighthouseResult' exists in response
-        if 'lighthouseResult' not in response:
-            return {"Error": "Invalid response from PageSpeed API. Please check your API key or URL."}
-
         audits = response['lighthouseResult'].get('audits', {})
         
         # Extract performance score
@@ -39,6 +32,8 @@ def fetch_pagespeed_data(url):
             "Image Optimization": round(audits.get('uses-optimized-images', {}).get('numericValue', 0), 2),
             "Server Response Time": round(audits.get('server-response-time', {}).get('numericValue', 0) / 1000, 2),
         }
+    except PageSpeedError as e:
+        return {"Error": str(e)}
     except Exception as e:
         return {"Error": f"An error occurred: {str(e)}"}
 
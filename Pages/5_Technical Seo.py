@@ -1,14 +1,17 @@
 import streamlit as st
-import requests
+import os
 import json
 import pandas as pd
 import plotly.express as px
 import re
-from bs4 import BeautifulSoup
 import html as html_module
 import ssl
 import socket
 from urllib.parse import urlparse
+from seo_auditor import fetch
+from seo_auditor.document import get_document
+from seo_auditor.fetch import fetch_html
+from seo_auditor.pagespeed import PageSpeedError, run_pagespeed
 
 # Google PageSpeed API Key
 API_KEY = os.getenv("Google_ApI_key")
@@ -111,11 +114,12 @@ with col2:
 
 # --- Functions ---
 def fetch_pagespeed_data(url):
-    """Fetch PageSpeed Insights data for a given URL."""
-    API_ENDPOINT = f"https://www.googleapis.com/pagespeedonline/v5/runPagespeed?url={url}&key={API_KEY}&strategy=mobile"
+    """Fetch PageSpeed Insights data for a given URL (cached and shared with other sessions)."""
     try:
-        response = requests.get(API_ENDPOINT)
-        return response.json()
+        return run_pagespeed(url, strategy="mobile")
+    except PageSpeedError as e:
+        st.error(e)
+        return {}
     except Exception as e:
         st.error(f"Error fetching PageSpeed data: {e}")
         return {}
@@ -196,7 +200,7 @@ def check_ssl(url):
 def check_security_headers(url):
     """Check important security headers."""
     try:
-        response = requests.get(url)
+        response = fetch.get(url)
         headers = response.headers
         
         security_headers = {
@@ -220,7 +224,7 @@ def check_mobile_friendliness(url):
     }
     
     try:
-        response = requests.post(api_url, json=payload)
+        response = fetch.post(api_url, json=payload)
         data = response.json()
         
         return {
@@ -230,24 +234,19 @@ def check_mobile_friendliness(url):
     except Exception as e:
         return {"Error": str(e)}
 
-def fetch_html(url):
+def fetch_page_html(url):
     """Fetch HTML content from URL."""
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
-        return response.text
-    except Exception as e:
-        st.error(f"Error fetching HTML: {e}")
+    html = fetch_html(url)
+    if html is None:
+        st.error("Error fetching HTML: the page could not be retrieved")
         return ""
+    return html
 
-def check_canonical(html):
+def check_canonical(html, url):
     """Extract canonical URL from HTML."""
-    soup = BeautifulSoup(html, 'html.parser')
-    canonical = soup.find("link", rel="canonical")
-    if canonical and canonical.get("href"):
-        return canonical.get("href")
+    canonical = get_document(html, url).canonical
+    if canonical:
+        return canonical
     return "No canonical tag found"
 
 def find_duplicate_content(url, html):
@@ -271,7 +270,7 @@ if st.button("🚀 Analyze Technical SEO"):
         
         # Fetch HTML once for multiple analyses
         with st.spinner("Fetching website content..."):
-            html_content = fetch_html(url)
+            html_content = fetch_page_html(url)
         
         # Page Speed Tab
         with tabs[0]:
@@ -390,7 +389,7 @@ if st.button("🚀 Analyze Technical SEO"):
                 
                 with col1:
                     st.markdown("### Canonical URL")
-                    canonical_url = check_canonical(html_content)
+                    canonical_url = check_canonical(html_content, url)
                     st.code(canonical_url)
                 
                 with col2:
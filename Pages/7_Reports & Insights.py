@@ -5,11 +5,11 @@ import pandas as pd
 from datetime import datetime
 import base64
 import io
-import requests
 from urllib.parse import urlparse, urljoin
 import re
-import xml.etree.ElementTree as ET
-from urllib.robotparser import RobotFileParser
+from seo_auditor import fetch
+from seo_auditor.site_cache import get_robots, get_sitemaps
+from seo_auditor.sitemaps import analyze_sitemap
 
 # --- Streamlit Page Config ---
 st.set_page_config(page_title="SEO Reports & Insights", layout="wide", initial_sidebar_state="collapsed")
@@ -99,326 +99,10 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- Helper Functions for Robots.txt Analysis ---
-def fetch_robots_txt(url):
-    """Fetch robots.txt content from a website with enhanced error handling."""
-    try:
-        # Parse the base URL to get the domain
-        parsed_url = urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-        robots_url = f"{base_url}/robots.txt"
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        
-        response = requests.get(robots_url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            return {"status": "success", "content": response.text, "url": robots_url, "http_status": response.status_code}
-        elif response.status_code == 404:
-            return {"status": "error", "message": "Robots.txt file not found (404)", "url": robots_url, "http_status": response.status_code}
-        else:
-            return {"status": "error", "message": f"Failed to fetch robots.txt: HTTP {response.status_code}", "url": robots_url, "http_status": response.status_code}
-    except requests.exceptions.ConnectionError:
-        return {"status": "error", "message": "Connection error - unable to connect to server", "url": robots_url if 'robots_url' in locals() else "unknown"}
-    except requests.exceptions.Timeout:
-        return {"status": "error", "message": "Request timed out when fetching robots.txt", "url": robots_url if 'robots_url' in locals() else "unknown"}
-    except requests.exceptions.TooManyRedirects:
-        return {"status": "error", "message": "Too many redirects when fetching robots.txt", "url": robots_url if 'robots_url' in locals() else "unknown"}
-    except Exception as e:
-        return {"status": "error", "message": f"Error fetching robots.txt: {str(e)}", "url": robots_url if 'robots_url' in locals() else "unknown"}
-
-def analyze_robots_txt(robots_content):
-    """Perform detailed analysis of robots.txt content."""
-    if not robots_content or robots_content.get("status") != "success":
-        return {
-            "sitemaps": [],
-            "user_agents": [],
-            "disallow_count": 0,
-            "allow_count": 0,
-            "crawl_delay": None,
-            "has_wildcard_agent": False,
-            "has_sitemap": False,
-            "issues": []
-        }
-    
-    content = robots_content["content"]
-    
-    # Parse using RobotFileParser
-    parser = RobotFileParser()
-    parser.parse(content.splitlines())
-    
-    # Extract sitemaps
-    sitemaps = []
-    for line in content.splitlines():
-        line = line.strip()
-        if line.lower().startswith("sitemap:"):
-            sitemap_url = line.replace("sitemap:", "", 1).strip()
-            sitemaps.append(sitemap_url)
-    
-    # Extract user agents
-    user_agents = set()
-    has_wildcard_agent = False
-    for line in content.splitlines():
-        line = line.strip().lower()
-        if line.startswith("user-agent:"):
-            agent = line.replace("user-agent:", "", 1).strip()
-            user_agents.add(agent)
-            if agent == "*":
-                has_wildcard_agent = True
-    
-    # Count directives
-    allow_count = sum(1 for line in content.splitlines() if line.strip().lower().startswith("allow:"))
-    disallow_count = sum(1 for line in content.splitlines() if line.strip().lower().startswith("disallow:"))
-    
-    # Check for crawl delay
-    crawl_delay = None
-    for line in content.splitlines():
-        line = line.strip().lower()
-        if line.startswith("crawl-delay:"):
-            try:
-                crawl_delay = float(line.replace("crawl-delay:", "", 1).strip())
-            except ValueError:
-                pass
-    
-    # Identify issues
-    issues = []
-    
-    if not has_wildcard_agent:
-        issues.append({
-            "type": "warning",
-            "message": "No wildcard user-agent (*) found. Some crawlers might not have specific instructions."
-        })
-    
-    if disallow_count == 0:
-        issues.append({
-            "type": "warning",
-            "message": "No Disallow directives found. This may allow crawlers to access all areas of your site."
-        })
-    
-    if not sitemaps:
-        issues.append({
-            "type": "opportunity",
-            "message": "No Sitemap directives found in robots.txt. Adding sitemap URL helps search engines discover your content."
-        })
-    
-    if crawl_delay and crawl_delay > 1:
-        issues.append({
-            "type": "warning",
-            "message": f"Crawl-delay of {crawl_delay} seconds might be too high and could slow down indexing."
-        })
-    
-    empty_lines = sum(1 for line in content.splitlines() if not line.strip())
-    if empty_lines > len(content.splitlines()) / 2:
-        issues.append({
-            "type": "opportunity",
-            "message": "Robots.txt contains many empty lines. Consider cleaning it up for better readability."
-        })
-    
-    # Check for potentially problematic patterns
-    if "disallow: /" in content.lower():
-        issues.append({
-            "type": "critical",
-            "message": "Found 'Disallow: /' which blocks all crawlers from the entire site. This may prevent indexing."
-        })
-    
-    return {
-        "sitemaps": sitemaps,
-        "user_agents": list(user_agents),
-        "disallow_count": disallow_count,
-        "allow_count": allow_count,
-        "crawl_delay": crawl_delay,
-        "has_wildcard_agent": has_wildcard_agent,
-        "has_sitemap": len(sitemaps) > 0,
-        "issues": issues
-    }
-
-# --- Helper Functions for Sitemap Analysis ---
-def fetch_sitemap(url):
-    """Fetch sitemap.xml with improved error handling."""
-    try:
-        # If the URL is not a direct sitemap URL, try to construct it
-        if not url.lower().endswith(('.xml', '.gz')):
-            parsed_url = urlparse(url)
-            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-            sitemap_url = f"{base_url}/sitemap.xml"
-        else:
-            sitemap_url = url
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        
-        response = requests.get(sitemap_url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            # Check if it's a valid XML
-            try:
-                # Just validate XML without parsing fully yet
-                ET.fromstring(response.content)
-                return {"status": "success", "content": response.text, "url": sitemap_url, "http_status": response.status_code}
-            except ET.ParseError:
-                return {"status": "error", "message": "Invalid XML format in sitemap", "url": sitemap_url, "http_status": response.status_code}
-        elif response.status_code == 404:
-            return {"status": "error", "message": "Sitemap file not found (404)", "url": sitemap_url, "http_status": response.status_code}
-        else:
-            return {"status": "error", "message": f"Failed to fetch sitemap: HTTP {response.status_code}", "url": sitemap_url, "http_status": response.status_code}
-    except requests.exceptions.ConnectionError:
-        return {"status": "error", "message": "Connection error - unable to connect to server", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
-    except requests.exceptions.Timeout:
-        return {"status": "error", "message": "Request timed out when fetching sitemap", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
-    except requests.exceptions.TooManyRedirects:
-        return {"status": "error", "message": "Too many redirects when fetching sitemap", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
-    except Exception as e:
-        return {"status": "error", "message": f"Error fetching sitemap: {str(e)}", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
-
-def analyze_sitemap(sitemap_content, base_url):
-    """Perform detailed analysis of sitemap.xml content."""
-    if not sitemap_content or sitemap_content.get("status") != "success":
-        return {
-            "url_count": 0,
-            "has_lastmod": False,
-            "has_priority": False,
-            "has_changefreq": False,
-            "is_index": False,
-            "nested_sitemaps": [],
-            "issues": []
-        }
-    
-    content = sitemap_content["content"]
-    
-    # Parse XML
-    try:
-        root = ET.fromstring(content)
-        
-        # Determine namespace if present
-        ns = {}
-        if root.tag.startswith('{'):
-            ns_url = root.tag.split('}')[0].strip('{')
-            ns = {'sm': ns_url}
-            
-        # Count URLs
-        url_elements = root.findall('.//sm:url', ns) if ns else root.findall('.//url')
-        url_count = len(url_elements)
-        
-        # Check for sitemap index
-        sitemap_elements = root.findall('.//sm:sitemap', ns) if ns else root.findall('.//sitemap')
-        is_index = len(sitemap_elements) > 0
-        
-        # Extract nested sitemaps from sitemap index
-        nested_sitemaps = []
-        if is_index:
-            for sitemap in sitemap_elements:
-                loc = sitemap.find('sm:loc', ns) if ns else sitemap.find('loc')
-                if loc is not None and loc.text:
-                    nested_sitemaps.append(loc.text)
-        
-        # Check for recommended elements
-        has_lastmod = False
-        has_priority = False
-        has_changefreq = False
-        
-        for url in url_elements[:10]:  # Check first 10 URLs to determine pattern
-            if url.find('sm:lastmod', ns) is not None or url.find('lastmod') is not None:
-                has_lastmod = True
-            if url.find('sm:priority', ns) is not None or url.find('priority') is not None:
-                has_priority = True
-            if url.find('sm:changefreq', ns) is not None or url.find('changefreq') is not None:
-                has_changefreq = True
-        
-        # Identify issues
-        issues = []
-        
-        if url_count == 0 and not is_index:
-            issues.append({
-                "type": "critical",
-                "message": "Sitemap contains no URLs."
-            })
-        
-        if not has_lastmod:
-            issues.append({
-                "type": "opportunity",
-                "message": "URLs in sitemap don't include lastmod dates, which help search engines identify updated content."
-            })
-            
-        if not has_changefreq:
-            issues.append({
-                "type": "opportunity",
-                "message": "No changefreq elements found. Adding them can help guide crawler behavior."
-            })
-            
-        if not has_priority:
-            issues.append({
-                "type": "opportunity",
-                "message": "No priority elements found. Setting priorities can help indicate importance of pages."
-            })
-            
-        if url_count > 50000:
-            issues.append({
-                "type": "warning",
-                "message": f"Sitemap contains {url_count} URLs, exceeding the recommended limit of 50,000 URLs per sitemap."
-            })
-            
-        # Check for URLs from different domains (potential issue)
-        different_domain_urls = []
-        parsed_base = urlparse(base_url)
-        base_netloc = parsed_base.netloc
-        
-        for url in url_elements[:50]:  # Check a sample
-            loc = url.find('sm:loc', ns) if ns else url.find('loc')
-            if loc is not None and loc.text:
-                parsed_url = urlparse(loc.text)
-                if parsed_url.netloc and parsed_url.netloc != base_netloc:
-                    different_domain_urls.append(loc.text)
-                    
-        if different_domain_urls:
-            issues.append({
-                "type": "warning",
-                "message": f"Found {len(different_domain_urls)} URLs from different domains in your sitemap."
-            })
-            
-        return {
-            "url_count": url_count,
-            "has_lastmod": has_lastmod,
-            "has_priority": has_priority,
-            "has_changefreq": has_changefreq,
-            "is_index": is_index,
-            "nested_sitemaps": nested_sitemaps,
-            "issues": issues
-        }
-        
-    except ET.ParseError:
-        return {
-            "url_count": 0,
-            "has_lastmod": False,
-            "has_priority": False,
-            "has_changefreq": False,
-            "is_index": False,
-            "nested_sitemaps": [],
-            "issues": [{
-                "type": "critical",
-                "message": "Sitemap XML is not valid and could not be parsed."
-            }]
-        }
-    except Exception as e:
-        return {
-            "url_count": 0,
-            "has_lastmod": False,
-            "has_priority": False,
-            "has_changefreq": False,
-            "is_index": False,
-            "nested_sitemaps": [],
-            "issues": [{
-                "type": "critical",
-                "message": f"Error analyzing sitemap: {str(e)}"
-            }]
-        }
-
 def check_security_headers(url):
     """Check important security headers."""
     try:
-        response = requests.get(url)
+        response = fetch.get(url)
         headers = response.headers
         
         security_headers = {
@@ -470,11 +154,8 @@ with col2:
                 website_url = 'https://' + website_url
                 
             with st.spinner("Analyzing website and generating report..."):
-                # Fetch robots.txt
-                robots_result = fetch_robots_txt(website_url)
-                
-                # Analyze robots.txt
-                robots_analysis = analyze_robots_txt(robots_result)
+                # Fetch and analyze robots.txt (shared with other sessions auditing this host)
+                robots_result, _, robots_analysis = get_robots(website_url)
                 
                 # Extract sitemaps from robots.txt
                 sitemap_urls = robots_analysis["sitemaps"]
@@ -485,8 +166,8 @@ with col2:
                     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
                     sitemap_urls = [f"{base_url}/sitemap.xml"]
                 
-                # Fetch the first sitemap
-                sitemap_result = fetch_sitemap(sitemap_urls[0])
+                # Fetch every sitemap, following sitemap indexes to their children
+                sitemap_result = get_sitemaps(sitemap_urls)
                 
                 # Analyze sitemap
                 sitemap_analysis = analyze_sitemap(sitemap_result, website_url)
@@ -733,6 +414,7 @@ with col2:
                             <ul>
                                 <li><b>URLs Found:</b> {sitemap_analysis['url_count']} URLs in sitemap</li>
                                 <li><b>Sitemap Type:</b> {'Sitemap Index' if sitemap_analysis['is_index'] else 'Standard Sitemap'}</li>
+                                <li><b>Sitemaps Fetched:</b> {sitemap_analysis['sitemaps_fetched']} ({sitemap_analysis['sitemaps_failed']} failed)</li>
                                 <li><b>Uses lastmod:</b> {'Yes' if sitemap_analysis['has_lastmod'] else 'No'}</li>
                                 <li><b>Uses priority:</b> {'Yes' if sitemap_analysis['has_priority'] else 'No'}</li>
                                 <li><b>Uses changefreq:</b> {'Yes' if sitemap_analysis['has_changefreq'] else 'No'}</li>
@@ -0,0 +1 @@
+"""Shared helpers used by the Seo-Auditor Streamlit pages."""
@@ -0,0 +1,6 @@
+"""``python -m seo_auditor``: batch audits from the command line (see ``seo_auditor.cli``)."""
+import sys
+
+from seo_auditor.cli import main
+
+sys.exit(main())
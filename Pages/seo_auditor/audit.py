@@ -0,0 +1,107 @@
+"""Page summary and SEO score used by the Home page and the batch CLI."""
+from seo_auditor.document import get_document
+
+
+def parse_html(html, url):
+    """On-page SEO summary of one page, as shown on the Home page."""
+    doc = get_document(html, url)
+
+    title = doc.title if doc.title is not None else "No Title Found"
+    description = doc.meta.get("description", "No Description Found")
+
+    # Get meta keywords
+    keywords = doc.meta.get("keywords", "No Keywords Found")
+
+    headers = doc.headings
+    text_stats = doc.text_stats
+
+    # Simple readability calculation (words/sentences ratio)
+    sentences = text_stats.sentence_count or 1
+    word_count = text_stats.word_count
+    readability_score = min(100, max(0, 206.835 - 1.015 * (word_count / sentences) - 84.6 * (text_stats.long_word_count / word_count if word_count else 0)))
+
+    paragraph_count = doc.paragraph_count
+    link_count = len(doc.links)
+    images = doc.images
+
+    # Check for SSL
+    has_ssl = url.startswith("https://")
+
+    return {
+        "title": title,
+        "title_length": len(title),
+        "meta_description": description,
+        "meta_description_length": len(description),
+        "keywords": keywords,
+        "header_structure": headers,
+        "word_count": word_count,
+        "readability_score": readability_score,
+        "paragraph_count": paragraph_count,
+        "link_count": link_count,
+        "image_count": len(images),
+        "images": images,
+        "has_ssl": has_ssl
+    }
+
+
+def calculate_seo_score(data):
+    """Overall 0-100 score for a ``parse_html`` summary."""
+    score = 0
+    max_score = 100
+    
+    # Title score (20%)
+    if data["title_length"] > 0:
+        if 40 <= data["title_length"] <= 60:
+            score += 20
+        elif 30 <= data["title_length"] < 40 or 60 < data["title_length"] <= 70:
+            score += 15
+        else:
+            score += 10
+    
+    # Meta description score (15%)
+    if data["meta_description_length"] > 0:
+        if 140 <= data["meta_description_length"] <= 160:
+            score += 15
+        elif 120 <= data["meta_description_length"] < 140 or 160 < data["meta_description_length"] <= 180:
+            score += 10
+        else:
+            score += 5
+    
+    # Content length score (20%)
+    if data["word_count"] >= 1000:
+        score += 20
+    elif data["word_count"] >= 500:
+        score += 15
+    elif data["word_count"] >= 300:
+        score += 10
+    else:
+        score += 5
+    
+    # Header structure score (15%)
+    header_types = set(h_type for h_type, _ in data["header_structure"])
+    if "H1" in header_types and len(header_types) >= 3:
+        score += 15
+    elif "H1" in header_types:
+        score += 10
+    elif header_types:
+        score += 5
+    
+    # Image optimization score (15%)
+    if data["image_count"] > 0:
+        images_with_alt = sum(1 for _, alt in data["images"] if alt and alt != "No Alt Text")
+        alt_score = (images_with_alt / data["image_count"]) * 15 if data["image_count"] > 0 else 0
+        score += alt_score
+    
+    # SSL score (5%)
+    if data["has_ssl"]:
+        score += 5
+    
+    # Readability score (10%)
+    if data["readability_score"] >= 60:
+        score += 10
+    elif data["readability_score"] >= 40:
+        score += 7
+    else:
+        score += 3
+    
+    return int(min(score, max_score))
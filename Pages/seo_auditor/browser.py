@@ -0,0 +1,257 @@
+"""Pool of warm headless Chrome instances for website screenshots.
+
+Launching Chrome (and resolving its driver) costs seconds, so browsers are
+started once and shared by every Streamlit session in the process. The pool
+is bounded, checks each browser is still responsive before handing it out,
+and retires a browser after ``PAGES_PER_BROWSER`` pages so long-running
+instances don't accumulate leaked memory. Pages are captured once the
+document has loaded and the network has gone quiet instead of after a fixed
+sleep. ``request_screenshot`` starts a capture in the background so it runs
+while the rest of the audit does.
+"""
+import atexit
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+POOL_SIZE = int(os.getenv("SEO_AUDITOR_BROWSER_POOL_SIZE", "2"))
+PAGES_PER_BROWSER = int(os.getenv("SEO_AUDITOR_BROWSER_MAX_PAGES", "50"))
+
+WINDOW_SIZE = (1280, 1024)
+
+# Seconds allowed for navigation, and the most spent waiting for quiet afterwards
+PAGE_LOAD_TIMEOUT = 20
+SETTLE_TIMEOUT = 5
+
+# The network counts as idle once no new resource has started for this long
+NETWORK_IDLE_SECONDS = 0.5
+
+# Seconds to wait for a free browser when the pool is at capacity
+ACQUIRE_TIMEOUT = 60
+
+_RESOURCE_COUNT_JS = "return performance.getEntriesByType('resource').length;"
+
+
+@functools.lru_cache(maxsize=None)
+def _driver_path():
+    """Resolve chromedriver once per process (None lets Selenium Manager find it)."""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+    return ChromeDriverManager().install()
+
+
+def launch_chrome():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service as ChromeService
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"--window-size={WINDOW_SIZE[0]},{WINDOW_SIZE[1]}")
+    driver_path = _driver_path()
+    service = ChromeService(driver_path) if driver_path else ChromeService()
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+def wait_until_settled(driver, timeout=SETTLE_TIMEOUT, idle=NETWORK_IDLE_SECONDS):
+    """Wait for document.readyState == 'complete' and then for the network to go idle."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if driver.execute_script("return document.readyState;") == "complete":
+            break
+        time.sleep(0.1)
+
+    # Late requests (lazy images, XHR) show up as new resource timing entries
+    count = driver.execute_script(_RESOURCE_COUNT_JS)
+    quiet_since = time.monotonic()
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        current = driver.execute_script(_RESOURCE_COUNT_JS)
+        if current != count:
+            count = current
+            quiet_since = time.monotonic()
+        elif time.monotonic() - quiet_since >= idle:
+            return True
+    return False
+
+
+class PooledBrowser:
+    """A WebDriver plus the number of pages it has served."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+    def is_healthy(self):
+        try:
+            return self.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def reset(self):
+        """Forget the last site so the next session starts clean."""
+        self.driver.delete_all_cookies()
+        self.driver.get("about:blank")
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """At most ``size`` browsers, reused across captures and recycled after ``max_pages``."""
+
+    def __init__(self, size=POOL_SIZE, max_pages=PAGES_PER_BROWSER, launcher=launch_chrome):
+        self.size = size
+        self.max_pages = max_pages
+        self.launcher = launcher
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+
+    def _launch(self):
+        try:
+            return PooledBrowser(self.launcher())
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+
+    def _discard(self, browser):
+        browser.quit()
+        with self._lock:
+            self._live -= 1
+
+    def _take(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                can_launch = self._live < self.size
+                if can_launch:
+                    self._live += 1
+            if can_launch:
+                return self._launch()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("No browser became available")
+            # Wake up now and then: a retired browser frees a slot without returning to the queue
+            try:
+                return self._idle.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        """Return a healthy browser, replacing any that stopped responding."""
+        while True:
+            browser = self._take(timeout)
+            if browser.is_healthy():
+                return browser
+            self._discard(browser)
+
+    def release(self, browser):
+        browser.pages += 1
+        if self._closed or browser.pages >= self.max_pages:
+            self._discard(browser)
+            return
+        try:
+            browser.reset()
+        except Exception:
+            self._discard(browser)
+            return
+        self._idle.put(browser)
+
+    @contextmanager
+    def browser(self, timeout=ACQUIRE_TIMEOUT):
+        browser = self.acquire(timeout)
+        try:
+            yield browser
+        finally:
+            self.release(browser)
+
+    def warm(self, count=1):
+        """Start up to ``count`` browsers ahead of the first request."""
+        started = []
+        for _ in range(count):
+            with self._lock:
+                if self._live >= self.size:
+                    break
+                self._live += 1
+            started.append(self._launch())
+        for browser in started:
+            self._idle.put(browser)
+
+    def stats(self):
+        return {"size": self.size, "live": self._live, "idle": self._idle.qsize()}
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Runs captures in the background; one worker per browser is enough
+_executor = ThreadPoolExecutor(max_workers=max(POOL_SIZE, 1), thread_name_prefix="screenshot")
+
+
+def get_pool():
+    """Return the process-wide browser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.close)
+    return _pool
+
+
+def capture_screenshot(url, pool=None):
+    """Load ``url`` in a pooled browser and return a PNG screenshot as bytes."""
+    from selenium.common.exceptions import TimeoutException
+
+    pool = pool or get_pool()
+    with pool.browser() as browser:
+        try:
+            browser.driver.get(url)
+        except TimeoutException:
+            # Capture whatever rendered rather than nothing
+            browser.driver.execute_script("window.stop();")
+        wait_until_settled(browser.driver)
+        return browser.driver.get_screenshot_as_png()
+
+
+def submit(fn, *args):
+    """Run ``fn(*args)`` on the screenshot workers; returns a concurrent.futures.Future."""
+    return _executor.submit(fn, *args)
+
+
+def request_screenshot(url, pool=None):
+    """Start capturing ``url`` in the background; returns a concurrent.futures.Future.
+
+    Use ``asyncio.wrap_future`` to await it from a coroutine.
+    """
+    return submit(capture_screenshot, url, pool)
@@ -0,0 +1,343 @@
+"""Persistent on-disk cache for HTTP responses fetched by the audit pages.
+
+Entries are keyed on the normalized URL plus the request headers that were
+sent, honor the response's Cache-Control/Expires headers, and keep their
+ETag/Last-Modified validators so stale entries can be revalidated with a
+conditional request (a 304 costs a few hundred bytes instead of the body).
+The store is a single SQLite file, bounded in size with LRU eviction.
+"""
+import email.utils
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "SEO_AUDITOR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "seo_auditor")
+)
+DEFAULT_MAX_BYTES = int(os.getenv("SEO_AUDITOR_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Statuses that are safe to store and replay
+CACHEABLE_STATUSES = {200, 203, 300, 301, 404, 410}
+
+# Request headers that never take part in the cache key
+_UNKEYED_HEADERS = {"if-none-match", "if-modified-since", "cache-control", "connection"}
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Lower-case scheme and host, drop default ports and the fragment."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+def cache_key(url, headers=None):
+    """Stable key for a request: normalized URL plus its keyed request headers."""
+    lines = [normalize_url(url)]
+    for name, value in sorted((headers or {}).items(), key=lambda item: item[0].lower()):
+        if value is None or name.lower() in _UNKEYED_HEADERS:
+            continue
+        lines.append(f"{name.lower()}:{value}")
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into a dict of lower-cased directives."""
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else True
+    return directives
+
+
+def _http_date(value):
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def freshness_lifetime(headers, now=None):
+    """Seconds a response stays fresh, 0 if it must be revalidated, None if it must not be stored."""
+    now = time.time() if now is None else now
+    headers = {name.lower(): value for name, value in dict(headers).items()}
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    age = 0
+    try:
+        age = int(headers.get("age", 0))
+    except ValueError:
+        pass
+    max_age = directives.get("max-age")
+    if max_age not in (None, True):
+        try:
+            return max(0, int(max_age) - age)
+        except ValueError:
+            return 0
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or now
+        return max(0, int(expires - date) - age)
+    return 0
+
+
+def vary_is_keyed(headers, request_headers):
+    """Whether every request header named in the response's Vary is part of the cache key."""
+    vary = next((value for name, value in headers.items() if name.lower() == "vary"), None)
+    if not vary:
+        return True
+    keyed = {name.lower() for name, value in request_headers.items()
+             if value is not None and name.lower() not in _UNKEYED_HEADERS}
+    names = {name.strip().lower() for name in vary.split(",") if name.strip()}
+    return "*" not in names and names <= keyed
+
+
+class CacheEntry:
+    """A stored response as returned by ``ResponseCache.lookup``."""
+
+    def __init__(self, key, url, status, headers, body, stored_at, expires_at, last_access, final_url=None):
+        self.key = key
+        self.url = url
+        # Where redirects ended up; the request URL when there were none
+        self.final_url = final_url or url
+        self.status = status
+        self.headers = headers
+        self._lowered = {name.lower(): value for name, value in headers.items()}
+        self.body = body
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.last_access = last_access
+
+    @property
+    def etag(self):
+        return self._lowered.get("etag")
+
+    @property
+    def last_modified(self):
+        return self._lowered.get("last-modified")
+
+    def is_fresh(self, now=None):
+        now = time.time() if now is None else now
+        return self.expires_at is not None and now < self.expires_at
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry."""
+        conditional = {}
+        if self.etag:
+            conditional["If-None-Match"] = self.etag
+        if self.last_modified:
+            conditional["If-Modified-Since"] = self.last_modified
+        return conditional
+
+
+class ResponseCache:
+    """Size-bounded SQLite store of HTTP responses with LRU eviction."""
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        if path is None:
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            path = os.path.join(DEFAULT_CACHE_DIR, "responses.sqlite3")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                final_url TEXT
+            )"""
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if "final_url" not in columns:
+            # Stores created before redirects were recorded
+            self._db.execute("ALTER TABLE responses ADD COLUMN final_url TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+
+    def lookup(self, key):
+        """Return the entry for ``key`` (fresh or stale) and mark it as recently used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT key, url, status, headers, body, stored_at, expires_at, final_url FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        return CacheEntry(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5], row[6], now, row[7])
+
+    def store(self, key, url, status, headers, body, final_url=None, request_headers=None):
+        """Store a response if its headers allow it; returns True when stored.
+
+        ``request_headers`` are the headers the key was built from; responses
+        that vary on anything else can't be replayed safely and aren't stored.
+        """
+        headers = dict(headers)
+        size = len(body)
+        if not self.storable(status, headers, request_headers) or size > self.max_bytes:
+            return False
+        lifetime = freshness_lifetime(headers)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), status, json.dumps(headers), sqlite3.Binary(body), size, now, now + lifetime, now,
+                 final_url),
+            )
+            self._evict()
+            self._db.commit()
+        return True
+
+    def storable(self, status, headers, request_headers=None):
+        """Whether a response with this status and these headers would be kept (its size aside)."""
+        headers = dict(headers)
+        lifetime = freshness_lifetime(headers)
+        if status not in CACHEABLE_STATUSES or lifetime is None:
+            return False
+        if not vary_is_keyed(headers, request_headers or {}):
+            return False
+        has_validators = any(name.lower() in ("etag", "last-modified") for name in headers)
+        # With neither, it would be stale immediately and can't be revalidated
+        return lifetime > 0 or has_validators
+
+    def refresh(self, key, headers):
+        """Merge headers from a 304 into the stored entry and extend its lifetime."""
+        with self._lock:
+            row = self._db.execute("SELECT headers FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            merged = json.loads(row[0])
+            lowered = {name.lower(): name for name in merged}
+            for name, value in dict(headers).items():
+                merged.pop(lowered.get(name.lower(), name), None)
+                merged[name] = value
+            lifetime = freshness_lifetime(merged) or 0
+            now = time.time()
+            self._db.execute(
+                "UPDATE responses SET headers = ?, stored_at = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(merged), now, now + lifetime, now, key),
+            )
+            self._db.commit()
+            self.revalidated += 1
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def discard(self, key):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # --- Inspection API ---
+    def stats(self):
+        """Entry count, bytes used and hit/miss counters."""
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "entries": count,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+    def entries(self):
+        """Metadata for every stored response, most recently used first."""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, status, size, headers, stored_at, expires_at, last_access "
+                "FROM responses ORDER BY last_access DESC"
+            ).fetchall()
+        result = []
+        for url, status, size, headers, stored_at, expires_at, last_access in rows:
+            headers = {name.lower(): value for name, value in json.loads(headers).items()}
+            result.append({
+                "url": url,
+                "status": status,
+                "size_bytes": size,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "stored_at": stored_at,
+                "expires_at": expires_at,
+                "last_access": last_access,
+                "fresh": expires_at is not None and now < expires_at,
+            })
+        return result
+
+    def delete(self, url):
+        """Drop every entry stored for ``url``; returns the number removed."""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM responses WHERE url = ?", (normalize_url(url),))
+            self._db.commit()
+        return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+        self.hits = self.misses = self.revalidated = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide response cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,369 @@
+"""Batch audits from the command line, without the Streamlit UI.
+
+Run from the ``Pages`` directory::
+
+    python -m seo_auditor urls.txt -o results.jsonl
+    python -m seo_auditor --sitemap https://example.com/sitemap.xml -o results.jsonl --resume
+    python -m seo_auditor --crawl https://example.com/ --max-pages 2000 --checkpoint crawl.json -o site.jsonl
+    python -m seo_auditor urls.txt --pagespeed --psi-qps 2 -o vitals.jsonl --resume
+
+Each URL gets the Home page summary and SEO score, plus its host's robots.txt
+and sitemap analysis (fetched once per host), and optionally a status check
+of every link on the page. Downloads run on an asyncio loop with a global
+and a per-host concurrency limit; parsing runs in a process pool so it uses
+every core. One JSON object per URL is written as soon as it is done, so an
+interrupted run can be continued with ``--resume``, which also retries URLs
+that failed (their new line follows the old one). ``--crawl`` instead
+walks one site from its homepage and sitemap (see ``seo_auditor.crawler``)
+and prints a whole-site summary at the end. ``--pagespeed`` collects Core
+Web Vitals from PageSpeed Insights for every URL instead (see
+``seo_auditor.psi_batch``).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from seo_auditor import fetch
+from seo_auditor.audit import calculate_seo_score, parse_html
+from seo_auditor.crawler import MAX_DEPTH, MAX_PAGES, SiteCrawler, site_summary
+from seo_auditor.document import get_document
+from seo_auditor.links import check_links
+from seo_auditor.pagespeed import STRATEGIES
+from seo_auditor.psi_batch import DEFAULT_WORKERS, PSI_DAILY_QUOTA, PSI_QPS, PageSpeedBatch, core_web_vitals
+from seo_auditor.seen import SeenSet
+from seo_auditor.site_cache import get_robots, get_sitemaps
+from seo_auditor.sitemaps import analyze_sitemap, expand_sitemaps
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 4
+DEFAULT_LINK_CONCURRENCY = 8
+
+# Seconds between progress lines on stderr
+PROGRESS_INTERVAL = 10
+
+# Sitemap URLs found ahead of the auditors before the sitemap reader waits
+SITEMAP_BUFFER = 1000
+
+
+def read_url_list(path):
+    """URLs from a file (or stdin for "-"), one per line; blank lines and # comments are skipped."""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def sitemap_urls(url, seen=None, buffer=SITEMAP_BUFFER):
+    """Yield every page URL listed in a sitemap, following sitemap indexes.
+
+    The sitemaps are read on a background thread and URLs are yielded as
+    they are found, at most ``buffer`` ahead of the consumer, so memory
+    doesn't grow with the sitemap. URLs already in ``seen`` are left out.
+    """
+    pages = queue.Queue(maxsize=buffer)
+    finished = object()
+
+    def expand():
+        try:
+            result = expand_sitemaps([url], on_url=pages.put, seen=seen)
+            for sitemap in result["sitemaps"]:
+                if sitemap["status"] != "success":
+                    print(f"Skipping sitemap {sitemap['url']}: {sitemap['message']}", file=sys.stderr)
+        finally:
+            pages.put(finished)
+
+    threading.Thread(target=expand, daemon=True).start()
+    while True:
+        page = pages.get()
+        if page is finished:
+            return
+        yield page
+
+
+def unique_urls(urls, sitemap=None):
+    """Yield ``urls`` and then the pages of ``sitemap``, each URL once."""
+    seen = SeenSet()
+    try:
+        for url in urls:
+            if seen.add(url):
+                yield url
+        if sitemap:
+            # The URL list is in ``seen`` by now, so the sitemap only adds new pages
+            yield from sitemap_urls(sitemap, seen=seen)
+    finally:
+        seen.close()
+
+
+def completed_urls(path):
+    """URLs with a successful result line in ``path``; failed ones are retried (a torn last line is ignored)."""
+    done = set()
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as results:
+        for line in results:
+            try:
+                record = json.loads(line)
+                if record["status"] == "success":
+                    done.add(record["url"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as results:
+        results.seek(-1, os.SEEK_END)
+        return results.read(1) == b"\n"
+
+
+def analyze_page(html, url):
+    """Parse one page (runs in a worker process); returns (summary, absolute link URLs)."""
+    summary = parse_html(html, url)
+    summary["seo_score"] = calculate_seo_score(summary)
+    links = []
+    for link in get_document(html, url).links:
+        href = urljoin(url, (link["href"] or "").strip())
+        if urlsplit(href).scheme in ("http", "https"):
+            links.append(href)
+    return summary, links
+
+
+def site_checks(url):
+    """robots.txt and sitemap analysis for ``url``'s host (every declared sitemap, indexes expanded)."""
+    robots_analysis = get_robots(url)[2]
+    sitemap_urls = robots_analysis["sitemaps"]
+    if not sitemap_urls:
+        parts = urlsplit(url)
+        sitemap_urls = [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+    return {
+        "robots": robots_analysis,
+        "sitemap": analyze_sitemap(get_sitemaps(sitemap_urls), url),
+    }
+
+
+class BatchAuditor:
+    """Audits many URLs concurrently and writes one JSON line per URL."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, workers=None,
+                 with_site_checks=True, with_links=False, link_concurrency=DEFAULT_LINK_CONCURRENCY):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.workers = workers or os.cpu_count() or 1
+        self.with_site_checks = with_site_checks
+        self.with_links = with_links
+        self.link_concurrency = link_concurrency
+        self.counts = Counter()
+
+    async def run(self, urls, out, progress=None):
+        """Audit ``urls`` (a list, or any iterable read as the audits go) and write a line for each."""
+        loop = asyncio.get_running_loop()
+        total = len(urls) if hasattr(urls, "__len__") else None
+        pending = iter(urls)
+        pending_lock = threading.Lock()
+        host_limits = {}
+        host_checks = {}
+        started = time.monotonic()
+        last_report = started
+
+        def host_limit(host):
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host)
+            return host_limits[host]
+
+        def checks_for(url, io):
+            # One robots/sitemap fetch per host, shared by every URL on it
+            host = urlsplit(url).netloc.lower()
+            if host not in host_checks:
+                host_checks[host] = loop.run_in_executor(io, site_checks, url)
+            return host_checks[host]
+
+        async def audit(url, io, cpu):
+            record = {"url": url, "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+            try:
+                async with host_limit(urlsplit(url).netloc.lower()):
+                    response = await loop.run_in_executor(io, fetch.get, url)
+                record["http_status"] = response.status_code
+                record["final_url"] = response.url
+                if response.status_code != 200:
+                    return {**record, "status": "error", "message": f"HTTP {response.status_code}"}
+                summary, links = await loop.run_in_executor(cpu, analyze_page, response.text, url)
+                record.update(summary)
+                if self.with_site_checks:
+                    record.update(await checks_for(url, io))
+                if self.with_links:
+                    statuses = await check_links(links, max_concurrency=self.link_concurrency)
+                    record["link_status"] = dict(Counter(status["status_class"] for status in statuses))
+                return {**record, "status": "success"}
+            except requests.RequestException as e:
+                return {**record, "status": "error", "message": f"Request failed: {e}"}
+            except Exception as e:
+                return {**record, "status": "error", "message": f"Audit failed: {e}"}
+
+        def next_url():
+            # Runs on the I/O pool: a streamed source may block until the next URL is found
+            with pending_lock:
+                return next(pending, None)
+
+        async def worker(io, cpu):
+            nonlocal last_report
+            while True:
+                url = await loop.run_in_executor(io, next_url)
+                if url is None:
+                    return
+                record = await audit(url, io, cpu)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                self.counts[record["status"]] += 1
+                now = time.monotonic()
+                if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    progress(sum(self.counts.values()), total, now - started)
+
+        io = ThreadPoolExecutor(max_workers=self.concurrency * 2)
+        try:
+            # Spawned, not forked: this process already runs fetch threads holding locks
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as cpu:
+                workers = self.concurrency if total is None else min(self.concurrency, total) or 1
+                await asyncio.gather(*(worker(io, cpu) for _ in range(workers)))
+        finally:
+            io.shutdown(wait=False)
+        return self.counts
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m seo_auditor", description="Audit many URLs and write JSON lines.")
+    parser.add_argument("urls", nargs="?", help='file with one URL per line ("-" for stdin)')
+    parser.add_argument("--sitemap", help="audit every URL listed in this sitemap (indexes are followed)")
+    parser.add_argument("-o", "--output", help="JSON lines file to write (default: stdout)")
+    parser.add_argument("--resume", action="store_true", help="skip URLs already audited successfully in --output (failed ones are retried) and append to it")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="pages fetched at once")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="pages fetched at once from one host")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--check-links", action="store_true", help="also check the status of every link on each page")
+    parser.add_argument("--link-concurrency", type=int, default=DEFAULT_LINK_CONCURRENCY, help="link checks at once per page")
+    parser.add_argument("--skip-site-checks", action="store_true", help="don't fetch robots.txt and sitemaps")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output on stderr")
+    crawl = parser.add_argument_group("site crawl")
+    crawl.add_argument("--crawl", metavar="URL", help="crawl this site from its homepage and sitemap instead")
+    crawl.add_argument("--max-pages", type=int, default=MAX_PAGES, help="pages to crawl at most")
+    crawl.add_argument("--max-depth", type=int, default=MAX_DEPTH, help="clicks from the homepage to follow")
+    crawl.add_argument("--checkpoint", help="save crawl state here; with --resume, continue from it")
+    crawl.add_argument("--delay", type=float, default=None, help="seconds between requests (default: robots.txt Crawl-delay)")
+    psi = parser.add_argument_group("PageSpeed Insights batch")
+    psi.add_argument("--pagespeed", action="store_true", help="collect Core Web Vitals from PageSpeed Insights instead")
+    psi.add_argument("--psi-state", default="psi_batch.sqlite3", help="job and quota state file (kept for --resume)")
+    psi.add_argument("--psi-qps", type=float, default=PSI_QPS, help="PSI requests per second")
+    psi.add_argument("--psi-daily-quota", type=int, default=PSI_DAILY_QUOTA, help="PSI requests allowed per day")
+    psi.add_argument("--psi-workers", type=int, default=DEFAULT_WORKERS, help="PSI runs in flight at once")
+    psi.add_argument("--psi-strategy", choices=["both", *STRATEGIES], default="both", help="devices to test")
+    return parser
+
+
+def run_pagespeed_batch(args, urls):
+    strategies = STRATEGIES if args.psi_strategy == "both" else (args.psi_strategy,)
+    batch = PageSpeedBatch(args.psi_state, qps=args.psi_qps, daily_quota=args.psi_daily_quota,
+                           workers=args.psi_workers, strategies=strategies)
+    if not args.resume:
+        batch.state.reset()
+    out = open(args.output, "a" if args.resume else "w", encoding="utf-8") if args.output else sys.stdout
+
+    def record(url, strategy, status, outcome):
+        line = {"url": url, "strategy": strategy, "status": status}
+        line.update(core_web_vitals(outcome) if status == "done" else {"message": outcome})
+        out.write(json.dumps(line, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        counts = batch.run(urls, on_result=record)
+    finally:
+        batch.close()
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        print(f"Done: {counts['done']} runs, {counts['failed']} failed, {counts['pending']} pending", file=sys.stderr)
+        if batch.quota_exhausted:
+            print("Daily PageSpeed quota used up; run again with --resume to continue.", file=sys.stderr)
+    return 0
+
+
+def run_crawl(args):
+    if args.resume and args.checkpoint and os.path.exists(args.checkpoint):
+        crawler = SiteCrawler.resume(args.checkpoint, max_pages=args.max_pages, max_depth=args.max_depth, delay=args.delay)
+    else:
+        crawler = SiteCrawler(args.crawl, max_pages=args.max_pages, max_depth=args.max_depth,
+                              use_sitemap=not args.skip_site_checks, checkpoint=args.checkpoint, delay=args.delay)
+    out = open(args.output, "a" if args.resume else "w", encoding="utf-8") if args.output else sys.stdout
+
+    def record(page, crawled, limit):
+        out.write(json.dumps(page, ensure_ascii=False) + "\n")
+        out.flush()
+        if not args.quiet and page["status"] != "skipped" and crawled % 25 == 0:
+            seen = crawler.seen.stats()
+            print(f"{crawled}/{limit} pages crawled, {len(crawler.frontier)} queued, "
+                  f"{seen['entries']} URLs seen ({seen['memory_bytes'] / 2**20:.1f} MB in memory, "
+                  f"{seen['disk_bytes'] / 2**20:.1f} MB on disk)", file=sys.stderr)
+
+    try:
+        crawler.crawl(progress=record)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        print(json.dumps(site_summary(crawler.results()), indent=2, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.crawl:
+        return run_crawl(args)
+    if not args.urls and not args.sitemap:
+        parser.error("give a URL list file, --sitemap or --crawl")
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    urls = unique_urls(read_url_list(args.urls) if args.urls else [], args.sitemap)
+    if args.pagespeed:
+        return run_pagespeed_batch(args, urls)
+    if args.resume:
+        done = completed_urls(args.output)
+        urls = (url for url in urls if url not in done)
+
+    def report(done, total, elapsed):
+        audited = f"{done}/{total}" if total is not None else str(done)
+        print(f"{audited} URLs audited ({done / elapsed:.1f}/s)", file=sys.stderr)
+
+    auditor = BatchAuditor(
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        workers=args.workers,
+        with_site_checks=not args.skip_site_checks,
+        with_links=args.check_links,
+        link_concurrency=args.link_concurrency,
+    )
+    out = open(args.output, "a" if args.resume else "w", encoding="utf-8") if args.output else sys.stdout
+    if args.resume and out.tell() and not _ends_with_newline(args.output):
+        # Close off a line torn by the interrupted run
+        out.write("\n")
+    try:
+        counts = asyncio.run(auditor.run(urls, out, progress=None if args.quiet else report))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not args.quiet:
+        print(f"Done: {counts['success']} audited, {counts['error']} failed", file=sys.stderr)
+    return 0
@@ -0,0 +1,313 @@
+"""Whole-site crawls that feed every page through the existing scorers.
+
+``SiteCrawler`` starts from the homepage and the URLs listed in the site's
+sitemap and follows internal links. The frontier is a priority queue
+(shallow pages and sitemap URLs first, query-string URLs last) with a size
+cap. Fetches are scheduled per host so robots.txt ``Disallow`` rules and
+``Crawl-delay`` are respected; the crawler identifies itself with its own
+User-Agent and obeys the robots.txt group for that agent. Depth and page
+limits bound the crawl (skipped pages don't count against the budget).
+Page results are appended to a JSON Lines file as they finish and only
+their counts stay in memory; ``results()`` reads them back. The frontier and
+seen set can be checkpointed to a JSON file, with the results file next to
+it, and the crawl resumed.
+"""
+import heapq
+import json
+import os
+import tempfile
+import time
+import weakref
+from collections import Counter
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from seo_auditor import fetch
+from seo_auditor.audit import calculate_seo_score, parse_html
+from seo_auditor.cache import DEFAULT_CACHE_DIR
+from seo_auditor.document import get_document
+from seo_auditor.links import link_key
+from seo_auditor.robots import PathMatcher
+from seo_auditor.site_cache import get_robots
+from seo_auditor.seen import SeenSet
+from seo_auditor.sitemaps import expand_sitemaps
+
+MAX_PAGES = 500
+MAX_DEPTH = 5
+
+# Frontier entries kept beyond the page budget; lower-priority links past this are dropped
+FRONTIER_FACTOR = 10
+
+# Seconds between requests to one host when robots.txt sets no Crawl-delay
+DEFAULT_DELAY = 0.5
+
+# Pages crawled between checkpoint writes
+CHECKPOINT_EVERY = 25
+
+# Sent with every crawl request; robots.txt groups are matched on its product token
+USER_AGENT = "SEOAuditorBot/1.0"
+
+SKIPPED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _host(url):
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _priority(url, depth, from_sitemap):
+    # Shallow pages first; sitemap URLs count as one click from the homepage;
+    # parameterised URLs (filters, sorting, sessions) go last at their depth
+    priority = 1 if from_sitemap else depth
+    if urlsplit(url).query:
+        priority += 0.5
+    return priority
+
+
+class SiteCrawler:
+    """Breadth-first-ish crawl of one site with robots.txt politeness."""
+
+    def __init__(self, start_url, max_pages=MAX_PAGES, max_depth=MAX_DEPTH, use_sitemap=True,
+                 checkpoint=None, delay=None, user_agent=USER_AGENT):
+        self.start_url = start_url
+        self.site = _host(start_url)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.use_sitemap = use_sitemap
+        self.checkpoint = checkpoint
+        self.delay = delay
+        self.user_agent = user_agent
+        self.agent_token = user_agent.split("/", 1)[0]
+        self.frontier = []      # heap of (priority, sequence, url, depth)
+        self.seen = SeenSet(bloom_capacity=max_pages * FRONTIER_FACTOR)  # every URL ever queued
+        self.counts = Counter()  # page results by status
+        self._sequence = 0
+        self._robots = {}       # host -> (PathMatcher, delay, sitemap URLs)
+        self._next_fetch = {}   # host -> monotonic time the next request may start
+        if checkpoint:
+            self.results_path = f"{checkpoint}.results.jsonl"
+        else:
+            # Without a checkpoint the results only need to outlive the crawler
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            fd, self.results_path = tempfile.mkstemp(prefix="crawl-", suffix=".jsonl", dir=DEFAULT_CACHE_DIR)
+            os.close(fd)
+            weakref.finalize(self, _remove, self.results_path)
+
+    @property
+    def crawled(self):
+        """Results other than skipped pages, counted against max_pages."""
+        return sum(self.counts.values()) - self.counts["skipped"]
+
+    # --- frontier ---
+    def is_internal(self, url):
+        return urlsplit(url).scheme in ("http", "https") and _host(url) == self.site
+
+    def enqueue(self, url, depth, from_sitemap=False):
+        """Queue ``url`` unless it was seen, is off-site, too deep, or the frontier is full."""
+        url = url.split("#", 1)[0]
+        if not self.is_internal(url) or depth > self.max_depth:
+            return False
+        key = link_key(url)
+        if key in self.seen:
+            return False
+        if len(self.frontier) >= self.max_pages * FRONTIER_FACTOR:
+            return False
+        self.seen.add(key)
+        self._sequence += 1
+        heapq.heappush(self.frontier, (_priority(url, depth, from_sitemap), self._sequence, url, depth))
+        return True
+
+    def seed(self):
+        self.enqueue(self.start_url, 0)
+        if not self.use_sitemap:
+            return
+        parts = urlsplit(self.start_url)
+        sitemaps = self._robots_for(self.start_url)[2] or [f"{parts.scheme}://{parts.netloc}/sitemap.xml"]
+        # enqueue checks self.seen, which is keyed by normalized link
+        expand_sitemaps(sitemaps, on_url=lambda page: self.enqueue(page, 1, from_sitemap=True),
+                        max_urls=self.max_pages * FRONTIER_FACTOR, seen=False)
+
+    # --- politeness ---
+    def _robots_for(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self._robots:
+            robots = get_robots(url)[1]
+            matcher, sitemaps = PathMatcher([]), []
+            if robots is not None:
+                matcher, sitemaps = robots.matcher(self.agent_token), robots.sitemaps
+            delay = self.delay
+            if delay is None:
+                delay = matcher.crawl_delay if matcher.crawl_delay is not None else DEFAULT_DELAY
+            self._robots[host] = (matcher, delay, sitemaps)
+        return self._robots[host]
+
+    def allowed(self, url):
+        return self._robots_for(url)[0].allowed(url)
+
+    def _wait_for_turn(self, url):
+        host = urlsplit(url).netloc.lower()
+        delay = self._robots_for(url)[1]
+        wait = self._next_fetch.get(host, 0) - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._next_fetch[host] = time.monotonic() + delay
+
+    # --- crawling ---
+    def crawl_page(self, url, depth):
+        """Fetch and score one page, queueing its internal links; returns its result."""
+        result = {"url": url, "depth": depth}
+        if not self.allowed(url):
+            return {**result, "status": "skipped", "message": "Disallowed by robots.txt"}
+        self._wait_for_turn(url)
+        try:
+            # Streamed, so the body is only downloaded for internal HTML pages
+            with fetch.get(url, headers={"User-Agent": self.user_agent}, stream=True) as response:
+                result["http_status"] = response.status_code
+                if response.status_code != 200:
+                    return {**result, "status": "error", "message": f"HTTP {response.status_code}"}
+                if "html" not in response.headers.get("Content-Type", "text/html"):
+                    return {**result, "status": "skipped", "message": "Not an HTML page"}
+                final_url = response.url
+                if final_url != url:
+                    if not self.is_internal(final_url):
+                        return {**result, "status": "skipped", "message": f"Redirects off-site to {final_url}"}
+                    # Reached by its own link too (or already crawled), so it is only scored once
+                    target = link_key(final_url)
+                    if target != link_key(url) and not self.seen.add(target):
+                        return {**result, "status": "skipped", "message": f"Redirects to {final_url}, already queued"}
+                html = response.text
+        except requests.RequestException as e:
+            return {**result, "status": "error", "message": f"Request failed: {e}"}
+
+        summary = parse_html(html, final_url)
+        summary["seo_score"] = calculate_seo_score(summary)
+        summary.pop("images", None)
+
+        # Follow links the way the Backlinks page extracts them, skipping nofollow
+        for link in get_document(html, final_url).links:
+            href = (link["href"] or "").strip()
+            if not href or href.startswith("#") or href.lower().startswith(SKIPPED_SCHEMES):
+                continue
+            if "nofollow" in link["rel"]:
+                continue
+            self.enqueue(urljoin(final_url, href), depth + 1)
+        return {**result, **summary, "final_url": final_url, "status": "success"}
+
+    def crawl(self, progress=None):
+        """Crawl until the page budget or the frontier runs out; returns the result counts by status."""
+        fresh = not self.counts and not self.frontier
+        if fresh:
+            self.seed()
+        with open(self.results_path, "w" if fresh else "a", encoding="utf-8") as log:
+            while self.frontier and self.crawled < self.max_pages:
+                _, _, url, depth = heapq.heappop(self.frontier)
+                page = self.crawl_page(url, depth)
+                self.counts[page["status"]] += 1
+                log.write(json.dumps(page, ensure_ascii=False) + "\n")
+                if progress is not None:
+                    progress(page, self.crawled, self.max_pages)
+                if self.checkpoint and sum(self.counts.values()) % CHECKPOINT_EVERY == 0:
+                    self.save(log=log)
+            if self.checkpoint:
+                self.save(log=log)
+        return self.counts
+
+    def results(self):
+        """Iterate over the page results so far, read back from ``results_path``."""
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, encoding="utf-8") as log:
+            for line in log:
+                yield json.loads(line)
+
+    # --- checkpoints ---
+    def state(self):
+        return {
+            "start_url": self.start_url,
+            "max_pages": self.max_pages,
+            "max_depth": self.max_depth,
+            "use_sitemap": self.use_sitemap,
+            "frontier": [[priority, url, depth] for priority, _, url, depth in sorted(self.frontier)],
+            "seen": list(self.seen.fingerprints()),
+        }
+
+    def save(self, log=None):
+        """Write the frontier and seen set atomically to the checkpoint file.
+
+        ``log`` is the open results file; its length is recorded so a resume
+        drops results appended after this checkpoint (their pages are still
+        in the saved frontier).
+        """
+        state = self.state()
+        if log is not None:
+            log.flush()
+            state["results_bytes"] = log.tell()
+        else:
+            state["results_bytes"] = os.path.getsize(self.results_path) if os.path.exists(self.results_path) else 0
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            json.dump(state, out)
+        os.replace(tmp, self.checkpoint)
+
+    @classmethod
+    def resume(cls, path, **overrides):
+        """Rebuild a crawler from a checkpoint; ``overrides`` replace the saved limits."""
+        with open(path, encoding="utf-8") as saved:
+            state = json.load(saved)
+        options = {key: state[key] for key in ("max_pages", "max_depth", "use_sitemap")}
+        options.update(overrides)
+        crawler = cls(state["start_url"], checkpoint=path, **options)
+        for fp in state["seen"]:
+            crawler.seen.add_fingerprint(fp)
+        if "results" in state:
+            # Checkpoints from before results moved to their own file
+            with open(crawler.results_path, "w", encoding="utf-8") as log:
+                log.writelines(json.dumps(page, ensure_ascii=False) + "\n" for page in state["results"])
+        elif os.path.exists(crawler.results_path):
+            with open(crawler.results_path, "r+", encoding="utf-8") as log:
+                log.truncate(state["results_bytes"])
+        crawler.counts.update(page["status"] for page in crawler.results())
+        for priority, url, depth in state["frontier"]:
+            crawler._sequence += 1
+            crawler.frontier.append((priority, crawler._sequence, url, depth))
+        heapq.heapify(crawler.frontier)
+        return crawler
+
+
+def site_summary(results):
+    """Whole-site figures from a crawl's page results, read in one pass (e.g. ``crawler.results()``)."""
+    statuses = Counter()
+    titles = Counter()
+    lowest = []
+    score_total = missing_title = missing_description = thin_pages = 0
+    for page in results:
+        statuses[page["status"]] += 1
+        if page["status"] != "success":
+            continue
+        titles[page["title"]] += 1
+        score_total += page["seo_score"]
+        lowest = heapq.nsmallest(10, lowest + [(page["seo_score"], page["url"])])
+        missing_title += page["title"] == "No Title Found"
+        missing_description += page["meta_description"] == "No Description Found"
+        thin_pages += page["word_count"] < 300
+    audited = statuses["success"]
+    return {
+        "pages_crawled": sum(statuses.values()),
+        "pages_audited": audited,
+        "errors": statuses["error"],
+        "skipped": statuses["skipped"],
+        "average_seo_score": round(score_total / audited, 1) if audited else None,
+        "lowest_scoring": lowest,
+        "missing_title": missing_title,
+        "missing_description": missing_description,
+        "duplicate_titles": {title: count for title, count in titles.items() if count > 1},
+        "thin_pages": thin_pages,
+    }
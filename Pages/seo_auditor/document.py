@@ -0,0 +1,132 @@
+"""Parse-once view of a fetched page shared by all audit pages.
+
+``get_document(html, url)`` parses the HTML a single time and keeps the
+result in a small LRU cache keyed by the content hash, so Home, Content
+Optimization, Backlinks and Technical SEO all read the same parsed tree.
+Every view (title, meta, headings, links, ...) comes from a single walk of
+the tree, done lazily on first access and memoized on the document.
+Parsing goes through the fastest installed backend from
+``seo_auditor.parsers``.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+from seo_auditor import parsers
+from seo_auditor.text import analyze_text
+from seo_auditor.walker import walk_metrics
+
+DOCUMENT_CACHE_SIZE = int(os.getenv("SEO_AUDITOR_DOCUMENT_CACHE_SIZE", "32"))
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class AuditDocument:
+    """Lazily computed, memoized views over one page's HTML."""
+
+    def __init__(self, html, url, digest=None, backend=None):
+        self.html = html
+        self.url = url
+        self.content_hash = digest or content_hash(html)
+        self.backend = backend
+
+    @cached_property
+    def page(self):
+        return parsers.parse(self.html, self.backend)
+
+    @cached_property
+    def metrics(self):
+        """Every view below, collected in one walk over the parsed tree."""
+        return walk_metrics(self.page, self.url)
+
+    @property
+    def title(self):
+        """Text of the first <title>, or None when the page has none."""
+        return self.metrics.title
+
+    @property
+    def meta(self):
+        """Map of lower-cased meta name to its content; the first occurrence wins."""
+        return self.metrics.meta
+
+    @property
+    def headings(self):
+        """(level, text) pairs, all H1s first, then H2s, and so on."""
+        return self.metrics.headings
+
+    def iter_text(self):
+        """Visible text in whitespace-collapsed chunks, split at block elements (inline tags don't split)."""
+        return iter(self.metrics.text_chunks)
+
+    @cached_property
+    def text(self):
+        """All visible text joined with single spaces (script/style/noscript excluded).
+
+        Built on first use only; counts should come from ``text_stats``, which
+        never needs the whole text as one string.
+        """
+        return " ".join(self.metrics.text_chunks)
+
+    @cached_property
+    def text_stats(self):
+        """Word, sentence and keyword counts streamed from ``iter_text()``."""
+        return analyze_text(self.iter_text())
+
+    @property
+    def paragraph_count(self):
+        return self.metrics.paragraph_count
+
+    @property
+    def links(self):
+        """Every <a> on the page as a dict with href, anchor text and rel values."""
+        return self.metrics.links
+
+    @property
+    def images(self):
+        """(absolute src, alt) for each <img> with a src."""
+        return self.metrics.images
+
+    @property
+    def iframes(self):
+        return self.metrics.iframes
+
+    @property
+    def videos(self):
+        """(src, title, dimensions) for embedded players and HTML5 <video> tags."""
+        return self.metrics.videos
+
+    @property
+    def canonical(self):
+        """href of <link rel="canonical">, or None."""
+        return self.metrics.canonical
+
+
+_documents = OrderedDict()
+_documents_lock = threading.Lock()
+
+
+def get_document(html, url):
+    """Return the shared AuditDocument for this HTML, parsing it only once."""
+    digest = content_hash(html)
+    key = (digest, url)
+    with _documents_lock:
+        document = _documents.get(key)
+        if document is not None:
+            _documents.move_to_end(key)
+            return document
+    document = AuditDocument(html, url, digest)
+    with _documents_lock:
+        document = _documents.setdefault(key, document)
+        _documents.move_to_end(key)
+        while len(_documents) > DOCUMENT_CACHE_SIZE:
+            _documents.popitem(last=False)
+    return document
+
+
+def clear_documents():
+    with _documents_lock:
+        _documents.clear()
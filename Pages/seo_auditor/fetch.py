@@ -0,0 +1,234 @@
+"""Shared HTTP client used by every audit page.
+
+All pages fetch through one pooled ``requests.Session`` so repeated requests
+to the same origin reuse keep-alive connections instead of paying a fresh
+DNS lookup and TCP/TLS handshake each time.
+"""
+import contextlib
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from seo_auditor.cache import cache_key, get_cache
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Connection": "keep-alive",
+}
+
+# (connect, read) timeout applied to every request that doesn't pass its own
+DEFAULT_TIMEOUT = (5, 10)
+
+# Number of per-host pools kept around, and keep-alive connections per host
+POOL_CONNECTIONS = int(os.getenv("SEO_AUDITOR_POOL_CONNECTIONS", "20"))
+POOL_MAXSIZE = int(os.getenv("SEO_AUDITOR_POOL_MAXSIZE", "20"))
+
+# Streamed bodies larger than this are passed through without being cached,
+# so streaming readers keep their memory bound
+STREAM_CACHE_MAX_BYTES = int(os.getenv("SEO_AUDITOR_STREAM_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+_session = None
+_session_lock = threading.Lock()
+_settings = {
+    "pool_connections": POOL_CONNECTIONS,
+    "pool_maxsize": POOL_MAXSIZE,
+    "timeout": DEFAULT_TIMEOUT,
+    "headers": DEFAULT_HEADERS,
+}
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_settings["pool_connections"],
+        pool_maxsize=_settings["pool_maxsize"],
+        pool_block=False,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(_settings["headers"])
+    return session
+
+
+def configure(pool_connections=None, pool_maxsize=None, timeout=None, headers=None):
+    """Change pool sizes, default timeout or default headers and rebuild the session."""
+    global _session
+    with _session_lock:
+        if pool_connections is not None:
+            _settings["pool_connections"] = pool_connections
+        if pool_maxsize is not None:
+            _settings["pool_maxsize"] = pool_maxsize
+        if timeout is not None:
+            _settings["timeout"] = timeout
+        if headers is not None:
+            _settings["headers"] = {**DEFAULT_HEADERS, **headers}
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def request(method, url, **kwargs):
+    """Send a request through the shared session with the default timeout."""
+    kwargs.setdefault("timeout", _settings["timeout"])
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    kwargs.setdefault("allow_redirects", True)
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def _response_from_entry(entry):
+    response = requests.Response()
+    response.status_code = entry.status
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response._content = entry.body
+    response.url = entry.final_url
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+
+def cached_get(url, headers=None, cache=None, **kwargs):
+    """GET through the on-disk response cache.
+
+    Fresh entries are served without touching the network; stale ones are
+    revalidated with If-None-Match/If-Modified-Since and a 304 replays the
+    stored body.
+    """
+    cache = cache or get_cache()
+    request_headers = {**get_session().headers, **(headers or {})}
+    key = cache_key(url, request_headers)
+    entry = cache.lookup(key)
+    if entry is not None and entry.is_fresh():
+        cache.record_hit()
+        return _response_from_entry(entry)
+
+    conditional = dict(headers or {})
+    if entry is not None:
+        conditional.update(entry.validators())
+    response = get(url, headers=conditional, **kwargs)
+
+    if entry is not None and response.status_code == 304:
+        cache.refresh(key, response.headers)
+        cache.record_hit()
+        return _response_from_entry(cache.lookup(key) or entry)
+
+    cache.record_miss()
+    stored = cache.store(key, url, response.status_code, response.headers, response.content,
+                         final_url=response.url, request_headers=request_headers)
+    if not stored and entry is not None:
+        cache.discard(key)
+    response.from_cache = False
+    return response
+
+
+class _RecordingBody:
+    """Iterates over a streamed body, keeping a copy until it grows past ``limit`` bytes."""
+
+    def __init__(self, chunks, limit):
+        self._chunks = chunks
+        self._limit = limit
+        self.body = bytearray()
+        self.complete = False
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self.body is not None:
+                self.body += chunk
+                if len(self.body) > self._limit:
+                    self.body = None
+            yield chunk
+        self.complete = True
+
+
+def _replay_chunks(body, chunk_size):
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+@contextlib.contextmanager
+def cached_stream(url, headers=None, cache=None, chunk_size=64 * 1024, record_limit=None, **kwargs):
+    """Like ``cached_get``, but yields ``(response, chunks)`` so large bodies can be processed as they arrive.
+
+    A fresh entry, or a stale one the server answers with 304, is replayed
+    from the cache in chunks. Otherwise the body is streamed from the network
+    and stored once fully read, if it is cacheable and no larger than
+    ``record_limit`` bytes (``STREAM_CACHE_MAX_BYTES`` by default). A copy is
+    only kept while the body stays under that limit, so a huge body costs no
+    more memory than its chunks.
+    """
+    cache = cache or get_cache()
+    request_headers = {**get_session().headers, **(headers or {})}
+    key = cache_key(url, request_headers)
+    entry = cache.lookup(key)
+    if entry is not None and entry.is_fresh():
+        cache.record_hit()
+        yield _response_from_entry(entry), _replay_chunks(entry.body, chunk_size)
+        return
+
+    conditional = dict(headers or {})
+    if entry is not None:
+        conditional.update(entry.validators())
+    with get(url, headers=conditional, stream=True, **kwargs) as response:
+        if entry is not None and response.status_code == 304:
+            cache.refresh(key, response.headers)
+            cache.record_hit()
+            entry = cache.lookup(key) or entry
+            yield _response_from_entry(entry), _replay_chunks(entry.body, chunk_size)
+            return
+
+        cache.record_miss()
+        response.from_cache = False
+        limit = min(cache.max_bytes, STREAM_CACHE_MAX_BYTES if record_limit is None else record_limit)
+        declared = response.headers.get("Content-Length", "")
+        if (not cache.storable(response.status_code, response.headers, request_headers)
+                or (declared.isdigit() and int(declared) > limit)):
+            if entry is not None:
+                cache.discard(key)
+            yield response, response.iter_content(chunk_size)
+            return
+        recording = _RecordingBody(response.iter_content(chunk_size), limit)
+        yield response, recording
+        stored = recording.complete and recording.body is not None and cache.store(
+            key, url, response.status_code, response.headers, bytes(recording.body),
+            final_url=response.url, request_headers=request_headers)
+        if not stored and entry is not None:
+            cache.discard(key)
+
+
+def fetch_html(url, timeout=None, headers=None):
+    """Fetch a page and return its HTML, or None if it can't be retrieved."""
+    kwargs = {"headers": headers}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    try:
+        response = cached_get(url, **kwargs)
+        return response.text if response.status_code == 200 else None
+    except requests.RequestException:
+        return None
@@ -0,0 +1,217 @@
+"""Image size and dimension probing without downloading whole images.
+
+``probe_image`` sends one ranged GET for the first few KB of the file. The
+byte size comes from its Content-Range total and the pixel dimensions from
+the file header (PNG, JPEG, GIF, WebP and AVIF headers all put them near
+the start). A HEAD is only sent when that response gives no size. Images
+are never downloaded whole: an SVG, or any format whose header can't be
+read, is reported with its size and type from the headers and no dimensions.
+
+``ImageAnalysis`` probes all of a page's images once, in parallel, and
+serves every later lookup (averages, gallery, recommendations) from memory.
+"""
+import os
+import struct
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from seo_auditor import fetch
+
+# Bytes requested up front, and the most read before giving up on the header
+# (JPEGs with large EXIF/ICC segments put the frame header further in)
+PROBE_BYTES = 16 * 1024
+MAX_PROBE_BYTES = 128 * 1024
+
+# Images probed at once by ImageAnalysis.run
+IMAGE_WORKERS = int(os.getenv("SEO_AUDITOR_IMAGE_WORKERS", "8"))
+
+# What probe_image found out about an image; any field may be None
+ImageProbe = namedtuple("ImageProbe", ["size_kb", "dimensions", "content_type"], defaults=(None, None, None))
+
+# JPEG start-of-frame markers (excluding DHT, JPG and DAC, which share the range)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _png_size(data):
+    if len(data) >= 24 and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    return None
+
+
+def _gif_size(data):
+    if len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    return None
+
+
+def _jpeg_size(data):
+    index = 2
+    while index + 4 <= len(data):
+        if data[index] != 0xFF:
+            return None
+        marker = data[index + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            index += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            index += 2
+            continue
+        length = struct.unpack(">H", data[index + 2:index + 4])[0]
+        if marker in _JPEG_SOF:
+            if index + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[index + 5:index + 9])
+            return width, height
+        index += 2 + length
+    return None
+
+
+def _webp_size(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        b0, b1, b2, b3 = data[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = 1 + int.from_bytes(data[24:27], "little")
+        height = 1 + int.from_bytes(data[27:30], "little")
+        return width, height
+    return None
+
+
+def _avif_size(data):
+    # The image spatial extents ('ispe') property: version/flags, width, height
+    index = data.find(b"ispe")
+    if index == -1 or index + 16 > len(data):
+        return None
+    return struct.unpack(">II", data[index + 8:index + 16])
+
+
+def image_dimensions(data):
+    """(width, height) from the start of an image file, or None if unknown or truncated."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return _png_size(data)
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return _gif_size(data)
+    if data.startswith(b"\xff\xd8"):
+        return _jpeg_size(data)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _webp_size(data)
+    if data[4:8] == b"ftyp":
+        return _avif_size(data)
+    return None
+
+
+def _content_length(response):
+    # A compressed transfer's length isn't the image's size
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _total_from_range(response):
+    # Content-Range: bytes 0-16383/482113
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _content_type(response):
+    return response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower() or None
+
+
+def _read_header(url, timeout):
+    """Stream up to MAX_PROBE_BYTES until the dimensions parse; returns (size, dimensions, status, type)."""
+    response = fetch.get(url, headers={"Range": f"bytes=0-{PROBE_BYTES - 1}"}, stream=True, timeout=timeout)
+    try:
+        if response.status_code not in (200, 206):
+            return None, None, response.status_code, None
+        size = _total_from_range(response) if response.status_code == 206 else _content_length(response)
+        content_type = _content_type(response)
+        if content_type == "image/svg+xml":
+            # Vector images have no pixel size to read
+            return size, None, response.status_code, content_type
+        data = b""
+        dimensions = None
+        for chunk in response.iter_content(4096):
+            data += chunk
+            dimensions = image_dimensions(data)
+            if dimensions or len(data) >= MAX_PROBE_BYTES:
+                break
+        else:
+            # The server ignored the range and the whole (small) image arrived
+            if response.status_code == 200:
+                size = len(data)
+        return size, dimensions, response.status_code, content_type
+    finally:
+        response.close()
+
+
+def probe_image(url, timeout=5):
+    """Return an ``ImageProbe`` (size in KB, (width, height), MIME type) for an image URL.
+
+    Costs a few KB of GET for most images, plus a HEAD when the server
+    reports no total size for the range.
+    """
+    try:
+        size, dimensions, status, content_type = _read_header(url, timeout)
+        if status not in (200, 206):
+            return ImageProbe()
+        if size is None:
+            head = fetch.head(url, timeout=timeout)
+            if head.status_code == 200:
+                size = _content_length(head)
+                content_type = content_type or _content_type(head)
+    except requests.RequestException:
+        return ImageProbe()
+    return ImageProbe(size / 1024 if size is not None else None, dimensions, content_type)
+
+
+class ImageAnalysis:
+    """Per-audit memo of ``probe_image`` results, keyed by image URL."""
+
+    def __init__(self, probe=probe_image, max_workers=IMAGE_WORKERS):
+        self.probe = probe
+        self.max_workers = max_workers
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def run(self, urls, progress=None):
+        """Probe every URL not analysed yet, concurrently; returns all results so far.
+
+        ``progress(fraction)`` is called as each probe finishes.
+        """
+        with self._lock:
+            pending = [url for url in dict.fromkeys(urls) if url not in self._results]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                futures = {executor.submit(self.probe, url): url for url in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        result = future.result()
+                    except Exception:
+                        result = ImageProbe()
+                    with self._lock:
+                        self._results[futures[future]] = result
+                    if progress is not None:
+                        progress(done / len(pending))
+        return dict(self._results)
+
+    def get(self, url):
+        """The ``ImageProbe`` for ``url``, probing it now if ``run`` didn't."""
+        with self._lock:
+            if url in self._results:
+                return self._results[url]
+        result = self.probe(url)
+        with self._lock:
+            return self._results.setdefault(url, result)
@@ -0,0 +1,151 @@
+"""Flattening PageSpeed Insights responses into table rows, and back.
+
+A PSI response is a multi-megabyte JSON document of which the pages use a
+few dozen numbers and a handful of diagnostics tables. ``run_metrics`` pulls
+out the headline figures (category scores, lab metrics, CrUX field data) as
+one typed row; ``audit_rows`` gives one row per Lighthouse audit and
+``item_rows`` one row per diagnostics item. ``rebuild_response`` turns the
+rows back into a PSI-shaped document holding everything the pages read, for
+when the raw response wasn't kept.
+"""
+import json
+
+CATEGORIES = ("performance", "accessibility", "best-practices", "seo")
+
+# Lab metric column -> Lighthouse audit whose numericValue it holds
+LAB_METRICS = {
+    "lcp_ms": "largest-contentful-paint",
+    "fcp_ms": "first-contentful-paint",
+    "cls": "cumulative-layout-shift",
+    "tbt_ms": "total-blocking-time",
+    "speed_index_ms": "speed-index",
+    "interactive_ms": "interactive",
+    "ttfb_ms": "server-response-time",
+}
+
+# Field metric column -> CrUX metric whose 75th percentile it holds
+FIELD_METRICS = {
+    "field_lcp_ms": "LARGEST_CONTENTFUL_PAINT_MS",
+    "field_fcp_ms": "FIRST_CONTENTFUL_PAINT_MS",
+    "field_inp_ms": "INTERACTION_TO_NEXT_PAINT",
+    "field_cls": "CUMULATIVE_LAYOUT_SHIFT_SCORE",
+    "field_ttfb_ms": "EXPERIMENTAL_TIME_TO_FIRST_BYTE",
+}
+
+# Audits whose item lists are traces rather than diagnostics; only their scores are kept
+UNITEMIZED_AUDITS = {
+    "network-requests", "main-thread-tasks", "network-rtt", "network-server-latency",
+    "script-treemap-data", "screenshot-thumbnails", "final-screenshot", "full-page-screenshot",
+}
+
+# Item fields stored in their own columns; anything else goes into ``extra`` as JSON
+ITEM_COLUMNS = {"url": "url", "totalBytes": "total_bytes", "wastedBytes": "wasted_bytes", "wastedMs": "wasted_ms"}
+
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def category_column(category):
+    return category.replace("-", "_") + "_score"
+
+
+def run_metrics(data):
+    """One row of headline figures: category scores (0-1), lab metrics and field percentiles."""
+    lighthouse = data.get("lighthouseResult", {})
+    categories = lighthouse.get("categories", {})
+    audits = lighthouse.get("audits", {})
+    field = data.get("loadingExperience", {})
+    row = {
+        "final_url": lighthouse.get("finalUrl") or lighthouse.get("finalDisplayedUrl"),
+        "lighthouse_version": lighthouse.get("lighthouseVersion"),
+        "field_category": field.get("overall_category"),
+    }
+    for category in CATEGORIES:
+        row[category_column(category)] = _number(categories.get(category, {}).get("score"))
+    for column, audit in LAB_METRICS.items():
+        row[column] = _number(audits.get(audit, {}).get("numericValue"))
+    for column, metric in FIELD_METRICS.items():
+        value = _number(field.get("metrics", {}).get(metric, {}).get("percentile"))
+        # CrUX reports CLS multiplied by 100
+        row[column] = value / 100 if value is not None and column == "field_cls" else value
+    return row
+
+
+def audit_rows(data):
+    """``(audit_id, score, numeric_value, numeric_unit, display_value, details_type)`` per audit."""
+    for audit_id, audit in data.get("lighthouseResult", {}).get("audits", {}).items():
+        yield (
+            audit_id,
+            _number(audit.get("score")),
+            _number(audit.get("numericValue")),
+            audit.get("numericUnit"),
+            audit.get("displayValue"),
+            audit.get("details", {}).get("type"),
+        )
+
+
+def item_rows(data):
+    """``(audit_id, position, url, total_bytes, wasted_bytes, wasted_ms, extra)`` per diagnostics item."""
+    for audit_id, audit in data.get("lighthouseResult", {}).get("audits", {}).items():
+        details = audit.get("details", {})
+        if audit_id in UNITEMIZED_AUDITS or details.get("type") not in ("opportunity", "table"):
+            continue
+        for position, item in enumerate(details.get("items", [])):
+            if not isinstance(item, dict):
+                continue
+            url = item.get("url") if isinstance(item.get("url"), str) else None
+            extra = {key: value for key, value in item.items() if key not in ITEM_COLUMNS or (key == "url" and url is None)}
+            yield (
+                audit_id,
+                position,
+                url,
+                _number(item.get("totalBytes")),
+                _number(item.get("wastedBytes")),
+                _number(item.get("wastedMs")),
+                json.dumps(extra) if extra else None,
+            )
+
+
+def rebuild_response(run, audits, items):
+    """A PSI-shaped document from a ``run_metrics`` row, ``audit_rows`` and ``item_rows``."""
+    rebuilt_audits = {}
+    for audit_id, score, numeric_value, numeric_unit, display_value, details_type in audits:
+        audit = {"id": audit_id, "score": score}
+        if numeric_value is not None:
+            audit["numericValue"] = numeric_value
+        if numeric_unit is not None:
+            audit["numericUnit"] = numeric_unit
+        if display_value is not None:
+            audit["displayValue"] = display_value
+        if details_type is not None:
+            audit["details"] = {"type": details_type}
+        rebuilt_audits[audit_id] = audit
+    for audit_id, _, url, total_bytes, wasted_bytes, wasted_ms, extra in sorted(items, key=lambda row: (row[0], row[1])):
+        item = json.loads(extra) if extra else {}
+        for key, value in (("url", url), ("totalBytes", total_bytes), ("wastedBytes", wasted_bytes), ("wastedMs", wasted_ms)):
+            if value is not None:
+                item[key] = value
+        details = rebuilt_audits.setdefault(audit_id, {"id": audit_id}).setdefault("details", {})
+        details.setdefault("items", []).append(item)
+
+    categories = {
+        category: {"id": category, "score": run[category_column(category)]}
+        for category in CATEGORIES if run.get(category_column(category)) is not None
+    }
+    metrics = {}
+    for column, metric in FIELD_METRICS.items():
+        value = run.get(column)
+        if value is not None:
+            metrics[metric] = {"percentile": value * 100 if column == "field_cls" else value}
+    response = {
+        "lighthouseResult": {
+            "finalUrl": run.get("final_url"),
+            "lighthouseVersion": run.get("lighthouse_version"),
+            "categories": categories,
+            "audits": rebuilt_audits,
+        },
+    }
+    if metrics or run.get("field_category"):
+        response["loadingExperience"] = {"metrics": metrics, "overall_category": run.get("field_category")}
+    return response
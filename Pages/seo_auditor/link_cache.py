@@ -0,0 +1,118 @@
+"""Persistent store of link-status results shared across audits.
+
+Backlinks audits keep re-checking the same external targets (social
+profiles, CDNs, partner sites). Results are stored by normalized URL with
+the time they were checked, and each status class has its own lifetime so
+broken links are rechecked much sooner than healthy ones. The store lives
+next to the response cache in ``SEO_AUDITOR_CACHE_DIR``.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from seo_auditor.cache import DEFAULT_CACHE_DIR
+
+# Seconds a result stays valid, by the ``status_class`` of the result
+DEFAULT_TTLS = {
+    "active-status": int(os.getenv("SEO_AUDITOR_LINK_TTL_ACTIVE", str(7 * 24 * 3600))),
+    "redirect-status": int(os.getenv("SEO_AUDITOR_LINK_TTL_REDIRECT", str(24 * 3600))),
+    "broken-status": int(os.getenv("SEO_AUDITOR_LINK_TTL_BROKEN", "3600")),
+}
+
+# Maximum number of keys per SELECT ... IN (...) (SQLite's variable limit)
+_LOOKUP_BATCH = 500
+
+
+class LinkStatusCache:
+    """SQLite store of ``check_link_status`` results with a TTL per status class."""
+
+    def __init__(self, path=None, ttls=None):
+        if path is None:
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            path = os.path.join(DEFAULT_CACHE_DIR, "link_status.sqlite3")
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS link_status (
+                url TEXT PRIMARY KEY,
+                status_code TEXT NOT NULL,
+                final_url TEXT NOT NULL,
+                result TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.commit()
+
+    def ttl_for(self, result):
+        return self.ttls.get(result.get("status_class"), self.ttls["broken-status"])
+
+    def lookup_many(self, keys):
+        """Return ``{key: result}`` for every key with an unexpired result."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start:start + _LOOKUP_BATCH]
+                placeholders = ", ".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT url, result FROM link_status WHERE expires_at > ? AND url IN ({placeholders})",
+                    (now, *batch),
+                ).fetchall()
+                for url, result in rows:
+                    found[url] = json.loads(result)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def store_many(self, results):
+        """Store ``(key, result)`` pairs, stamping each with its expiry."""
+        now = time.time()
+        rows = [
+            (key, str(result["status_code"]), result["final_url"], json.dumps(result), now, now + self.ttl_for(result))
+            for key, result in results
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO link_status VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def purge_expired(self):
+        """Delete expired results; returns the number removed."""
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM link_status WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM link_status").fetchone()[0]
+        return {"entries": count, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM link_status")
+            self._db.commit()
+        self.hits = self.misses = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_link_cache():
+    """Return the process-wide link-status store, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LinkStatusCache()
+    return _cache
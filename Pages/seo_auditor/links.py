@@ -0,0 +1,322 @@
+"""Link status checking for the Backlinks & Authority page.
+
+``check_links`` schedules the checks from an asyncio event loop with a
+global concurrency budget and a cap per host, so pages with thousands of
+links finish quickly without hammering any single origin. The requests
+themselves are blocking ``requests`` calls through the pooled session in
+``seo_auditor.fetch``, run on a thread pool of ``max_concurrency`` threads,
+so connections to each host are kept alive and reused. A thread can't be
+cancelled, so the time a check may take is enforced by the requests
+``timeout`` (``REQUEST_TIMEOUT`` per request, at most two requests per
+check); the overall ``CHECK_TIMEOUT`` only stops waiting for a check that
+overruns, and its thread finishes in the background.
+
+Navigation menus repeat the same targets many times over, differing only in
+fragment, trailing slash or tracking parameters. Links are normalized first
+and each distinct URL is checked once; its result is then copied to every
+link that points at it. Set ``SEO_AUDITOR_IGNORED_PARAMS`` to a
+comma-separated list of query parameters to drop (``utm_*`` style prefixes
+allowed) instead of the built-in tracking list.
+
+Results are also kept in the persistent ``LinkStatusCache``, so targets
+checked by a recent audit are not requested again.
+
+When a server refuses HEAD, the fallback is a ranged GET for the first byte
+that is closed without reading the body, so a link to a video or PDF costs a
+few hundred bytes instead of the whole file. Hosts that refused HEAD are
+remembered and later links to them go straight to the ranged GET.
+"""
+import asyncio
+import inspect
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from seo_auditor import fetch
+from seo_auditor.cache import normalize_url
+from seo_auditor.link_cache import get_link_cache
+
+# Total checks in flight at once, and at most this many against one host
+MAX_CONCURRENCY = 50
+PER_HOST_LIMIT = 4
+
+# (connect, read) seconds for each request; a check (HEAD plus a GET fallback) fits in CHECK_TIMEOUT
+REQUEST_TIMEOUT = (3, 4)
+CHECK_TIMEOUT = 15
+
+# Query parameters that only track the click and never change the target
+TRACKING_PARAMS = [
+    "utm_*", "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi",
+]
+
+
+def ignored_params():
+    """Query parameter patterns dropped during normalization."""
+    configured = os.getenv("SEO_AUDITOR_IGNORED_PARAMS")
+    if configured is None:
+        return TRACKING_PARAMS
+    return [name.strip() for name in configured.split(",") if name.strip()]
+
+
+def _is_ignored(name, patterns):
+    name = name.lower()
+    for pattern in patterns:
+        pattern = pattern.lower()
+        if pattern.endswith("*") and name.startswith(pattern[:-1]):
+            return True
+        if name == pattern:
+            return True
+    return False
+
+
+def normalize_link(url, ignore=None, strip_trailing_slash=True):
+    """Canonical form of ``url`` used to spot links to the same target.
+
+    Lower-cases scheme and host, drops default ports, the fragment and
+    ignored query parameters, sorts the remaining parameters and (by
+    default) removes a trailing slash from the path.
+    """
+    if ignore is None:
+        ignore = ignored_params()
+    scheme, netloc, path, query, _ = urlsplit(normalize_url(url))
+    if strip_trailing_slash and len(path) > 1:
+        path = path.rstrip("/") or "/"
+    params = [(name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+              if not _is_ignored(name, ignore)]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(params)), ""))
+
+
+def link_key(url, **kwargs):
+    """``normalize_link(url)``, or the URL itself when it can't be parsed (e.g. a bad port)."""
+    try:
+        return normalize_link(url, **kwargs)
+    except ValueError:
+        return url
+
+
+def dedupe_links(urls, **kwargs):
+    """Group ``urls`` by normalized form.
+
+    Returns ``(unique, slots)``: the first URL seen for each target, and for
+    every input URL the index of its target in ``unique``. Extra keyword
+    arguments are passed to ``normalize_link``.
+    """
+    index = {}
+    unique = []
+    slots = []
+    for url in urls:
+        key = link_key(url, **kwargs)
+        if key not in index:
+            index[key] = len(unique)
+            unique.append(url.split("#", 1)[0])
+        slots.append(index[key])
+    return unique, slots
+
+
+# HEAD responses that mean "try GET instead"
+HEAD_REJECTED = {403, 405}
+
+# Hosts that answered HEAD with one of HEAD_REJECTED this session
+_get_only_hosts = set()
+_hosts_lock = threading.Lock()
+
+
+def _host(url):
+    return (urlsplit(url).hostname or "").lower()
+
+
+def prefers_get(url):
+    """True when ``url``'s host is known to reject HEAD."""
+    return _host(url) in _get_only_hosts
+
+
+def remember_get_only(url):
+    with _hosts_lock:
+        _get_only_hosts.add(_host(url))
+
+
+def forget_host_methods():
+    with _hosts_lock:
+        _get_only_hosts.clear()
+
+
+def ranged_get(href, timeout=REQUEST_TIMEOUT):
+    """GET only the first byte of ``href`` and close without reading the body.
+
+    Returns ``(response, range_honored)``. Servers that ignore Range answer
+    200 with the full body, which is never downloaded because the streamed
+    response is closed straight away.
+    """
+    response = fetch.get(href, headers={"Range": "bytes=0-0"}, stream=True, timeout=timeout)
+    try:
+        range_honored = response.status_code in (206, 416) or "Content-Range" in response.headers
+    finally:
+        response.close()
+    return response, range_honored
+
+
+def _status_for(status_code):
+    if status_code == 200:
+        return "✅ Active", "active-status"
+    elif 300 <= status_code < 400:
+        return "🔄 Redirected", "redirect-status"
+    return "⚠️ Broken", "broken-status"
+
+
+def broken_result(status_code="N/A"):
+    return {
+        "status": "❌ Broken",
+        "status_class": "broken-status",
+        "final_url": "-",
+        "status_code": status_code,
+    }
+
+
+def check_link_status(href, timeout=REQUEST_TIMEOUT):
+    """HEAD the link (falling back to a ranged GET when HEAD isn't allowed) and classify it."""
+    method = "HEAD"
+    range_honored = None
+    try:
+        if prefers_get(href):
+            status_code = None
+        else:
+            response = fetch.head(href, timeout=timeout)
+            status_code = response.status_code
+            final_url = response.url if response.url != href else "-"
+            status, status_class = _status_for(status_code)
+
+        # If head request doesn't work (or never does on this host), try a ranged GET
+        if status_code is None or status_code in HEAD_REJECTED:
+            try:
+                get_response, range_honored = ranged_get(href, timeout=timeout)
+                method = "GET"
+                # A partial (or unsatisfiable) range still means the resource is there
+                get_status = 200 if get_response.status_code in (206, 416) else get_response.status_code
+                if status_code is not None and get_status not in HEAD_REJECTED:
+                    remember_get_only(href)
+                status_code = get_status
+                final_url = get_response.url if get_response.url != href else "-"
+                status, status_class = _status_for(status_code)
+            except requests.RequestException:
+                if status_code is None:
+                    return broken_result()
+    except requests.RequestException:
+        return broken_result()
+
+    return {
+        "status": status,
+        "status_class": status_class,
+        "final_url": final_url,
+        "status_code": status_code,
+        "method": method,
+        "range_honored": range_honored,
+    }
+
+
+async def _notify(progress, done, total):
+    if progress is None:
+        return
+    result = progress(done, total)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def check_links(urls, max_concurrency=MAX_CONCURRENCY, per_host=PER_HOST_LIMIT,
+                      timeout=CHECK_TIMEOUT, progress=None, checker=check_link_status,
+                      dedupe=True, cache=None):
+    """Check every URL concurrently and return results in the same order.
+
+    ``checker(url)`` runs on a thread pool and should bound its own run time
+    (``check_link_status`` does through the requests timeout); after
+    ``timeout`` seconds a check is reported as ``"Timeout"`` without waiting
+    for its thread.
+
+    With ``dedupe`` each distinct target is requested once and links to it
+    get a copy of its result. Every result carries the link's own ``href``
+    and the ``checked_url`` that was requested for it, whose redirects
+    ``final_url`` describes. Unexpired results in ``cache`` (the shared
+    link-status store by default, ``False`` to disable) are reused without a
+    request; every result carries ``from_cache``. ``progress(done, total)``
+    is called after each network check finishes; it may be a plain function
+    or a coroutine function.
+    """
+    urls = list(urls)
+    if dedupe:
+        targets, slots = dedupe_links(urls)
+    else:
+        targets, slots = urls, range(len(urls))
+    if cache is None:
+        cache = get_link_cache()
+
+    keys = [link_key(url) for url in targets]
+    cached = cache.lookup_many(keys) if cache else {}
+    results = [None] * len(targets)
+    pending = []
+    for index, key in enumerate(keys):
+        if key in cached:
+            results[index] = {**cached[key], "from_cache": True}
+        else:
+            pending.append(index)
+
+    checked = await _check_all([targets[index] for index in pending], max_concurrency,
+                               per_host, timeout, progress, checker)
+    fresh = []
+    for index, result in zip(pending, checked):
+        results[index] = {**result, "from_cache": False}
+        # A timeout says more about this run than about the link
+        if result["status_code"] != "Timeout":
+            fresh.append((keys[index], result))
+    if cache:
+        cache.store_many(fresh)
+
+    # Each row keeps its own href; ``checked_url`` is the form that was requested for the whole group
+    return [{**results[slot], "href": url, "checked_url": targets[slot]} for url, slot in zip(urls, slots)]
+
+
+async def _check_all(urls, max_concurrency, per_host, timeout, progress, checker):
+    total = len(urls)
+    results = [None] * total
+    if not total:
+        return results
+
+    loop = asyncio.get_running_loop()
+    budget = asyncio.Semaphore(max_concurrency)
+    host_limits = {}
+    done = 0
+
+    def host_limit(url):
+        host = _host(url)
+        if host not in host_limits:
+            host_limits[host] = asyncio.Semaphore(per_host)
+        return host_limits[host]
+
+    async def run(index, url, executor):
+        nonlocal done
+        async with host_limit(url), budget:
+            try:
+                results[index] = await asyncio.wait_for(
+                    loop.run_in_executor(executor, checker, url), timeout
+                )
+            except asyncio.TimeoutError:
+                results[index] = broken_result("Timeout")
+            except Exception:
+                results[index] = broken_result()
+        done += 1
+        await _notify(progress, done, total)
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        await asyncio.gather(*(run(index, url, executor) for index, url in enumerate(urls)))
+    finally:
+        # Don't block the loop on a request that already timed out
+        executor.shutdown(wait=False)
+    return results
+
+
+def check_links_sync(urls, **kwargs):
+    """Run ``check_links`` to completion from synchronous code (e.g. a Streamlit script)."""
+    return asyncio.run(check_links(urls, **kwargs))
@@ -0,0 +1,337 @@
+"""PageSpeed Insights client shared by the Site Performance and Technical SEO pages.
+
+A PSI run takes 10-30 seconds and uses API quota, so Lighthouse results are
+stored on disk keyed by (normalized URL, strategy, categories) and reused
+for ``SEO_AUDITOR_PSI_TTL`` seconds. The store keeps scores, metrics and
+diagnostics in typed tables (see ``lighthouse``) for trend queries. Identical requests made while a run is
+in flight (another session, or the other page) wait for that run instead of
+starting their own. Failed runs are never stored.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+import requests
+
+from seo_auditor import fetch, lighthouse
+from seo_auditor.cache import DEFAULT_CACHE_DIR, normalize_url
+
+API_URL = "https://www.googleapis.com/pagespeedonline/v5/runPagespeed"
+
+# Environment variable holding the Google API key (the name the pages have always used)
+API_KEY_ENV = "Google_ApI_key"
+
+PSI_TTL = int(os.getenv("SEO_AUDITOR_PSI_TTL", str(6 * 3600)))
+
+# (connect, read) timeout; Lighthouse runs server-side before the response starts
+PSI_TIMEOUT = (10, 90)
+
+STRATEGIES = ("mobile", "desktop")
+DEFAULT_CATEGORIES = ("performance",)
+
+# Whether full responses are kept (compressed) alongside the normalized tables
+PSI_KEEP_RAW = os.getenv("SEO_AUDITOR_PSI_KEEP_RAW", "1").lower() not in ("0", "false", "no")
+
+# Columns of ``runs`` filled from ``lighthouse.run_metrics``
+_RUN_COLUMNS = (
+    ("final_url", "lighthouse_version")
+    + tuple(lighthouse.category_column(category) for category in lighthouse.CATEGORIES)
+    + tuple(lighthouse.LAB_METRICS)
+    + tuple(lighthouse.FIELD_METRICS)
+    + ("field_category",)
+)
+
+# Bumped whenever the schema changes; ``_migrate`` upgrades older files step by step
+SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    url TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    categories TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    final_url TEXT,
+    lighthouse_version TEXT,
+    {", ".join(f"{column} REAL" for column in _RUN_COLUMNS[2:-1])},
+    field_category TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_key ON runs (key, fetched_at);
+CREATE INDEX IF NOT EXISTS runs_by_url ON runs (url, strategy, fetched_at);
+CREATE TABLE IF NOT EXISTS audits (
+    run_id INTEGER NOT NULL,
+    audit_id TEXT NOT NULL,
+    score REAL,
+    numeric_value REAL,
+    numeric_unit TEXT,
+    display_value TEXT,
+    details_type TEXT,
+    PRIMARY KEY (run_id, audit_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS audit_items (
+    run_id INTEGER NOT NULL,
+    audit_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT,
+    total_bytes REAL,
+    wasted_bytes REAL,
+    wasted_ms REAL,
+    extra TEXT,
+    PRIMARY KEY (run_id, audit_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS raw_responses (
+    run_id INTEGER PRIMARY KEY,
+    body BLOB NOT NULL
+);
+"""
+
+
+# HTTP statuses worth retrying: rate limiting and server-side failures
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PageSpeedError(Exception):
+    """PSI could not produce a Lighthouse result; the message is fit to show users.
+
+    ``status`` is the API's HTTP status, or None when no response arrived.
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def transient(self):
+        """Whether trying again later might succeed."""
+        return self.status is None or self.status in TRANSIENT_STATUSES
+
+
+def normalize_categories(categories):
+    return tuple(sorted({category.strip().lower().replace("_", "-") for category in categories}))
+
+
+def psi_key(url, strategy, categories):
+    raw = "\n".join([normalize_url(url), strategy, ",".join(normalize_categories(categories))])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PageSpeedCache:
+    """SQLite store of PSI results, normalized into typed tables.
+
+    Each run becomes a row of ``runs`` (category scores, lab metrics, field
+    percentiles), one ``audits`` row per Lighthouse audit and one
+    ``audit_items`` row per diagnostics item, and is kept after it expires so
+    ``history`` and ``audit_history`` can chart trends without parsing JSON.
+    With ``keep_raw`` the full response is also stored, zlib-compressed, until
+    it expires; otherwise lookups return a response rebuilt from the tables.
+    """
+
+    def __init__(self, path=None, ttl=PSI_TTL, keep_raw=PSI_KEEP_RAW):
+        if path is None:
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            path = os.path.join(DEFAULT_CACHE_DIR, "pagespeed.sqlite3")
+        self.path = path
+        self.ttl = ttl
+        self.keep_raw = keep_raw
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+
+    def _migrate(self):
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Version 0 kept whole responses as JSON text in psi_results
+            self._db.execute("DROP TABLE IF EXISTS psi_results")
+        self._db.executescript(_SCHEMA)
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.commit()
+
+    def _fresh_run(self, key):
+        return self._db.execute(
+            "SELECT id FROM runs WHERE key = ? AND fetched_at > ? ORDER BY fetched_at DESC LIMIT 1",
+            (key, time.time() - self.ttl),
+        ).fetchone()
+
+    def lookup(self, key):
+        """The stored PSI response for ``key``, or None if missing or expired."""
+        with self._lock:
+            row = self._fresh_run(key)
+            if row is not None:
+                data = self._response(row[0])
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def _response(self, run_id):
+        raw = self._db.execute("SELECT body FROM raw_responses WHERE run_id = ?", (run_id,)).fetchone()
+        if raw is not None:
+            return json.loads(zlib.decompress(raw[0]))
+        cursor = self._db.execute(f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs WHERE id = ?", (run_id,))
+        run = dict(zip(_RUN_COLUMNS, cursor.fetchone()))
+        audits = self._db.execute(
+            "SELECT audit_id, score, numeric_value, numeric_unit, display_value, details_type FROM audits WHERE run_id = ?",
+            (run_id,),
+        ).fetchall()
+        items = self._db.execute(
+            "SELECT audit_id, position, url, total_bytes, wasted_bytes, wasted_ms, extra FROM audit_items WHERE run_id = ?",
+            (run_id,),
+        ).fetchall()
+        return lighthouse.rebuild_response(run, audits, items)
+
+    def store(self, key, url, strategy, categories, data):
+        metrics = lighthouse.run_metrics(data)
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                f"INSERT INTO runs (key, url, strategy, categories, fetched_at, {', '.join(_RUN_COLUMNS)}) "
+                f"VALUES (?, ?, ?, ?, ?, {', '.join('?' * len(_RUN_COLUMNS))})",
+                (key, normalize_url(url), strategy, ",".join(normalize_categories(categories)), now,
+                 *(metrics[column] for column in _RUN_COLUMNS)),
+            )
+            run_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT OR REPLACE INTO audits VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, *row) for row in lighthouse.audit_rows(data)),
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO audit_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((run_id, *row) for row in lighthouse.item_rows(data)),
+            )
+            if self.keep_raw:
+                self._db.execute(
+                    "INSERT INTO raw_responses VALUES (?, ?)",
+                    (run_id, zlib.compress(json.dumps(data).encode("utf-8"), 6)),
+                )
+            # Raw responses only serve lookups; the tables keep the history
+            self._db.execute(
+                "DELETE FROM raw_responses WHERE run_id IN (SELECT id FROM runs WHERE fetched_at <= ?)", (now - self.ttl,)
+            )
+            self._db.commit()
+
+    def history(self, url, strategy=None, limit=None):
+        """Stored runs for ``url``, oldest first, as dicts of the ``runs`` columns."""
+        columns = ("strategy", "categories", "fetched_at") + _RUN_COLUMNS
+        query = f"SELECT {', '.join(columns)} FROM runs WHERE url = ?"
+        params = [normalize_url(url)]
+        if strategy is not None:
+            query += " AND strategy = ?"
+            params.append(strategy)
+        query += " ORDER BY fetched_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [dict(zip(columns, row)) for row in reversed(rows)]
+
+    def audit_history(self, url, audit_id, strategy=None):
+        """``(fetched_at, strategy, score, numeric_value)`` for one audit across ``url``'s runs, oldest first."""
+        query = ("SELECT runs.fetched_at, runs.strategy, audits.score, audits.numeric_value "
+                 "FROM audits JOIN runs ON runs.id = audits.run_id WHERE runs.url = ? AND audits.audit_id = ?")
+        params = [normalize_url(url), audit_id]
+        if strategy is not None:
+            query += " AND runs.strategy = ?"
+            params.append(strategy)
+        with self._lock:
+            return self._db.execute(query + " ORDER BY runs.fetched_at", params).fetchall()
+
+    def stats(self):
+        with self._lock:
+            runs, fresh = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(fetched_at > ?), 0) FROM runs", (time.time() - self.ttl,)
+            ).fetchone()
+            raw_bytes = self._db.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM raw_responses").fetchone()[0]
+        return {"entries": fresh, "runs": runs, "raw_bytes": raw_bytes, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            for table in ("raw_responses", "audit_items", "audits", "runs"):
+                self._db.execute(f"DELETE FROM {table}")
+            self._db.commit()
+        self.hits = self.misses = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Runs in progress, so identical requests share one
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def get_psi_cache():
+    """Return the process-wide PSI result cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageSpeedCache()
+    return _cache
+
+
+def call_pagespeed_api(url, strategy, categories, api_key=None, timeout=PSI_TIMEOUT):
+    """One PSI API request; returns the response JSON or raises PageSpeedError."""
+    params = [("url", url), ("strategy", strategy)]
+    params += [("category", category.upper().replace("-", "_")) for category in normalize_categories(categories)]
+    api_key = api_key or os.getenv(API_KEY_ENV)
+    if api_key:
+        params.append(("key", api_key))
+    try:
+        response = fetch.get(API_URL, params=params, timeout=timeout)
+        data = response.json()
+    except requests.Timeout:
+        raise PageSpeedError("PageSpeed Insights timed out. Please try again.")
+    except (requests.RequestException, ValueError) as e:
+        raise PageSpeedError(f"Could not reach PageSpeed Insights: {e}")
+    if "error" in data:
+        raise PageSpeedError(data["error"].get("message", f"PageSpeed API returned HTTP {response.status_code}"), response.status_code)
+    if "lighthouseResult" not in data:
+        raise PageSpeedError("Invalid response from PageSpeed API. Please check your API key or URL.", response.status_code)
+    return data
+
+
+def run_pagespeed(url, strategy="mobile", categories=DEFAULT_CATEGORIES, api_key=None, cache=None, refresh=False):
+    """The PSI response for ``url``: cached if fresh, else shared with an identical run in flight.
+
+    ``refresh`` skips the cache lookup (the new result still replaces it).
+    Raises PageSpeedError when no result could be produced.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+    cache = cache or get_psi_cache()
+    key = psi_key(url, strategy, categories)
+    if not refresh:
+        data = cache.lookup(key)
+        if data is not None:
+            return data
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        data = call_pagespeed_api(url, strategy, categories, api_key)
+        cache.store(key, url, strategy, categories, data)
+    except BaseException as error:
+        future.set_exception(error)
+        raise
+    else:
+        future.set_result(data)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+    return data
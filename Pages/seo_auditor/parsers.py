@@ -0,0 +1,298 @@
+"""Interchangeable HTML parser backends.
+
+``html.parser`` (through BeautifulSoup) is the slowest parser available and
+takes seconds on multi-megabyte pages, so the audit parses through the
+fastest backend that is installed:
+
+* ``selectolax`` - the lexbor engine (falls back to modest on old versions)
+* ``lxml`` - libxml2's HTML parser
+* ``html.parser`` - BeautifulSoup with the standard-library parser, always available
+
+Every backend returns a page wrapper with the same small API: ``title()``,
+``find_all(*tags)``, ``walk()`` and elements exposing ``tag``, ``attrs``,
+``text()`` and ``find_all(*tags)``. Attribute values are always plain
+strings (``rel`` and ``class`` are not split into lists) so results compare
+equal across backends.
+Set ``SEO_AUDITOR_PARSER`` to force a particular backend.
+"""
+import os
+
+BACKEND_PREFERENCE = ["selectolax", "lxml", "html.parser"]
+
+# Event kinds yielded by ``ParsedPage.walk()``
+START, END, TEXT = 0, 1, 2
+
+
+def collapse_whitespace(text):
+    return " ".join(text.split())
+
+
+class Element:
+    """Backend-neutral view of one HTML element."""
+
+    __slots__ = ("node", "tag", "_attrs")
+
+    def __init__(self, node, tag):
+        self.node = node
+        self.tag = tag
+        self._attrs = None
+
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            self._attrs = self._read_attrs()
+        return self._attrs
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    def _read_attrs(self):
+        raise NotImplementedError
+
+    def text(self):
+        """All descendant text, concatenated as in the source."""
+        raise NotImplementedError
+
+    def find_all(self, *tags):
+        """Descendant elements with one of ``tags``, in document order."""
+        raise NotImplementedError
+
+    def walk(self):
+        """Yield (START, element), (TEXT, string) and (END, tag) events for this subtree."""
+        raise NotImplementedError
+
+    def find(self, *tags):
+        found = self.find_all(*tags)
+        return found[0] if found else None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.tag}>"
+
+
+class ParsedPage:
+    """A parsed document; ``find_all`` searches the whole tree."""
+
+    backend = None
+
+    def __init__(self, root):
+        self.root = root
+
+    def find_all(self, *tags):
+        return self.root.find_all(*tags) if self.root is not None else []
+
+    def find(self, *tags):
+        found = self.find_all(*tags)
+        return found[0] if found else None
+
+    def walk(self):
+        """Events for the whole document in a single depth-first pass."""
+        return self.root.walk() if self.root is not None else iter(())
+
+    def title(self):
+        """Text of the first <title>, or None."""
+        title = self.find("title")
+        return title.text() if title is not None else None
+
+
+# --- html.parser (BeautifulSoup) ---
+class SoupElement(Element):
+    __slots__ = ()
+
+    def _read_attrs(self):
+        return {name: value if value is not None else "" for name, value in self.node.attrs.items()}
+
+    def text(self):
+        return self.node.get_text()
+
+    def find_all(self, *tags):
+        return [SoupElement(node, node.name) for node in self.node.find_all(list(tags))]
+
+    def walk(self):
+        from bs4 import CData, NavigableString, Tag
+        if self.tag == "[document]":
+            stack = [(child, False) for child in reversed(self.node.contents)]
+        else:
+            stack = [(self.node, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                yield END, node.name
+            elif isinstance(node, Tag):
+                yield START, SoupElement(node, node.name)
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node.contents))
+            elif type(node) in (NavigableString, CData):
+                # Comments, doctypes and script/style strings are other subclasses
+                yield TEXT, str(node)
+
+
+class HtmlParserBackend:
+    name = "html.parser"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse(self, html):
+        soup = self._soup(html, "html.parser", multi_valued_attributes=None)
+        page = ParsedPage(SoupElement(soup, "[document]"))
+        page.backend = self
+        return page
+
+
+# --- lxml ---
+class LxmlElement(Element):
+    __slots__ = ()
+
+    def _read_attrs(self):
+        return dict(self.node.attrib)
+
+    def text(self):
+        return self.node.text_content()
+
+    def find_all(self, *tags):
+        return [LxmlElement(node, node.tag) for node in self.node.iter(*tags) if node is not self.node]
+
+    def walk(self):
+        stack = [(self.node, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                yield END, node.tag
+            elif isinstance(node.tag, str):
+                yield START, LxmlElement(node, node.tag)
+                if node.text:
+                    yield TEXT, node.text
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(node))
+                continue
+            # Text following an element (or a comment) belongs to the parent
+            if node.tail and node is not self.node:
+                yield TEXT, node.tail
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        self._lxml_html = lxml.html
+        # Always feed bytes: lxml refuses str input that carries an XML encoding declaration
+        self._parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def parse(self, html):
+        try:
+            root = self._lxml_html.document_fromstring(html.encode("utf-8", "surrogatepass"), parser=self._parser)
+        except Exception:
+            # lxml rejects empty or whitespace-only documents
+            root = None
+        page = ParsedPage(LxmlElement(root, root.tag) if root is not None else None)
+        page.backend = self
+        return page
+
+
+# --- selectolax ---
+class SelectolaxElement(Element):
+    __slots__ = ()
+
+    def _read_attrs(self):
+        return {name: value if value is not None else "" for name, value in self.node.attributes.items()}
+
+    def text(self):
+        return self.node.text(deep=True)
+
+    def find_all(self, *tags):
+        if len(tags) == 1:
+            return [SelectolaxElement(node, node.tag) for node in self.node.css(tags[0])]
+        wanted = set(tags)
+        return [
+            SelectolaxElement(node, node.tag)
+            for node in self.node.traverse()
+            if node.tag in wanted and node is not self.node
+        ]
+
+    def walk(self):
+        stack = [(self.node, False)]
+        while stack:
+            node, closing = stack.pop()
+            if closing:
+                yield END, node.tag
+            elif node.is_element_node:
+                yield START, SelectolaxElement(node, node.tag)
+                stack.append((node, True))
+                children = []
+                child = node.child
+                while child is not None:
+                    children.append(child)
+                    child = child.next
+                stack.extend((child, False) for child in reversed(children))
+            elif node.is_text_node:
+                yield TEXT, node.text(deep=False)
+
+
+class SelectolaxBackend:
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as parser_class
+        except ImportError:
+            from selectolax.parser import HTMLParser as parser_class
+        self._parser_class = parser_class
+
+    def parse(self, html):
+        tree = self._parser_class(html)
+        root = tree.root
+        page = ParsedPage(SelectolaxElement(root, root.tag) if root is not None else None)
+        page.backend = self
+        return page
+
+
+BACKENDS = {
+    "selectolax": SelectolaxBackend,
+    "lxml": LxmlBackend,
+    "html.parser": HtmlParserBackend,
+}
+
+_instances = {}
+
+
+def load_backend(name):
+    """Instantiate the named backend; raises ImportError if it isn't installed."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def available_backends():
+    """Names of the backends that can be loaded here, fastest first."""
+    names = []
+    for name in BACKEND_PREFERENCE:
+        try:
+            load_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_backend(name=None):
+    """Return the requested backend, or the fastest installed one."""
+    name = name or os.getenv("SEO_AUDITOR_PARSER")
+    if name:
+        return load_backend(name)
+    for candidate in BACKEND_PREFERENCE:
+        try:
+            return load_backend(candidate)
+        except ImportError:
+            continue
+    raise ImportError("No HTML parser backend is installed (install beautifulsoup4)")
+
+
+def parse(html, backend=None):
+    """Parse ``html`` with ``backend`` (a name or instance), auto-selecting by default."""
+    if backend is None or isinstance(backend, str):
+        backend = get_backend(backend)
+    return backend.parse(html)
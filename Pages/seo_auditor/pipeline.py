@@ -0,0 +1,117 @@
+"""Audits as an explicit pipeline of stages with real progress reporting.
+
+Each ``Stage`` names the stages it needs; ``run_pipeline`` starts every stage
+as soon as its inputs are ready, so independent stages (image probing and
+readability scoring, say) run at the same time on a small thread pool.
+Progress events are delivered on the calling thread, which is what Streamlit
+needs to update a progress bar, and the reported fraction only moves when
+work actually completes. A stage can report finer progress through the
+``report`` callable it receives.
+"""
+import queue
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+STARTED, PROGRESS, DONE = "started", "progress", "done"
+
+ProgressEvent = namedtuple("ProgressEvent", ["stage", "label", "status", "fraction"])
+
+
+class Stage:
+    """One step of an audit: ``func(results, report)`` returns this stage's result.
+
+    ``results`` maps the names of finished stages to their results;
+    ``report(fraction)`` may be called from the stage to show partial progress.
+    ``weight`` is the stage's share of the progress bar.
+    """
+
+    def __init__(self, name, label, func, requires=(), weight=1):
+        self.name = name
+        self.label = label
+        self.func = func
+        self.requires = tuple(requires)
+        self.weight = weight
+
+
+class StageFailed(Exception):
+    """A stage raised; ``stage`` is its name and the original error is chained."""
+
+    def __init__(self, stage, error):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def run_pipeline(stages, progress=None, max_workers=4, results=None):
+    """Run ``stages`` respecting their dependencies; returns ``{name: result}``.
+
+    ``progress(event)`` receives a ProgressEvent whenever a stage starts,
+    reports progress or finishes. The first failing stage stops the
+    pipeline (stages already running are allowed to finish) and raises
+    StageFailed.
+    """
+    stages = list(stages)
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [name for name in stage.requires if name not in by_name and name not in (results or {})]
+        if missing:
+            raise ValueError(f"Stage {stage.name} requires unknown stage(s): {', '.join(missing)}")
+
+    results = dict(results or {})
+    total_weight = sum(stage.weight for stage in stages) or 1
+    partial = {}
+    events = queue.Queue()
+    waiting = [stage for stage in stages if stage.name not in results]
+    running = set()
+    failure = None
+
+    def fraction():
+        done = sum(by_name[name].weight for name in results if name in by_name)
+        return min(1.0, (done + sum(by_name[name].weight * part for name, part in partial.items())) / total_weight)
+
+    def emit(stage, status):
+        if progress is not None:
+            progress(ProgressEvent(stage.name, stage.label, status, fraction()))
+
+    def run(stage, inputs):
+        def report(part):
+            events.put((PROGRESS, stage.name, max(0.0, min(1.0, part))))
+        try:
+            events.put((DONE, stage.name, stage.func(inputs, report)))
+        except Exception as error:
+            events.put((None, stage.name, error))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while waiting or running:
+            if failure is None:
+                for stage in [stage for stage in waiting if all(name in results for name in stage.requires)]:
+                    waiting.remove(stage)
+                    running.add(stage.name)
+                    partial[stage.name] = 0.0
+                    emit(stage, STARTED)
+                    executor.submit(run, stage, dict(results))
+            if not running:
+                if waiting and failure is None:
+                    raise ValueError("Stage dependencies form a cycle: " + ", ".join(stage.name for stage in waiting))
+                break
+
+            kind, name, value = events.get()
+            stage = by_name[name]
+            if kind == PROGRESS:
+                if name in running:
+                    partial[name] = value
+                    emit(stage, PROGRESS)
+                continue
+            running.discard(name)
+            partial.pop(name, None)
+            if kind == DONE:
+                results[name] = value
+                emit(stage, DONE)
+            elif failure is None:
+                failure = StageFailed(name, value)
+                failure.__cause__ = value
+
+    if failure is not None:
+        raise failure
+    return results
+
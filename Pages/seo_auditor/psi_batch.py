@@ -0,0 +1,238 @@
+"""PageSpeed Insights for many URLs within the API's rate and daily quota.
+
+``PageSpeedBatch`` turns a URL list into one job per (URL, strategy), so the
+mobile and desktop runs of a page go out side by side, and works through
+them on a thread pool. Requests are spaced to at most
+``SEO_AUDITOR_PSI_QPS`` per second and counted against a daily budget of
+``SEO_AUDITOR_PSI_DAILY_QUOTA`` requests. Rate limiting and server errors
+are retried with exponential backoff. Job state and quota use live in a
+SQLite file, so an interrupted batch resumes where it stopped, and results
+go into the shared PSI cache, where cached results cost no quota.
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from seo_auditor.lighthouse import run_metrics
+from seo_auditor.pagespeed import (
+    DEFAULT_CATEGORIES,
+    STRATEGIES,
+    PageSpeedError,
+    get_psi_cache,
+    psi_key,
+    run_pagespeed,
+)
+
+PSI_QPS = float(os.getenv("SEO_AUDITOR_PSI_QPS", "1"))
+PSI_DAILY_QUOTA = int(os.getenv("SEO_AUDITOR_PSI_DAILY_QUOTA", "25000"))
+
+# A PSI run takes 10-30 s, so this many in flight are needed to keep up with the rate
+DEFAULT_WORKERS = 8
+
+MAX_ATTEMPTS = 4
+
+# Seconds before the first retry; doubled on each attempt (plus jitter), capped
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+# ``run_metrics`` columns reported per job, after the performance score
+CWV_COLUMNS = ("lcp_ms", "fcp_ms", "cls", "tbt_ms", "speed_index_ms", "ttfb_ms",
+               "field_lcp_ms", "field_inp_ms", "field_cls", "field_category")
+
+
+def quota_day(now=None):
+    """The quota day ``now`` falls in; PSI quotas reset at midnight Pacific time (UTC-8 here)."""
+    now = time.time() if now is None else now
+    return time.strftime("%Y-%m-%d", time.gmtime(now - 8 * 3600))
+
+
+class RateLimiter:
+    """Spaces calls to ``wait`` at least 1/qps seconds apart across threads."""
+
+    def __init__(self, qps):
+        self.interval = 1.0 / qps if qps else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def core_web_vitals(data):
+    """Lab metrics and CrUX field data from a PSI response, flattened for a table row."""
+    metrics = run_metrics(data)
+    score = metrics["performance_score"]
+    return {
+        "performance_score": round(score * 100) if score is not None else None,
+        **{column: metrics[column] for column in CWV_COLUMNS},
+    }
+
+
+class BatchState:
+    """SQLite file holding every job's status and the quota used per day."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                position INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (url, strategy)
+            )"""
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+        self._db.commit()
+
+    def add(self, urls, strategies):
+        """Queue a job per URL and strategy; jobs already known keep their state."""
+        now = time.time()
+        with self._lock:
+            start = self._db.execute("SELECT COALESCE(MAX(position), 0) FROM jobs").fetchone()[0]
+            self._db.executemany(
+                "INSERT OR IGNORE INTO jobs (url, strategy, status, position, updated_at) VALUES (?, ?, ?, ?, ?)",
+                ((url, strategy, PENDING, start + i, now)
+                 for i, (url, strategy) in enumerate((url, strategy) for url in urls for strategy in strategies)),
+            )
+            self._db.commit()
+
+    def pending(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, strategy, attempts FROM jobs WHERE status = ? ORDER BY position", (PENDING,)
+            ).fetchall()
+
+    def finish(self, url, strategy, status, attempts, error=None):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, error = ?, updated_at = ? WHERE url = ? AND strategy = ?",
+                (status, attempts, error, time.time(), url, strategy),
+            )
+            self._db.commit()
+
+    def spend(self, limit, day=None):
+        """Record one request against today's quota; False (and nothing recorded) if it is used up."""
+        day = day or quota_day()
+        with self._lock:
+            row = self._db.execute("SELECT used FROM quota WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            if used >= limit:
+                return False
+            self._db.execute("INSERT OR REPLACE INTO quota VALUES (?, ?)", (day, used + 1))
+            self._db.commit()
+        return True
+
+    def used(self, day=None):
+        with self._lock:
+            row = self._db.execute("SELECT used FROM quota WHERE day = ?", (day or quota_day(),)).fetchone()
+        return row[0] if row else 0
+
+    def counts(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def reset(self):
+        """Forget every job (quota use is kept)."""
+        with self._lock:
+            self._db.execute("DELETE FROM jobs")
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+class PageSpeedBatch:
+    """Runs PSI for a URL list under a rate limit and a daily quota, resumably."""
+
+    def __init__(self, state_path, qps=PSI_QPS, daily_quota=PSI_DAILY_QUOTA, workers=DEFAULT_WORKERS,
+                 strategies=STRATEGIES, categories=DEFAULT_CATEGORIES, max_attempts=MAX_ATTEMPTS,
+                 backoff=BACKOFF_BASE, api_key=None, cache=None):
+        self.state = BatchState(state_path)
+        self.limiter = RateLimiter(qps)
+        self.daily_quota = daily_quota
+        self.workers = workers
+        self.strategies = tuple(strategies)
+        self.categories = tuple(categories)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.api_key = api_key
+        self.cache = cache or get_psi_cache()
+        self.quota_exhausted = False
+        self._stop = threading.Event()
+
+    def _delay(self, attempt):
+        return min(BACKOFF_MAX, self.backoff * 2 ** (attempt - 1)) * (1 + random.random() / 2)
+
+    def run_job(self, url, strategy, attempts=0):
+        """Run one job to completion; returns ``(status, attempts, data or error message)``."""
+        data = self.cache.lookup(psi_key(url, strategy, self.categories))
+        if data is not None:
+            return DONE, attempts, data
+        while not self._stop.is_set():
+            if not self.state.spend(self.daily_quota):
+                self.quota_exhausted = True
+                self._stop.set()
+                break
+            self.limiter.wait()
+            attempts += 1
+            try:
+                data = run_pagespeed(url, strategy, self.categories, api_key=self.api_key, cache=self.cache, refresh=True)
+                return DONE, attempts, data
+            except PageSpeedError as e:
+                if not e.transient or attempts >= self.max_attempts:
+                    return FAILED, attempts, str(e)
+                # Back off, waking early if the batch is stopped
+                self._stop.wait(self._delay(attempts))
+        return PENDING, attempts, None
+
+    def run(self, urls, on_result=None):
+        """Queue ``urls`` and run every pending job; returns the job counts by status.
+
+        ``on_result(url, strategy, status, data_or_error)`` is called on the
+        calling thread as jobs finish. Jobs left when the quota runs out stay
+        pending for the next run.
+        """
+        self.state.add(urls, self.strategies)
+        self._stop.clear()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="psi")
+        try:
+            futures = {
+                executor.submit(self.run_job, url, strategy, attempts): (url, strategy)
+                for url, strategy, attempts in self.state.pending()
+            }
+            for future in as_completed(futures):
+                url, strategy = futures[future]
+                status, attempts, outcome = future.result()
+                if status == PENDING:
+                    continue
+                self.state.finish(url, strategy, status, attempts, None if status == DONE else outcome)
+                if on_result is not None:
+                    on_result(url, strategy, status, outcome)
+        finally:
+            # On an interrupt, stop retries and leave unfinished jobs pending
+            self._stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        return Counter(self.state.counts())
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self.state.close()
@@ -0,0 +1,261 @@
+"""robots.txt fetching, parsing and analysis, shared by the Reports page, the batch CLI and the crawler.
+
+``parse_robots`` reads a robots.txt in one pass into per-user-agent rule
+groups (RFC 9309). ``RobotsTxt.matcher`` compiles the group that applies to a
+crawler into a ``PathMatcher``: rules are ordered by specificity once, so
+checking a path is a few ``startswith`` calls (or a precompiled regex for
+rules with ``*`` and ``$`` wildcards) and the longest matching rule wins,
+Allow over Disallow on ties. ``analyze_robots_txt`` builds its report from
+the same parse.
+"""
+import re
+from urllib.parse import urlparse, urlsplit
+
+import requests
+
+from seo_auditor import fetch
+
+
+def fetch_robots_txt(url):
+    """Fetch robots.txt content from a website with enhanced error handling."""
+    try:
+        # Parse the base URL to get the domain
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        robots_url = f"{base_url}/robots.txt"
+        
+        response = fetch.cached_get(robots_url, timeout=10)
+        headers = dict(response.headers)
+        
+        if response.status_code == 200:
+            return {"status": "success", "content": response.text, "url": robots_url, "http_status": response.status_code, "headers": headers}
+        elif response.status_code == 404:
+            return {"status": "error", "message": "Robots.txt file not found (404)", "url": robots_url, "http_status": response.status_code, "headers": headers}
+        else:
+            return {"status": "error", "message": f"Failed to fetch robots.txt: HTTP {response.status_code}", "url": robots_url, "http_status": response.status_code, "headers": headers}
+    except requests.exceptions.ConnectionError:
+        return {"status": "error", "message": "Connection error - unable to connect to server", "url": robots_url if 'robots_url' in locals() else "unknown"}
+    except requests.exceptions.Timeout:
+        return {"status": "error", "message": "Request timed out when fetching robots.txt", "url": robots_url if 'robots_url' in locals() else "unknown"}
+    except requests.exceptions.TooManyRedirects:
+        return {"status": "error", "message": "Too many redirects when fetching robots.txt", "url": robots_url if 'robots_url' in locals() else "unknown"}
+    except Exception as e:
+        return {"status": "error", "message": f"Error fetching robots.txt: {str(e)}", "url": robots_url if 'robots_url' in locals() else "unknown"}
+
+
+class RuleGroup:
+    """The rules and crawl delay that apply to the user agents named in one group."""
+
+    def __init__(self, user_agents):
+        self.user_agents = user_agents
+        self.rules = []         # (allow, pattern) in file order
+        self.crawl_delay = None
+
+    def as_dict(self):
+        return {
+            "user_agents": self.user_agents,
+            "allow": [pattern for allow, pattern in self.rules if allow],
+            "disallow": [pattern for allow, pattern in self.rules if not allow],
+            "crawl_delay": self.crawl_delay,
+        }
+
+
+def _compile_rule(pattern):
+    """A predicate telling whether a path matches a robots.txt rule pattern."""
+    anchored = pattern.endswith("$")
+    if anchored:
+        pattern = pattern[:-1]
+    if "*" not in pattern and not anchored:
+        return lambda path: path.startswith(pattern)
+    regex = ".*".join(re.escape(part) for part in re.split(r"\*+", pattern))
+    return re.compile(regex + (r"\Z" if anchored else "")).match
+
+
+class PathMatcher:
+    """Compiled Allow/Disallow rules for one user agent."""
+
+    def __init__(self, rules, crawl_delay=None):
+        self.crawl_delay = crawl_delay
+        # Most specific first, Allow before Disallow at equal length: the first match decides
+        ordered = sorted((rule for rule in rules if rule[1]), key=lambda rule: (-len(rule[1]), not rule[0]))
+        self._rules = [(allow, _compile_rule(pattern)) for allow, pattern in ordered]
+
+    def allowed(self, url):
+        """Whether ``url`` (or a path starting with "/") may be crawled."""
+        if url.startswith("/"):
+            path = url
+        else:
+            parts = urlsplit(url)
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        if path == "/robots.txt":
+            return True
+        for allow, matches in self._rules:
+            if matches(path):
+                return allow
+        return True
+
+
+class RobotsTxt:
+    """A parsed robots.txt: rule groups, sitemaps and a few line counts."""
+
+    def __init__(self):
+        self.groups = []
+        self.sitemaps = []
+        self.line_count = 0
+        self.empty_lines = 0
+        self.allow_count = 0
+        self.disallow_count = 0
+        self._matchers = {}
+
+    def groups_for(self, user_agent):
+        """Groups for the most specific agent token matching ``user_agent``, else the "*" groups."""
+        product = user_agent.lower()
+        best = None
+        for group in self.groups:
+            for agent in group.user_agents:
+                if agent != "*" and product.startswith(agent) and (best is None or len(agent) > len(best)):
+                    best = agent
+        best = best or "*"
+        return [group for group in self.groups if best in group.user_agents]
+
+    def matcher(self, user_agent="*"):
+        """The compiled rules that apply to ``user_agent`` (built once per agent)."""
+        if user_agent not in self._matchers:
+            groups = self.groups_for(user_agent)
+            rules = [rule for group in groups for rule in group.rules]
+            delays = [group.crawl_delay for group in groups if group.crawl_delay is not None]
+            self._matchers[user_agent] = PathMatcher(rules, delays[0] if delays else None)
+        return self._matchers[user_agent]
+
+
+def parse_robots(content):
+    """Tokenize robots.txt ``content`` into a RobotsTxt in one pass over its lines."""
+    robots = RobotsTxt()
+    group = None
+    in_agent_lines = False
+    for line in content.splitlines():
+        robots.line_count += 1
+        if not line.strip():
+            robots.empty_lines += 1
+            continue
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        field, colon, value = line.partition(":")
+        if not colon:
+            continue
+        field, value = field.strip().lower(), value.strip()
+
+        if field == "user-agent":
+            # Consecutive User-agent lines share one group
+            if not in_agent_lines:
+                group = RuleGroup([])
+                robots.groups.append(group)
+                in_agent_lines = True
+            group.user_agents.append(value.lower())
+            continue
+        if field == "sitemap":
+            # Not part of any group
+            robots.sitemaps.append(value)
+            continue
+        in_agent_lines = False
+        if field in ("allow", "disallow"):
+            if field == "allow":
+                robots.allow_count += 1
+            else:
+                robots.disallow_count += 1
+            if group is not None:
+                group.rules.append((field == "allow", value))
+        elif field == "crawl-delay" and group is not None:
+            try:
+                group.crawl_delay = float(value)
+            except ValueError:
+                pass
+    return robots
+
+
+def analyze_robots_txt(robots_content, robots=None):
+    """Perform detailed analysis of robots.txt content (``robots`` if it was already parsed)."""
+    if not robots_content or robots_content.get("status") != "success":
+        return {
+            "sitemaps": [],
+            "user_agents": [],
+            "groups": [],
+            "disallow_count": 0,
+            "allow_count": 0,
+            "crawl_delay": None,
+            "has_wildcard_agent": False,
+            "has_sitemap": False,
+            "issues": []
+        }
+    
+    robots = robots or parse_robots(robots_content["content"])
+    
+    user_agents = {agent for group in robots.groups for agent in group.user_agents}
+    has_wildcard_agent = "*" in user_agents
+    
+    # The delay that applies to crawlers without a group of their own, else the first one set
+    crawl_delay = robots.matcher("*").crawl_delay
+    if crawl_delay is None:
+        crawl_delay = next((group.crawl_delay for group in robots.groups if group.crawl_delay is not None), None)
+    
+    # Identify issues
+    issues = []
+    
+    if not has_wildcard_agent:
+        issues.append({
+            "type": "warning",
+            "message": "No wildcard user-agent (*) found. Some crawlers might not have specific instructions."
+        })
+    
+    if robots.disallow_count == 0:
+        issues.append({
+            "type": "warning",
+            "message": "No Disallow directives found. This may allow crawlers to access all areas of your site."
+        })
+    
+    if not robots.sitemaps:
+        issues.append({
+            "type": "opportunity",
+            "message": "No Sitemap directives found in robots.txt. Adding sitemap URL helps search engines discover your content."
+        })
+    
+    if crawl_delay and crawl_delay > 1:
+        issues.append({
+            "type": "warning",
+            "message": f"Crawl-delay of {crawl_delay} seconds might be too high and could slow down indexing."
+        })
+    
+    if robots.empty_lines > robots.line_count / 2:
+        issues.append({
+            "type": "opportunity",
+            "message": "Robots.txt contains many empty lines. Consider cleaning it up for better readability."
+        })
+    
+    # Check for potentially problematic patterns: a group shutting its agents out of the whole site
+    for group in robots.groups:
+        blocks_site = any(not allow and pattern in ("/", "/*") for allow, pattern in group.rules)
+        if not blocks_site or PathMatcher(group.rules).allowed("/"):
+            continue
+        if "*" in group.user_agents:
+            issues.append({
+                "type": "critical",
+                "message": "Found 'Disallow: /' which blocks all crawlers from the entire site. This may prevent indexing."
+            })
+        else:
+            issues.append({
+                "type": "warning",
+                "message": f"Found 'Disallow: /' which blocks {', '.join(group.user_agents)} from the entire site."
+            })
+    
+    return {
+        "sitemaps": robots.sitemaps,
+        "user_agents": sorted(user_agents),
+        "groups": [group.as_dict() for group in robots.groups],
+        "disallow_count": robots.disallow_count,
+        "allow_count": robots.allow_count,
+        "crawl_delay": crawl_delay,
+        "has_wildcard_agent": has_wildcard_agent,
+        "has_sitemap": len(robots.sitemaps) > 0,
+        "issues": issues
+    }
@@ -0,0 +1,184 @@
+"""Disk-backed store of website screenshots and their thumbnails.
+
+A preview is keyed by the normalized URL, the browser viewport and the hash
+of the page's HTML, so any session auditing an unchanged page reuses the
+stored capture instead of driving a browser. Each entry keeps the full PNG
+and a downscaled WebP thumbnail, which is what the Home page displays.
+Entries expire after ``SEO_AUDITOR_SCREENSHOT_TTL`` seconds and the store is
+kept under ``SEO_AUDITOR_SCREENSHOT_MAX_BYTES`` with LRU eviction.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from io import BytesIO
+
+from seo_auditor import browser
+from seo_auditor.cache import DEFAULT_CACHE_DIR, normalize_url
+
+SCREENSHOT_TTL = int(os.getenv("SEO_AUDITOR_SCREENSHOT_TTL", str(24 * 3600)))
+SCREENSHOT_MAX_BYTES = int(os.getenv("SEO_AUDITOR_SCREENSHOT_MAX_BYTES", str(64 * 1024 * 1024)))
+
+THUMBNAIL_WIDTH = 640
+THUMBNAIL_QUALITY = 80
+
+
+def viewport_name(size=browser.WINDOW_SIZE):
+    return f"{size[0]}x{size[1]}"
+
+
+def screenshot_key(url, viewport, digest):
+    raw = "\n".join([normalize_url(url), viewport, digest])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def make_thumbnail(png, width=THUMBNAIL_WIDTH, quality=THUMBNAIL_QUALITY):
+    """Downscale a PNG screenshot to a WebP ``width`` pixels wide (the PNG itself without PIL)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return png
+    img = Image.open(BytesIO(png))
+    if img.width > width:
+        img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    out = BytesIO()
+    img.save(out, "WEBP", quality=quality)
+    return out.getvalue()
+
+
+class ScreenshotStore:
+    """SQLite store of screenshots with a TTL and a total size limit."""
+
+    def __init__(self, path=None, ttl=SCREENSHOT_TTL, max_bytes=SCREENSHOT_MAX_BYTES):
+        if path is None:
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            path = os.path.join(DEFAULT_CACHE_DIR, "screenshots.sqlite3")
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS screenshots (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                viewport TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                png BLOB NOT NULL,
+                thumbnail BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS screenshots_lru ON screenshots (last_access)")
+        self._db.commit()
+
+    def lookup(self, key, full=False):
+        """The stored thumbnail (or full PNG) for ``key``, or None if missing or expired."""
+        column = "png" if full else "thumbnail"
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {column} FROM screenshots WHERE key = ? AND stored_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE screenshots SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        self.hits += 1
+        return row[0]
+
+    def store(self, key, url, viewport, digest, png, thumbnail):
+        size = len(png) + len(thumbnail)
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO screenshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), viewport, digest, sqlite3.Binary(png), sqlite3.Binary(thumbnail), size, now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+        return True
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM screenshots WHERE stored_at <= ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM screenshots").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM screenshots ORDER BY last_access").fetchall():
+            self._db.execute("DELETE FROM screenshots WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM screenshots"
+            ).fetchone()
+        return {"entries": count, "size_bytes": size, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM screenshots")
+            self._db.commit()
+        self.hits = self.misses = 0
+
+
+_store = None
+_store_lock = threading.Lock()
+
+# Captures in progress, so concurrent sessions auditing the same page share one
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide screenshot store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ScreenshotStore()
+    return _store
+
+
+def _capture_and_store(key, url, viewport, digest, store):
+    try:
+        png = browser.capture_screenshot(url)
+        thumbnail = make_thumbnail(png)
+        store.store(key, url, viewport, digest, png, thumbnail)
+        return thumbnail
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def request_preview(url, digest, store=None):
+    """Future resolving to the WebP thumbnail of ``url`` as served with content ``digest``.
+
+    Completes immediately from the store when the page is unchanged;
+    otherwise a pooled browser captures it in the background.
+    """
+    store = store or get_store()
+    viewport = viewport_name()
+    key = screenshot_key(url, viewport, digest)
+    thumbnail = store.lookup(key)
+    if thumbnail is not None:
+        future = Future()
+        future.set_result(thumbnail)
+        return future
+    with _inflight_lock:
+        if key not in _inflight:
+            _inflight[key] = browser.submit(_capture_and_store, key, url, viewport, digest, store)
+        return _inflight[key]
@@ -0,0 +1,233 @@
+"""Compact set of URLs already seen by a crawl or sitemap expansion.
+
+A Python set of URL strings costs well over 100 bytes per entry, which is
+gigabytes for the millions of URLs a large site can produce. ``SeenSet``
+keeps only a 64-bit fingerprint of each key in an array-backed
+open-addressing table (about 11 bytes per entry at the maximum load factor).
+Past ``SEO_AUDITOR_SEEN_SPILL_ENTRIES`` entries the table is merged into a
+sorted file on disk and emptied; lookups then binary-search the memory-mapped
+file. An optional Bloom filter in front answers most lookups for new URLs
+without touching the table or the disk.
+
+Two different URLs share a fingerprint with probability about n² / 2⁶⁵
+(under one in a million for six million URLs), in which case the second is
+treated as already seen.
+"""
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import tempfile
+import weakref
+from array import array
+
+from seo_auditor.cache import DEFAULT_CACHE_DIR
+
+SPILL_ENTRIES = int(os.getenv("SEO_AUDITOR_SEEN_SPILL_ENTRIES", "2000000"))
+
+INITIAL_SLOTS = 1024
+MAX_LOAD = 0.7
+
+BLOOM_ERROR_RATE = 0.01
+
+# Fingerprints read at a time while merging a spill file
+_MERGE_CHUNK = 65536
+
+
+def fingerprint(key):
+    """64-bit fingerprint of ``key`` (never 0, which marks an empty slot)."""
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1
+
+
+class BloomFilter:
+    """Bit array sized for ``capacity`` fingerprints at ``error_rate`` false positives."""
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        self.bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def add(self, fp):
+        # Double hashing on the two halves of the fingerprint
+        position, step, bits, bit_array = fp & 0xFFFFFFFF, (fp >> 32) | 1, self.bits, self._array
+        for _ in range(self.hashes):
+            position %= bits
+            bit_array[position >> 3] |= 1 << (position & 7)
+            position += step
+
+    def __contains__(self, fp):
+        position, step, bits, bit_array = fp & 0xFFFFFFFF, (fp >> 32) | 1, self.bits, self._array
+        for _ in range(self.hashes):
+            position %= bits
+            if not bit_array[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+        return True
+
+    @property
+    def nbytes(self):
+        return len(self._array)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SeenSet:
+    """Set of keys stored as 64-bit fingerprints, spilling to disk when large.
+
+    ``add(key)`` returns True when the key is new. ``bloom_capacity`` sizes an
+    optional Bloom filter for that many keys; ``spill_entries`` is how many
+    fingerprints stay in memory before being moved to a file in ``spill_dir``.
+    """
+
+    def __init__(self, bloom_capacity=None, spill_entries=SPILL_ENTRIES, spill_dir=None):
+        self.spill_entries = spill_entries
+        self.spill_dir = spill_dir
+        self.bloom_capacity = bloom_capacity
+        self.bloom = BloomFilter(bloom_capacity) if bloom_capacity else None
+        self._table = array("Q", [0]) * INITIAL_SLOTS
+        self._count = 0
+        self._spilled = 0
+        self._spill_file = None
+        self._spill_map = None
+        self._spill_view = None
+        self._finalizer = None
+
+    # --- memory table ---
+    def _probe(self, fp):
+        table = self._table
+        mask = len(table) - 1
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == 0 or slot == fp:
+                return i
+            i = (i + 1) & mask
+
+    def _grow(self):
+        old = self._table
+        self._table = array("Q", [0]) * (len(old) * 2)
+        for fp in old:
+            if fp:
+                self._table[self._probe(fp)] = fp
+
+    # --- disk ---
+    def _on_disk(self, fp):
+        view = self._spill_view
+        if view is None:
+            return False
+        low, high = 0, len(view)
+        while low < high:
+            middle = (low + high) // 2
+            if view[middle] < fp:
+                low = middle + 1
+            else:
+                high = middle
+        return low < len(view) and view[low] == fp
+
+    def _spilled_chunks(self):
+        view = self._spill_view
+        if view is None:
+            return
+        for start in range(0, len(view), _MERGE_CHUNK):
+            yield from view[start:start + _MERGE_CHUNK].tolist()
+
+    def _close_spill(self):
+        if self._spill_view is not None:
+            self._spill_view.release()
+            self._spill_map.close()
+            self._spill_file.close()
+        self._spill_view = self._spill_map = self._spill_file = None
+
+    def spill(self):
+        """Merge the in-memory fingerprints into the sorted spill file."""
+        if not self._count:
+            return
+        spill_dir = self.spill_dir or DEFAULT_CACHE_DIR
+        os.makedirs(spill_dir, exist_ok=True)
+        fd, merged_path = tempfile.mkstemp(prefix="seen-", suffix=".bin", dir=spill_dir)
+        in_memory = sorted(fp for fp in self._table if fp)
+        buffer = array("Q")
+        with os.fdopen(fd, "wb") as merged:
+            for fp in heapq.merge(in_memory, self._spilled_chunks()):
+                buffer.append(fp)
+                if len(buffer) >= _MERGE_CHUNK:
+                    buffer.tofile(merged)
+                    del buffer[:]
+            buffer.tofile(merged)
+
+        self._close_spill()
+        if self._finalizer is not None:
+            self._finalizer()
+        self._finalizer = weakref.finalize(self, _remove, merged_path)
+        self._spill_file = open(merged_path, "rb")
+        self._spill_map = mmap.mmap(self._spill_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._spill_view = memoryview(self._spill_map).cast("Q")
+        self._spilled += self._count
+        self._table = array("Q", [0]) * INITIAL_SLOTS
+        self._count = 0
+
+    # --- set interface ---
+    def _contains_fingerprint(self, fp):
+        if self.bloom is not None and fp not in self.bloom:
+            return False
+        return self._table[self._probe(fp)] == fp or self._on_disk(fp)
+
+    def add_fingerprint(self, fp):
+        maybe_seen = self.bloom is None or fp in self.bloom
+        slot = self._probe(fp)
+        if maybe_seen and (self._table[slot] == fp or self._on_disk(fp)):
+            return False
+        self._table[slot] = fp
+        self._count += 1
+        if self.bloom is not None:
+            self.bloom.add(fp)
+        if self._count >= self.spill_entries:
+            self.spill()
+        elif self._count > len(self._table) * MAX_LOAD:
+            self._grow()
+        return True
+
+    def add(self, key):
+        """Add ``key``; returns True if it was not seen before."""
+        return self.add_fingerprint(fingerprint(key))
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        return self._contains_fingerprint(fingerprint(key))
+
+    def __len__(self):
+        return self._count + self._spilled
+
+    def fingerprints(self):
+        """Every stored fingerprint (for checkpoints; re-add with ``add_fingerprint``)."""
+        yield from (fp for fp in self._table if fp)
+        yield from self._spilled_chunks()
+
+    def stats(self):
+        return {
+            "entries": len(self),
+            "memory_bytes": self._table.itemsize * len(self._table) + (self.bloom.nbytes if self.bloom else 0),
+            "bloom_bytes": self.bloom.nbytes if self.bloom else 0,
+            "spilled_entries": self._spilled,
+            "disk_bytes": self._spilled * self._table.itemsize,
+        }
+
+    def close(self):
+        """Drop the spill file; the set is empty afterwards."""
+        self._close_spill()
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self.bloom = BloomFilter(self.bloom_capacity) if self.bloom_capacity else None
+        self._table = array("Q", [0]) * INITIAL_SLOTS
+        self._count = self._spilled = 0
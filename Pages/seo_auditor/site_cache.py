@@ -0,0 +1,139 @@
+"""Process-wide cache of robots.txt and sitemap results, keyed by host.
+
+Every Reports click, batch audit and crawl needs the same few per-site files.
+Fetched robots.txt results are kept together with their parsed rule groups
+and analysis, and expanded sitemap results are kept as well, so every
+Streamlit session and batch worker in the process reuses them. An entry
+lives as long as its response's Cache-Control/Expires allow (capped at a day,
+as RFC 9309 asks for robots.txt), or ``SEO_AUDITOR_ROBOTS_TTL`` /
+``SEO_AUDITOR_SITEMAP_TTL`` seconds when the server says nothing. Concurrent
+requests for a host that isn't cached yet share a single fetch.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+from seo_auditor.cache import freshness_lifetime
+from seo_auditor.robots import analyze_robots_txt, fetch_robots_txt, parse_robots
+from seo_auditor.sitemaps import expand_sitemaps
+
+ROBOTS_TTL = int(os.getenv("SEO_AUDITOR_ROBOTS_TTL", "3600"))
+SITEMAP_TTL = int(os.getenv("SEO_AUDITOR_SITEMAP_TTL", "3600"))
+
+# Longest any entry is reused, and how long a failed fetch (no HTTP response) is
+MAX_TTL = 24 * 3600
+FAILURE_TTL = 60
+
+MAX_ENTRIES = 1000
+
+
+def ttl_from_headers(headers, default):
+    """Seconds to reuse a response: its freshness lifetime if it declares one, else ``default``."""
+    if headers is None:
+        return FAILURE_TTL
+    lowered = {name.lower() for name in headers}
+    if "cache-control" not in lowered and "expires" not in lowered:
+        return min(default, MAX_TTL)
+    return min(freshness_lifetime(headers) or 0, MAX_TTL)
+
+
+class SingleFlightCache:
+    """In-memory TTL cache whose misses for one key are loaded once, however many callers wait."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()   # key -> (expires_at, value), least recently used first
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        """The value for ``key``; on a miss ``load()`` returns ``(value, ttl)``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value, ttl = load()
+        except BaseException as error:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(error)
+            raise
+        with self._lock:
+            if ttl > 0:
+                self._entries[key] = (time.monotonic() + ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_site_cache():
+    """Return the process-wide robots/sitemap cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SingleFlightCache()
+    return _cache
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def get_robots(url, cache=None):
+    """``(fetch result, RobotsTxt or None, analysis)`` for ``url``'s host, shared across audits."""
+    cache = cache or get_site_cache()
+
+    def load():
+        result = fetch_robots_txt(url)
+        robots = parse_robots(result["content"]) if result["status"] == "success" else None
+        return (result, robots, analyze_robots_txt(result, robots)), ttl_from_headers(result.get("headers"), ROBOTS_TTL)
+
+    return cache.get(("robots", _origin(url)), load)
+
+
+def get_sitemaps(sitemap_urls, cache=None):
+    """``expand_sitemaps(sitemap_urls)``, shared across audits of the same host."""
+    cache = cache or get_site_cache()
+    sitemap_urls = tuple(sitemap_urls)
+
+    def load():
+        result = expand_sitemaps(sitemap_urls)
+        return result, ttl_from_headers(result.get("headers"), SITEMAP_TTL)
+
+    return cache.get(("sitemaps", _origin(sitemap_urls[0]) if sitemap_urls else "", sitemap_urls), load)
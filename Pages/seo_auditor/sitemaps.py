@@ -0,0 +1,443 @@
+"""sitemap.xml fetching and analysis, shared by the Reports page and the batch CLI.
+
+Sitemaps are parsed as they download: ``SitemapParser`` takes the body in
+chunks, gunzips it on the fly when it is a ``.gz`` file, and feeds an
+incremental XML parser that forgets each ``<url>`` entry once it has been
+counted. Validation and analysis happen in that single pass, so memory stays
+flat however many URLs the sitemap lists. Requests go through the response
+cache, so an unchanged sitemap is replayed from disk or revalidated with a
+conditional request; sitemaps larger than ``fetch.STREAM_CACHE_MAX_BYTES``
+are parsed without being kept. Page URLs can be streamed to a callback as
+they are found. ``expand_sitemaps`` fetches a set of sitemaps
+and every child of the sitemap indexes among them concurrently and merges
+their figures into one summary.
+"""
+import threading
+import xml.etree.ElementTree as ET
+import zlib
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+
+from seo_auditor import fetch
+from seo_auditor.seen import SeenSet
+
+# Bytes read from the network (and decompressed) at a time
+CHUNK_SIZE = 64 * 1024
+
+# The sitemaps.org limit on the uncompressed size; parsing stops past it
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+
+# Decoded characters kept as the sitemap's "content" for display
+PREVIEW_CHARS = 2000
+
+# Child sitemaps fetched at once, how deep indexes are followed and how many are fetched in all
+SITEMAP_WORKERS = 8
+MAX_INDEX_DEPTH = 3
+MAX_SITEMAPS = 500
+
+# Summary figures that are summed across sitemaps
+_COUNTS = ("url_count", "sitemap_count", "lastmod_count", "priority_count", "changefreq_count", "bytes")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapParser:
+    """Incremental parser: ``feed`` raw (optionally gzipped) bytes, then ``close`` for the summary.
+
+    ``on_url(loc)`` is called for every page URL and ``on_sitemap(loc)`` for
+    every child sitemap of an index, as soon as their entries are complete.
+    """
+
+    def __init__(self, on_url=None, on_sitemap=None, max_bytes=MAX_SITEMAP_BYTES):
+        self.on_url = on_url
+        self.on_sitemap = on_sitemap
+        self.max_bytes = max_bytes
+        self.truncated = False
+        self._xml = ET.XMLPullParser(events=("start", "end"))
+        self._gunzip = None
+        self._started = False
+        self._root = None
+        self._depth = 0
+        self._preview = bytearray()
+        self._hosts = Counter()
+        self.summary = {
+            "root": None,
+            "url_count": 0,
+            "sitemap_count": 0,
+            "lastmod_count": 0,
+            "priority_count": 0,
+            "changefreq_count": 0,
+            "nested_sitemaps": [],
+            "bytes": 0,
+            "gzipped": False,
+            "truncated": False,
+        }
+
+    def feed(self, chunk):
+        if not chunk or self.truncated:
+            return
+        if not self._started:
+            self._started = True
+            if chunk[:2] == _GZIP_MAGIC:
+                self.summary["gzipped"] = True
+                self._gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._gunzip is None:
+            self._feed_xml(chunk)
+            return
+        # Bounded steps so a small compressed chunk can't expand all at once
+        data = self._gunzip.decompress(chunk, CHUNK_SIZE)
+        while data and not self.truncated:
+            self._feed_xml(data)
+            data = self._gunzip.decompress(self._gunzip.unconsumed_tail, CHUNK_SIZE)
+
+    def _feed_xml(self, data):
+        if self.summary["bytes"] + len(data) > self.max_bytes:
+            # Parse up to the limit, then stop; the rest is never read
+            self.truncated = self.summary["truncated"] = True
+            data = data[:self.max_bytes - self.summary["bytes"]]
+        self.summary["bytes"] += len(data)
+        if len(self._preview) < PREVIEW_CHARS * 4:
+            self._preview += data[:PREVIEW_CHARS * 4 - len(self._preview)]
+        self._xml.feed(data)
+        for event, elem in self._xml.read_events():
+            if event == "start":
+                self._depth += 1
+                if self._depth == 1:
+                    self._root = elem
+                    self.summary["root"] = _local_name(elem.tag)
+                continue
+            if self._depth == 2:
+                self._entry(elem)
+                # Drop the finished entry so the tree never grows
+                self._root.clear()
+            self._depth -= 1
+
+    def _entry(self, elem):
+        kind = _local_name(elem.tag)
+        fields = {}
+        for child in elem:
+            name = _local_name(child.tag)
+            if name not in fields:
+                fields[name] = (child.text or "").strip()
+        loc = fields.get("loc")
+        if kind == "url":
+            self.summary["url_count"] += 1
+            for name in ("lastmod", "priority", "changefreq"):
+                if name in fields:
+                    self.summary[f"{name}_count"] += 1
+            if loc:
+                self._hosts[urlparse(loc).netloc] += 1
+                if self.on_url is not None:
+                    self.on_url(loc)
+        elif kind == "sitemap":
+            self.summary["sitemap_count"] += 1
+            if "lastmod" in fields:
+                self.summary["lastmod_count"] += 1
+            if loc:
+                self.summary["nested_sitemaps"].append(loc)
+                if self.on_sitemap is not None:
+                    self.on_sitemap(loc)
+
+    @property
+    def preview(self):
+        return bytes(self._preview).decode("utf-8", errors="replace")[:PREVIEW_CHARS]
+
+    def close(self):
+        """Finish parsing and return the summary; raises ET.ParseError for invalid XML."""
+        if not self.truncated:
+            if self._gunzip is not None:
+                self._feed_xml(self._gunzip.flush())
+            if not self.truncated:
+                self._xml.close()
+                if self._root is None:
+                    raise ET.ParseError("no element found")
+        self.summary["hosts"] = dict(self._hosts)
+        return self.summary
+
+
+def parse_sitemap(data, on_url=None, on_sitemap=None):
+    """Summary of a sitemap already in memory (bytes or text), parsed the streaming way."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    parser = SitemapParser(on_url=on_url, on_sitemap=on_sitemap)
+    for start in range(0, len(data), CHUNK_SIZE):
+        parser.feed(data[start:start + CHUNK_SIZE])
+    return parser.close()
+
+
+def fetch_sitemap(url, on_url=None, guess_location=True):
+    """Fetch and parse sitemap.xml (or a .gz sitemap) in one streaming pass.
+
+    On success ``summary`` holds the parse results and ``content`` the start
+    of the document for display; ``on_url`` receives each page URL. Unless
+    ``guess_location`` is False, a URL that doesn't look like a sitemap is
+    replaced by its site's /sitemap.xml.
+    """
+    try:
+        # If the URL is not a direct sitemap URL, try to construct it
+        if guess_location and not url.lower().endswith(('.xml', '.gz')):
+            parsed_url = urlparse(url)
+            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            sitemap_url = f"{base_url}/sitemap.xml"
+        else:
+            sitemap_url = url
+        
+        with fetch.cached_stream(sitemap_url, timeout=10, chunk_size=CHUNK_SIZE) as (response, chunks):
+            if response.status_code == 200:
+                # Validate and analyze while the body downloads (or replays from the cache)
+                parser = SitemapParser(on_url=on_url)
+                try:
+                    for chunk in chunks:
+                        parser.feed(chunk)
+                        if parser.truncated:
+                            break
+                    summary = parser.close()
+                except (ET.ParseError, zlib.error):
+                    return {"status": "error", "message": "Invalid XML format in sitemap", "url": sitemap_url, "http_status": response.status_code}
+                return {"status": "success", "content": parser.preview, "summary": summary, "url": sitemap_url,
+                        "http_status": response.status_code, "headers": dict(response.headers)}
+            elif response.status_code == 404:
+                return {"status": "error", "message": "Sitemap file not found (404)", "url": sitemap_url, "http_status": response.status_code}
+            else:
+                return {"status": "error", "message": f"Failed to fetch sitemap: HTTP {response.status_code}", "url": sitemap_url, "http_status": response.status_code}
+    except requests.exceptions.ConnectionError:
+        return {"status": "error", "message": "Connection error - unable to connect to server", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
+    except requests.exceptions.Timeout:
+        return {"status": "error", "message": "Request timed out when fetching sitemap", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
+    except requests.exceptions.TooManyRedirects:
+        return {"status": "error", "message": "Too many redirects when fetching sitemap", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
+    except Exception as e:
+        return {"status": "error", "message": f"Error fetching sitemap: {str(e)}", "url": sitemap_url if 'sitemap_url' in locals() else "unknown"}
+
+def expand_sitemaps(urls, on_url=None, max_depth=MAX_INDEX_DEPTH, max_urls=None,
+                    max_sitemaps=MAX_SITEMAPS, max_workers=SITEMAP_WORKERS, seen=None):
+    """Fetch ``urls`` and, recursively, every child sitemap of the indexes among them.
+
+    Children are fetched concurrently as soon as their index has been read,
+    down to ``max_depth`` levels and at most ``max_sitemaps`` sitemaps in
+    all. ``on_url`` receives page URLs (one call at a time, at most
+    ``max_urls`` of them) instead of them being collected. A URL listed by
+    several sitemaps is passed on once: URLs are checked against ``seen``, a
+    ``SeenSet`` (a private one by default; ``False`` when the caller
+    deduplicates itself) that may already hold URLs to leave out. Returns a fetch_sitemap-style result: ``summary``
+    merges every sitemap fetched and ``sitemaps`` lists each one's outcome.
+    """
+    lock = threading.Lock()
+    summary = {key: 0 for key in _COUNTS}
+    summary.update({"root": None, "nested_sitemaps": [], "gzipped": False, "truncated": False, "limited": False})
+    hosts = Counter()
+    sitemaps = []
+    first = None
+    forwarded = 0
+    own_seen = seen is None and (on_url is not None or max_urls is not None)
+    if own_seen:
+        seen = SeenSet()
+    elif seen is None:
+        # URLs that are only counted need no deduplication
+        seen = False
+
+    def forward(loc):
+        nonlocal forwarded
+        with lock:
+            if max_urls is not None and forwarded >= max_urls:
+                summary["limited"] = True
+                return
+            if seen is not False and not seen.add(loc):
+                return
+            forwarded += 1
+            if on_url is not None:
+                on_url(loc)
+
+    queued = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def schedule(url, depth):
+            if url in queued:
+                return
+            if len(queued) >= max_sitemaps or depth > max_depth:
+                summary["limited"] = True
+                return
+            queued.add(url)
+            running[executor.submit(fetch_sitemap, url, forward, False)] = (url, depth)
+
+        for url in dict.fromkeys(urls):
+            schedule(url, 0)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, depth = running.pop(future)
+                result = future.result()
+                record = {"url": url, "depth": depth, "status": result["status"]}
+                # The first root sitemap that loaded provides the preview
+                if depth == 0 and (first is None or first["status"] != "success"):
+                    first = result
+                if result["status"] != "success":
+                    sitemaps.append({**record, "message": result["message"], "http_status": result.get("http_status")})
+                    continue
+                part = result["summary"]
+                sitemaps.append({**record, "url_count": part["url_count"], "is_index": part["sitemap_count"] > 0})
+                for key in _COUNTS:
+                    summary[key] += part[key]
+                summary["root"] = summary["root"] or part["root"]
+                summary["gzipped"] = summary["gzipped"] or part["gzipped"]
+                summary["truncated"] = summary["truncated"] or part["truncated"]
+                summary["nested_sitemaps"].extend(part["nested_sitemaps"])
+                hosts.update(part["hosts"])
+                for child in part["nested_sitemaps"]:
+                    if max_urls is not None and forwarded >= max_urls:
+                        summary["limited"] = True
+                        break
+                    schedule(child, depth + 1)
+    if own_seen:
+        seen.close()
+
+    summary["hosts"] = dict(hosts)
+    if first is None:
+        return {"status": "error", "message": "No sitemap URLs given", "url": "unknown", "sitemaps": sitemaps}
+    if first["status"] != "success":
+        return {**first, "sitemaps": sitemaps}
+    return {**first, "summary": summary, "sitemaps": sitemaps}
+
+
+def analyze_sitemap(sitemap_content, base_url):
+    """Perform detailed analysis of sitemap.xml content."""
+    if not sitemap_content or sitemap_content.get("status") != "success":
+        return {
+            "url_count": 0,
+            "has_lastmod": False,
+            "has_priority": False,
+            "has_changefreq": False,
+            "is_index": False,
+            "nested_sitemaps": [],
+            "issues": []
+        }
+    
+    # Parsed while fetching; content from elsewhere is parsed here in one pass
+    try:
+        summary = sitemap_content.get("summary") or parse_sitemap(sitemap_content["content"])
+        
+        url_count = summary["url_count"]
+        is_index = summary["sitemap_count"] > 0
+        nested_sitemaps = summary["nested_sitemaps"]
+        
+        # Check for recommended elements
+        has_lastmod = summary["lastmod_count"] > 0
+        has_priority = summary["priority_count"] > 0
+        has_changefreq = summary["changefreq_count"] > 0
+        entries = url_count + summary["sitemap_count"]
+        lastmod_coverage = summary["lastmod_count"] / entries if entries else 0.0
+        
+        # Identify issues
+        issues = []
+        
+        if url_count == 0 and not is_index:
+            issues.append({
+                "type": "critical",
+                "message": "Sitemap contains no URLs."
+            })
+        
+        if not has_lastmod:
+            issues.append({
+                "type": "opportunity",
+                "message": "URLs in sitemap don't include lastmod dates, which help search engines identify updated content."
+            })
+            
+        if not has_changefreq:
+            issues.append({
+                "type": "opportunity",
+                "message": "No changefreq elements found. Adding them can help guide crawler behavior."
+            })
+            
+        if not has_priority:
+            issues.append({
+                "type": "opportunity",
+                "message": "No priority elements found. Setting priorities can help indicate importance of pages."
+            })
+            
+        # The limit applies to each sitemap, not to an expanded index as a whole
+        per_sitemap = sitemap_content.get("sitemaps") or [{"url": sitemap_content.get("url"), "status": "success", "url_count": url_count}]
+        for sitemap in per_sitemap:
+            if sitemap.get("url_count", 0) > 50000:
+                where = f" {sitemap['url']}" if len(per_sitemap) > 1 else ""
+                issues.append({
+                    "type": "warning",
+                    "message": f"Sitemap{where} contains {sitemap['url_count']} URLs, exceeding the recommended limit of 50,000 URLs per sitemap."
+                })
+        
+        failed = [sitemap for sitemap in per_sitemap if sitemap["status"] != "success"]
+        if failed:
+            issues.append({
+                "type": "warning",
+                "message": f"{len(failed)} of {len(per_sitemap)} sitemaps could not be fetched or parsed (e.g. {failed[0]['url']}: {failed[0]['message']})."
+            })
+            
+        if summary.get("limited"):
+            issues.append({
+                "type": "opportunity",
+                "message": f"Sitemap expansion stopped at its limits after {len(per_sitemap)} sitemaps; figures cover only those."
+            })
+            
+        if summary["truncated"]:
+            issues.append({
+                "type": "warning",
+                "message": f"Sitemap is larger than the {MAX_SITEMAP_BYTES // (1024 * 1024)}MB uncompressed limit; only the first {MAX_SITEMAP_BYTES // (1024 * 1024)}MB were analyzed."
+            })
+            
+        # Check for URLs from different domains (potential issue)
+        base_netloc = urlparse(base_url).netloc
+        different_domain_urls = sum(count for netloc, count in summary["hosts"].items() if netloc and netloc != base_netloc)
+                    
+        if different_domain_urls:
+            issues.append({
+                "type": "warning",
+                "message": f"Found {different_domain_urls} URLs from different domains in your sitemap."
+            })
+            
+        return {
+            "url_count": url_count,
+            "has_lastmod": has_lastmod,
+            "has_priority": has_priority,
+            "has_changefreq": has_changefreq,
+            "is_index": is_index,
+            "nested_sitemaps": nested_sitemaps,
+            "lastmod_coverage": lastmod_coverage,
+            "gzipped": summary["gzipped"],
+            "sitemaps_fetched": len(per_sitemap) - len(failed),
+            "sitemaps_failed": len(failed),
+            "issues": issues
+        }
+        
+    except ET.ParseError:
+        return {
+            "url_count": 0,
+            "has_lastmod": False,
+            "has_priority": False,
+            "has_changefreq": False,
+            "is_index": False,
+            "nested_sitemaps": [],
+            "issues": [{
+                "type": "critical",
+                "message": "Sitemap XML is not valid and could not be parsed."
+            }]
+        }
+    except Exception as e:
+        return {
+            "url_count": 0,
+            "has_lastmod": False,
+            "has_priority": False,
+            "has_changefreq": False,
+            "is_index": False,
+            "nested_sitemaps": [],
+            "issues": [{
+                "type": "critical",
+                "message": f"Error analyzing sitemap: {str(e)}"
+            }]
+        }
+
@@ -0,0 +1,86 @@
+"""Fixtures shared by every test module."""
+import atexit
+import http.server
+import os
+import shutil
+import tempfile
+import threading
+
+# seo_auditor reads the cache directory when it is imported, so point it away
+# from the real ~/.cache before any test module imports it
+_session_cache_dir = tempfile.mkdtemp(prefix="seo_auditor_tests_")
+os.environ["SEO_AUDITOR_CACHE_DIR"] = _session_cache_dir
+atexit.register(shutil.rmtree, _session_cache_dir, ignore_errors=True)
+
+import pytest  # noqa: E402
+
+from seo_auditor import cache, crawler, link_cache, pagespeed, screenshots, seen, site_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """A fresh cache directory per test, with the process-wide stores reopened in it."""
+    directory = str(tmp_path / "cache")
+    # Inherited by the parser processes the batch CLI spawns
+    monkeypatch.setenv("SEO_AUDITOR_CACHE_DIR", directory)
+    for module in (cache, crawler, link_cache, pagespeed, screenshots, seen):
+        monkeypatch.setattr(module, "DEFAULT_CACHE_DIR", directory)
+    for module in (cache, link_cache, pagespeed, site_cache):
+        monkeypatch.setattr(module, "_cache", None)
+    monkeypatch.setattr(screenshots, "_store", None)
+    return directory
+
+
+NOT_FOUND = (404, {}, b"")
+
+
+class _RouteHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every GET from the server's routes with a ``(status, headers, body)`` tuple."""
+
+    def do_GET(self):
+        routes = self.server.routes
+        if callable(routes):
+            response = routes(self)
+        else:
+            response = routes.get(self.path, NOT_FOUND)
+            if callable(response):
+                response = response(self)
+        status, headers, body = response
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if body is not None and "Content-Length" not in headers:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Start HTTP servers on 127.0.0.1 for one test; ``local_server(routes)`` returns the base URL.
+
+    ``routes`` maps a request path to a ``(status, headers, body)`` tuple, or
+    to a function of the request returning one; unknown paths get a 404. It
+    may also be a single such function answering every path. The request is
+    the ``BaseHTTPRequestHandler`` (``path``, ``headers``, and ``server.base``).
+    """
+    servers = []
+
+    def start(routes):
+        httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RouteHandler)
+        httpd.routes = routes
+        httpd.base = f"http://127.0.0.1:{httpd.server_port}"
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        servers.append(httpd)
+        return httpd.base
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,48 @@
+"""Browser pool bookkeeping, exercised with a fake WebDriver."""
+from seo_auditor.browser import BrowserPool
+
+
+class FakeDriver:
+    launched = []
+
+    def __init__(self):
+        self.alive = True
+        FakeDriver.launched.append(self)
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.alive = False
+
+
+def test_browsers_are_reused_then_recycled():
+    FakeDriver.launched = []
+    pool = BrowserPool(size=1, max_pages=3, launcher=FakeDriver)
+    for _ in range(4):
+        with pool.browser():
+            pass
+
+    assert len(FakeDriver.launched) == 2
+    assert not FakeDriver.launched[0].alive
+    assert pool.stats() == {"size": 1, "live": 1, "idle": 1}
+
+
+def test_unresponsive_browser_is_replaced():
+    FakeDriver.launched = []
+    pool = BrowserPool(size=1, launcher=FakeDriver)
+    pool.warm()
+    FakeDriver.launched[0].alive = False
+
+    with pool.browser() as browser:
+        assert browser.driver is FakeDriver.launched[1]
+    pool.close()
+    assert pool.stats()["live"] == 0
@@ -0,0 +1,114 @@
+"""On-disk response cache and conditional revalidation through ``cached_get``."""
+import pytest
+
+from seo_auditor.cache import ResponseCache, cache_key, freshness_lifetime
+from seo_auditor.fetch import cached_get, cached_stream, get_session
+
+
+calls = []
+
+FRESH = {"Content-Type": "text/html", "Cache-Control": "max-age=60"}
+
+
+def page(request):
+    return 200, FRESH, b"<html>" + request.path.encode() + b"</html>"
+
+
+def stale(request):
+    if request.headers.get("If-None-Match") == '"v1"':
+        return 304, {"Cache-Control": "max-age=60"}, None
+    return 200, {"Content-Type": "text/html", "Cache-Control": "no-cache", "ETag": '"v1"',
+                 "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}, b"<html>/stale</html>"
+
+
+ROUTES = {
+    "/fresh": page,
+    "/moved": (301, {"Location": "/fresh"}, None),
+    "/stale": stale,
+    "/vary": (200, {**FRESH, "Vary": "Cookie"}, b"<html>/vary</html>"),
+}
+
+
+def route(request):
+    calls.append((request.path, dict(request.headers)))
+    response = ROUTES[request.path]
+    return response(request) if callable(response) else response
+
+
+@pytest.fixture
+def server(local_server):
+    calls.clear()
+    return local_server(route)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "responses.sqlite3"))
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"Cache-Control": "max-age=60", "Age": "10"}) == 50
+    assert freshness_lifetime({"Cache-Control": "no-cache, max-age=60"}) == 0
+    assert freshness_lifetime({"Cache-Control": "no-store"}) is None
+    assert freshness_lifetime({"Date": "Mon, 05 Oct 2026 10:00:00 GMT",
+                               "Expires": "Mon, 05 Oct 2026 10:05:00 GMT"}) == 300
+    assert freshness_lifetime({}) == 0
+
+
+def test_fresh_hit_makes_no_request(server, cache):
+    first = cached_get(server + "/fresh", cache=cache)
+    second = cached_get(server + "/fresh", cache=cache)
+    assert len(calls) == 1
+    assert not first.from_cache and second.from_cache and second.text == first.text
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_entry_is_revalidated_and_refreshed_by_304(server, cache):
+    first = cached_get(server + "/stale", cache=cache)
+    assert not cache.lookup(cache_key(server + "/stale", dict(get_session().headers))).is_fresh()
+
+    second = cached_get(server + "/stale", cache=cache)
+    sent = calls[1][1]
+    assert sent["If-None-Match"] == '"v1"' and sent["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert second.from_cache and second.status_code == 200 and second.text == first.text
+
+    # The 304's max-age replaced no-cache, so the next read is a plain hit
+    assert cached_get(server + "/stale", cache=cache).from_cache
+    assert len(calls) == 2 and cache.stats()["revalidated"] == 1
+
+
+def test_replay_keeps_the_final_url_after_redirects(server, cache):
+    first = cached_get(server + "/moved", cache=cache)
+    second = cached_get(server + "/moved", cache=cache)
+    assert first.url == second.url == server + "/fresh"
+    assert second.from_cache
+
+
+def test_responses_varying_on_unkeyed_headers_are_not_stored(server, cache):
+    cached_get(server + "/vary", cache=cache)
+    cached_get(server + "/vary", cache=cache)
+    assert len(calls) == 2 and cache.stats()["entries"] == 0
+    assert cache.store("k", "https://example.com/", 200, {"Cache-Control": "max-age=60", "Vary": "*"}, b"x") is False
+
+
+def test_eviction_stays_within_the_size_bound(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite3"), max_bytes=2500)
+    for i in range(5):
+        cache.store(f"k{i}", f"https://example.com/{i}", 200, {"Cache-Control": "max-age=60"}, b"x" * 1000)
+        if i == 2:
+            cache.lookup("k0")   # recently used, so it outlives k1 and k2
+    stats = cache.stats()
+    assert stats["size_bytes"] <= 2500 and stats["entries"] == 2
+    assert cache.lookup("k4") is not None and cache.lookup("k1") is None
+    assert [entry["url"] for entry in cache.entries()] == ["https://example.com/4", "https://example.com/3"]
+
+
+def test_streamed_bodies_over_the_record_limit_are_not_kept(server, cache):
+    for limit in (4, 1024):
+        with cached_stream(server + "/fresh", cache=cache, chunk_size=4, record_limit=limit) as (response, chunks):
+            body = b"".join(chunks)
+        assert body == b"<html>/fresh</html>" and not response.from_cache
+        assert cache.stats()["entries"] == (limit > len(body))
+    with cached_stream(server + "/fresh", cache=cache) as (response, chunks):
+        assert response.from_cache and b"".join(chunks) == body
+    assert len(calls) == 2
@@ -0,0 +1,62 @@
+"""Batch CLI against a local HTTP server."""
+import json
+
+import pytest
+
+from seo_auditor import cli
+
+PAGE = b"""<html><head><title>Local test page for the batch auditor</title>
+<meta name="description" content="A page served by the test server."></head>
+<body><h1>Hello</h1><p>Some words here.</p><a href="/other">Other</a></body></html>"""
+
+
+def route(request):
+    if request.path == "/sitemap.xml":
+        entries = "".join(f"<url><loc>{request.server.base}/page{i}</loc></url>" for i in (1, 3, 3))
+        return 200, {}, f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+    if request.path.startswith("/page"):
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, PAGE
+    return 404, {}, b""
+
+
+@pytest.fixture
+def server(local_server):
+    return local_server(route)
+
+
+def test_batch_run_writes_one_line_per_url_and_resumes(server, tmp_path):
+    url_list = tmp_path / "urls.txt"
+    output = tmp_path / "results.jsonl"
+    url_list.write_text(f"# nightly\n{server}/page1\n{server}/page2\n\n{server}/missing\n")
+
+    assert cli.main([str(url_list), "-o", str(output), "--skip-site-checks", "-w", "1", "-q"]) == 0
+    records = {record["url"]: record for record in map(json.loads, output.read_text().splitlines())}
+
+    assert records[f"{server}/page1"]["status"] == "success"
+    assert records[f"{server}/page1"]["title"] == "Local test page for the batch auditor"
+    assert isinstance(records[f"{server}/page2"]["seo_score"], int)
+    assert records[f"{server}/missing"] == {**records[f"{server}/missing"], "status": "error", "http_status": 404}
+
+    # Simulate an interrupted run: keep one result plus half a line, then resume
+    lines = output.read_text().splitlines()
+    kept = next(line for line in lines if json.loads(line)["status"] == "success")
+    output.write_text(kept + "\n" + lines[1][:20])
+    cli.main([str(url_list), "-o", str(output), "--skip-site-checks", "-w", "1", "-q", "--resume"])
+
+    urls = [json.loads(line)["url"] for line in output.read_text().splitlines() if line.endswith("}")]
+    assert sorted(urls) == sorted(records)
+
+    # Successful results are kept; the failed URL is tried again
+    cli.main([str(url_list), "-o", str(output), "--skip-site-checks", "-w", "1", "-q", "--resume"])
+    urls = [json.loads(line)["url"] for line in output.read_text().splitlines() if line.endswith("}")]
+    assert sorted(urls) == sorted(list(records) + [f"{server}/missing"])
+
+
+def test_sitemap_urls_are_streamed_once_after_the_url_list(server, tmp_path):
+    url_list = tmp_path / "urls.txt"
+    output = tmp_path / "results.jsonl"
+    url_list.write_text(f"{server}/page1\n{server}/page2\n{server}/page1\n")
+
+    cli.main([str(url_list), "--sitemap", f"{server}/sitemap.xml", "-o", str(output), "--skip-site-checks", "-w", "1", "-q"])
+    urls = [json.loads(line)["url"] for line in output.read_text().splitlines()]
+    assert sorted(urls) == [f"{server}/page1", f"{server}/page2", f"{server}/page3"]
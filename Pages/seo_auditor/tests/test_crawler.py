@@ -0,0 +1,118 @@
+"""Site crawler against a small local site."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from seo_auditor.crawler import USER_AGENT, SiteCrawler, site_summary
+
+SITE = {
+    "/": '<title>Home</title><a href="/a">A</a><a href="/private/x">Secret</a>'
+         '<a href="/b?sort=asc">B sorted</a><a href="/b" rel="nofollow">B</a><a href="https://elsewhere.example/">Out</a>',
+    "/a": '<title>A</title><a href="/a/deep">Deep</a><a href="/#top">Home again</a>',
+    "/a/deep": '<title>Deep</title><a href="/a/deep/deeper">Deeper</a>',
+    "/a/deep/deeper": "<title>Deeper</title>",
+    "/b?sort=asc": "<title>B</title>",
+    "/from-sitemap": "<title>Listed</title>",
+    "/private/x": "<title>Private</title>",
+}
+
+ROBOTS = "User-agent: *\nDisallow: /private\n"
+
+
+served = SimpleNamespace(requested=[], agents=[], robots=ROBOTS)
+
+
+def route(request):
+    served.requested.append(request.path)
+    base = request.server.base
+    if request.path == "/robots.txt":
+        return 200, {"Content-Type": "text/plain"}, f"{served.robots}Sitemap: {base}/sitemap.xml\n"
+    if request.path == "/moved":
+        return 301, {"Location": "/"}, b""
+    if request.path == "/sitemap.xml":
+        return 200, {"Content-Type": "application/xml"}, (
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"<url><loc>{base}/from-sitemap</loc></url></urlset>")
+    if request.path in SITE:
+        served.agents.append(request.headers["User-Agent"])
+        return 200, {"Content-Type": "text/html"}, f"<html><body>{SITE[request.path]}</body></html>"
+    return 404, {}, b""
+
+
+@pytest.fixture
+def site(local_server):
+    served.requested, served.agents, served.robots = [], [], ROBOTS
+    return local_server(route)
+
+
+def test_crawl_follows_internal_links_politely(site):
+    crawler = SiteCrawler(f"{site}/", max_depth=2, delay=0)
+    crawler.crawl()
+    results = list(crawler.results())
+    crawled = [page["url"].replace(site, "") for page in results]
+
+    assert crawled[0] == "/"
+    assert set(crawled) == {"/", "/a", "/from-sitemap", "/private/x", "/a/deep", "/b?sort=asc"}
+    # Query-string URLs wait behind clean ones at the same depth
+    assert crawled.index("/b?sort=asc") > crawled.index("/a")
+    assert next(page for page in results if page["url"].endswith("/private/x"))["status"] == "skipped"
+    assert "/private/x" not in served.requested and "/b" not in served.requested
+
+    summary = site_summary(crawler.results())
+    assert summary["pages_audited"] == 5 and summary["skipped"] == 1
+    assert summary["lowest_scoring"] == sorted((page["seo_score"], page["url"]) for page in results
+                                               if page["status"] == "success")
+
+
+def test_checkpoint_resume_continues_where_it_stopped(site, tmp_path):
+    checkpoint = str(tmp_path / "crawl.json")
+    first = SiteCrawler(f"{site}/", max_pages=2, checkpoint=checkpoint, delay=0)
+    first.crawl()
+    saved = [page["url"] for page in first.results()]
+
+    resumed = SiteCrawler.resume(checkpoint, max_pages=10, delay=0)
+    resumed.crawl()
+    urls = [page["url"] for page in resumed.results()]
+
+    assert urls[:2] == saved
+    assert len(urls) == len(set(urls)) == 7
+
+
+def test_skipped_pages_do_not_use_up_the_page_budget(site):
+    counts = SiteCrawler(f"{site}/", max_pages=5, max_depth=2, delay=0).crawl()
+    assert counts["success"] == 5 and counts["skipped"] == 1
+
+
+def test_robots_group_for_the_crawler_agent_applies(site):
+    served.robots = "User-agent: *\nDisallow: /private\n\nUser-agent: SEOAuditorBot\nDisallow: /a\n"
+    crawler = SiteCrawler(f"{site}/", max_depth=2, delay=0, use_sitemap=False)
+    crawler.crawl()
+    statuses = {page["url"].replace(site, ""): page["status"] for page in crawler.results()}
+    assert statuses["/a"] == "skipped" and statuses["/private/x"] == "success"
+    assert set(served.agents) == {USER_AGENT}
+
+
+def test_checkpoint_holds_no_results_and_resume_drops_unsaved_ones(site, tmp_path):
+    checkpoint = str(tmp_path / "crawl.json")
+    crawler = SiteCrawler(f"{site}/", max_pages=3, checkpoint=checkpoint, delay=0)
+    crawler.crawl()
+    with open(checkpoint, encoding="utf-8") as saved:
+        assert "results" not in json.load(saved)
+
+    # A page finished after the last checkpoint is crawled again on resume
+    saved = [page["url"] for page in crawler.results()]
+    with open(crawler.results_path, "a", encoding="utf-8") as log:
+        log.write(json.dumps({"url": "unsaved", "status": "success"}) + "\n")
+    resumed = SiteCrawler.resume(checkpoint, max_pages=10, delay=0)
+    assert [page["url"] for page in resumed.results()] == saved
+    assert resumed.crawled == 3
+
+
+def test_redirect_targets_are_crawled_once(site):
+    crawler = SiteCrawler(f"{site}/moved", max_depth=2, delay=0, use_sitemap=False)
+    crawler.crawl()
+    results = list(crawler.results())
+    # /a links back to "/", which the start URL already redirected to
+    assert sum(page.get("final_url") == f"{site}/" for page in results) == 1
+    assert served.requested.count("/") == 1
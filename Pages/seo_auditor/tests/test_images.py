@@ -0,0 +1,69 @@
+"""Image dimensions read from file headers, and probes that read only those headers."""
+import struct
+
+import pytest
+
+from seo_auditor.images import ImageAnalysis, ImageProbe, image_dimensions, probe_image
+
+PNG = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 640, 480) + b"\x08\x02\x00\x00\x00"
+GIF = b"GIF89a" + struct.pack("<HH", 640, 480) + b"\xf7\x00\x00"
+JPEG = (
+    b"\xff\xd8"
+    + b"\xff\xe1" + struct.pack(">H", 2 + 2000) + b"\x00" * 2000  # large APP1 (EXIF) segment
+    + b"\xff\xff"                                                  # fill byte
+    + b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, 480, 640, 3) + b"\x00" * 3
+)
+WEBP_LOSSY = b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00" + b"\x00" * 6 + struct.pack("<HH", 640, 480)
+WEBP_EXTENDED = b"RIFF\x00\x00\x00\x00WEBPVP8X" + b"\x00" * 8 + (639).to_bytes(3, "little") + (479).to_bytes(3, "little")
+AVIF = (
+    struct.pack(">I", 24) + b"ftypavif" + b"\x00" * 4 + b"avifmif1"
+    + struct.pack(">I", 20) + b"ispe" + b"\x00" * 4 + struct.pack(">II", 640, 480)
+)
+
+
+@pytest.mark.parametrize("data", [PNG, GIF, JPEG, WEBP_LOSSY, WEBP_EXTENDED, AVIF],
+                         ids=["png", "gif", "jpeg", "webp", "webp-vp8x", "avif"])
+def test_dimensions_from_header(data):
+    assert image_dimensions(data) == (640, 480)
+
+
+def test_truncated_or_unknown_data():
+    assert image_dimensions(JPEG[:1000]) is None
+    assert image_dimensions(PNG[:20]) is None
+    assert image_dimensions(b"<svg xmlns='http://www.w3.org/2000/svg'/>") is None
+
+
+def test_image_analysis_probes_each_url_once():
+    probed = []
+
+    def probe(url):
+        probed.append(url)
+        return 12.5, (640, 480)
+
+    analysis = ImageAnalysis(probe=probe, max_workers=4)
+    urls = [f"https://cdn.example.com/{n}.png" for n in range(10)]
+    analysis.run(urls + urls[:3])
+    assert analysis.get(urls[0]) == (12.5, (640, 480))
+    assert analysis.get("https://cdn.example.com/late.png") == (12.5, (640, 480))
+    analysis.run(urls)
+
+    assert sorted(probed) == sorted(urls + ["https://cdn.example.com/late.png"])
+
+
+SVG = b"<svg xmlns='http://www.w3.org/2000/svg' width='10' height='10'/>" + b" " * 40000
+
+
+def test_probe_reads_size_and_type_from_one_ranged_get(local_server):
+    requests = []
+
+    def serve(request):
+        requests.append((request.command, request.headers.get("Range")))
+        body, content_type = (PNG + b"\x00" * 50000, "image/png") if request.path == "/a.png" else (SVG, "image/svg+xml")
+        end = min(int(request.headers["Range"].rpartition("-")[2]), len(body) - 1)
+        return 206, {"Content-Type": content_type, "Content-Range": f"bytes 0-{end}/{len(body)}"}, body[:end + 1]
+
+    base = local_server(serve)
+    assert probe_image(f"{base}/a.png") == ImageProbe((len(PNG) + 50000) / 1024, (640, 480), "image/png")
+    # No dimensions to read, and no full download to find them
+    assert probe_image(f"{base}/b.svg") == ImageProbe(len(SVG) / 1024, None, "image/svg+xml")
+    assert requests == [("GET", "bytes=0-16383")] * 2
@@ -0,0 +1,100 @@
+"""Normalized storage of PageSpeed Insights results."""
+import sqlite3
+
+from seo_auditor.lighthouse import rebuild_response, run_metrics
+from seo_auditor.pagespeed import SCHEMA_VERSION, PageSpeedCache, psi_key
+from seo_auditor.psi_batch import core_web_vitals
+
+RESPONSE = {
+    "lighthouseResult": {
+        "finalUrl": "https://example.com/",
+        "lighthouseVersion": "12.0.0",
+        "categories": {"performance": {"id": "performance", "score": 0.72}, "seo": {"id": "seo", "score": 1}},
+        "audits": {
+            "largest-contentful-paint": {"id": "largest-contentful-paint", "score": 0.5, "numericValue": 3120.5,
+                                         "numericUnit": "millisecond", "displayValue": "3.1 s"},
+            "cumulative-layout-shift": {"id": "cumulative-layout-shift", "score": 0.9, "numericValue": 0.08,
+                                        "numericUnit": "unitless"},
+            "render-blocking-resources": {
+                "id": "render-blocking-resources", "score": 0, "numericValue": 450,
+                "details": {"type": "opportunity", "items": [
+                    {"url": "https://example.com/app.css", "totalBytes": 20480, "wastedMs": 300},
+                    {"url": "https://example.com/font.css", "totalBytes": 1024, "wastedMs": 150},
+                ]},
+            },
+            "unused-javascript": {
+                "id": "unused-javascript", "score": 0.5,
+                "details": {"type": "opportunity", "items": [
+                    {"url": "https://example.com/app.js", "totalBytes": 90000, "wastedBytes": 60000,
+                     "subItems": {"type": "subitems", "items": [{"source": "vendor.js"}]}},
+                ]},
+            },
+            "network-requests": {
+                "id": "network-requests", "score": None,
+                "details": {"type": "table", "items": [{"url": "https://example.com/"}]},
+            },
+        },
+    },
+    "loadingExperience": {
+        "overall_category": "AVERAGE",
+        "metrics": {"LARGEST_CONTENTFUL_PAINT_MS": {"percentile": 2800},
+                    "CUMULATIVE_LAYOUT_SHIFT_SCORE": {"percentile": 12}},
+    },
+}
+
+
+def test_metrics_are_flattened_and_rebuilt():
+    metrics = run_metrics(RESPONSE)
+    assert metrics["performance_score"] == 0.72 and metrics["accessibility_score"] is None
+    assert metrics["lcp_ms"] == 3120.5 and metrics["field_cls"] == 0.12
+    assert core_web_vitals(RESPONSE)["performance_score"] == 72
+
+
+def test_lookups_without_raw_responses_are_rebuilt_from_the_tables(tmp_path):
+    cache = PageSpeedCache(path=str(tmp_path / "psi.sqlite3"), keep_raw=False)
+    key = psi_key("https://example.com/", "mobile", ("performance",))
+    cache.store(key, "https://example.com/", "mobile", ("performance",), RESPONSE)
+
+    data = cache.lookup(key)
+    lighthouse, audits = data["lighthouseResult"], data["lighthouseResult"]["audits"]
+    assert lighthouse["categories"]["performance"]["score"] == 0.72
+    assert audits["largest-contentful-paint"]["displayValue"] == "3.1 s"
+    assert audits["render-blocking-resources"]["details"]["items"] == \
+        RESPONSE["lighthouseResult"]["audits"]["render-blocking-resources"]["details"]["items"]
+    assert audits["unused-javascript"]["details"]["items"][0]["subItems"]["items"] == [{"source": "vendor.js"}]
+    # Traces keep their score but not their items
+    assert "items" not in audits["network-requests"]["details"]
+    assert data["loadingExperience"]["metrics"]["CUMULATIVE_LAYOUT_SHIFT_SCORE"]["percentile"] == 12
+    assert rebuild_response(run_metrics(data), [], [])["lighthouseResult"]["finalUrl"] == "https://example.com/"
+    assert cache.stats()["raw_bytes"] == 0
+
+
+def test_history_keeps_expired_runs(tmp_path):
+    cache = PageSpeedCache(path=str(tmp_path / "psi.sqlite3"), ttl=0)
+    for strategy in ("mobile", "desktop", "mobile"):
+        cache.store(psi_key("https://example.com/", strategy, ()), "https://example.com/", strategy, (), RESPONSE)
+
+    assert cache.lookup(psi_key("https://example.com/", "mobile", ())) is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["runs"] == 3
+    assert cache.stats()["raw_bytes"] == 0   # expired raw responses are dropped
+
+    history = cache.history("HTTPS://example.com/", strategy="mobile")
+    assert [run["lcp_ms"] for run in history] == [3120.5, 3120.5]
+    assert [row[2] for row in cache.audit_history("https://example.com/", "render-blocking-resources")] == [0, 0, 0]
+
+
+def test_old_stores_are_migrated_once(tmp_path):
+    path = str(tmp_path / "psi.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE psi_results (key TEXT PRIMARY KEY, body TEXT)")
+    db.commit()
+    db.close()
+
+    cache = PageSpeedCache(path=path)
+    cache.store(psi_key("https://example.com/", "mobile", ()), "https://example.com/", "mobile", (), RESPONSE)
+    tables = {row[0] for row in cache._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "psi_results" not in tables and "runs" in tables
+    assert cache._db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    # Reopening a current store keeps its runs
+    assert PageSpeedCache(path=path).stats()["runs"] == 1
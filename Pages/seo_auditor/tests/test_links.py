@@ -0,0 +1,163 @@
+"""Link normalization, deduplication and result caching for status checks."""
+import threading
+import time
+from collections import Counter
+
+from seo_auditor import links
+from seo_auditor.link_cache import LinkStatusCache
+
+
+def test_normalize_link_collapses_equivalent_urls():
+    variants = [
+        "https://Example.com/about/",
+        "https://example.com:443/about#team",
+        "HTTPS://example.com/about?utm_source=nav&utm_medium=menu",
+        "https://example.com/about?gclid=abc",
+    ]
+    assert {links.normalize_link(url) for url in variants} == {"https://example.com/about"}
+
+
+def test_normalize_link_keeps_meaningful_params():
+    assert links.normalize_link("https://example.com/list?page=2&sort=asc&fbclid=x") == \
+        "https://example.com/list?page=2&sort=asc"
+    assert links.normalize_link("https://example.com/list?sort=asc&page=2") == \
+        links.normalize_link("https://example.com/list?page=2&sort=asc")
+    assert links.normalize_link("https://example.com/") == "https://example.com/"
+
+
+def test_ignored_params_from_env(monkeypatch):
+    monkeypatch.setenv("SEO_AUDITOR_IGNORED_PARAMS", "ref, session*")
+    assert links.normalize_link("https://example.com/?ref=nav&sessionid=1&utm_source=x") == \
+        "https://example.com/?utm_source=x"
+
+
+def test_check_links_checks_each_target_once():
+    checked = []
+
+    def checker(url):
+        checked.append(url)
+        return {"status": "ok", "status_class": "active-status", "final_url": "-", "status_code": 200}
+
+    urls = [
+        "https://example.com/a#top",
+        "https://example.com/b",
+        "https://example.com/a/",
+        "https://example.com/a?utm_campaign=menu",
+    ]
+    results = links.check_links_sync(urls, checker=checker, cache=False)
+
+    assert sorted(checked) == ["https://example.com/a", "https://example.com/b"]
+    assert len(results) == 4
+    assert all(result["status_code"] == 200 for result in results)
+    assert results[0] is not results[2]
+    # Rows keep their own href; the normalized key only groups them
+    assert [result["href"] for result in results] == urls
+    assert results[2]["checked_url"] == results[3]["checked_url"] == "https://example.com/a"
+
+
+def test_cached_results_skip_the_network(tmp_path):
+    cache = LinkStatusCache(str(tmp_path / "links.sqlite3"))
+    checked = []
+
+    def checker(url):
+        checked.append(url)
+        if url.endswith("/gone"):
+            return links.broken_result(404)
+        return {"status": "ok", "status_class": "active-status", "final_url": "-", "status_code": 200}
+
+    urls = ["https://example.com/ok", "https://example.com/gone", "https://example.com/slow"]
+    first = links.check_links_sync(urls[:2], checker=checker, cache=cache)
+    assert [result["from_cache"] for result in first] == [False, False]
+
+    second = links.check_links_sync(urls, checker=checker, cache=cache)
+    assert checked == urls[:2] + ["https://example.com/slow"]
+    assert [result["from_cache"] for result in second] == [True, True, False]
+    assert second[1]["status_code"] == 404
+
+
+def test_checks_are_capped_per_host():
+    lock = threading.Lock()
+    running = Counter()
+    peaks = Counter()
+
+    def checker(url):
+        host = links._host(url)
+        with lock:
+            running[host] += 1
+            peaks[host] = max(peaks[host], running[host])
+            peaks["all"] = max(peaks["all"], sum(running.values()))
+        time.sleep(0.05)
+        with lock:
+            running[host] -= 1
+        return {"status": "ok", "status_class": "active-status", "final_url": "-", "status_code": 200}
+
+    urls = [f"https://{host}.example/{i}" for host in ("a", "b", "c") for i in range(12)]
+    links.check_links_sync(urls, checker=checker, cache=False, per_host=2, max_concurrency=10)
+    assert peaks["a.example"] <= 2 and peaks["b.example"] <= 2 and peaks["c.example"] <= 2
+    # Hosts are still checked side by side
+    assert peaks["all"] > 2
+
+
+def test_timed_out_checks_are_reported_and_not_cached(tmp_path):
+    cache = LinkStatusCache(str(tmp_path / "links.sqlite3"))
+
+    def checker(url):
+        if url.endswith("/slow"):
+            time.sleep(0.5)
+        return {"status": "ok", "status_class": "active-status", "final_url": "-", "status_code": 200}
+
+    started = time.monotonic()
+    results = links.check_links_sync(["https://example.com/slow", "https://example.com/fast"],
+                                     checker=checker, cache=cache, timeout=0.1)
+    assert time.monotonic() - started < 0.4
+    assert [result["status_code"] for result in results] == ["Timeout", 200]
+    assert list(cache.lookup_many(["https://example.com/slow", "https://example.com/fast"])) == \
+        ["https://example.com/fast"]
+
+
+def test_broken_results_expire_sooner(tmp_path):
+    cache = LinkStatusCache(str(tmp_path / "links.sqlite3"), ttls={"broken-status": 0})
+    cache.store_many([
+        ("https://example.com/ok", {"status": "ok", "status_class": "active-status", "final_url": "-", "status_code": 200}),
+        ("https://example.com/gone", links.broken_result(404)),
+    ])
+    assert list(cache.lookup_many(["https://example.com/ok", "https://example.com/gone"])) == ["https://example.com/ok"]
+
+
+class _FakeResponse:
+    def __init__(self, url, status_code, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_head_fallback_uses_ranged_get_and_remembers_host(monkeypatch):
+    calls = []
+
+    def head(url, **kwargs):
+        calls.append(("HEAD", url))
+        return _FakeResponse(url, 405)
+
+    def get(url, headers=None, stream=False, **kwargs):
+        calls.append(("GET", url, headers["Range"], stream))
+        return _FakeResponse(url, 206, {"Content-Range": "bytes 0-0/1000000"})
+
+    monkeypatch.setattr(links.fetch, "head", head)
+    monkeypatch.setattr(links.fetch, "get", get)
+    links.forget_host_methods()
+
+    first = links.check_link_status("https://media.example.com/video.mp4")
+    second = links.check_link_status("https://media.example.com/report.pdf")
+    links.forget_host_methods()
+
+    assert calls == [
+        ("HEAD", "https://media.example.com/video.mp4"),
+        ("GET", "https://media.example.com/video.mp4", "bytes=0-0", True),
+        ("GET", "https://media.example.com/report.pdf", "bytes=0-0", True),
+    ]
+    assert first["status_code"] == 200 and first["range_honored"] is True
+    assert second["method"] == "GET"
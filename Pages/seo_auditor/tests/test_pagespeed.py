@@ -0,0 +1,54 @@
+"""PageSpeed Insights client against a local stand-in for the API."""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from seo_auditor import pagespeed
+from seo_auditor.pagespeed import PageSpeedCache, PageSpeedError, run_pagespeed
+
+
+calls = []
+
+
+def route(request):
+    query = parse_qs(urlsplit(request.path).query)
+    calls.append(query)
+    time.sleep(0.2)
+    if "broken" in query["url"][0]:
+        status, body = 400, {"error": {"code": 400, "message": "Lighthouse returned error: NO_FCP"}}
+    else:
+        status, body = 200, {"lighthouseResult": {"categories": {"performance": {"score": 0.9}}},
+                             "strategy": query["strategy"][0]}
+    return status, {"Content-Type": "application/json"}, json.dumps(body)
+
+
+@pytest.fixture
+def api(local_server, monkeypatch, tmp_path):
+    calls.clear()
+    monkeypatch.setattr(pagespeed, "API_URL", f"{local_server(route)}/runPagespeed")
+    return PageSpeedCache(path=str(tmp_path / "psi.sqlite3"))
+
+
+def test_identical_requests_share_one_run_and_the_cache(api):
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: run_pagespeed("https://example.com/", cache=api), range(10)))
+    assert len(calls) == 1 and all(result == results[0] for result in results)
+    assert calls[0]["category"] == ["PERFORMANCE"]
+
+    # Same page under another spelling: served from the cache
+    assert run_pagespeed("HTTPS://Example.com/#top", cache=api) == results[0]
+    assert len(calls) == 1
+
+    assert run_pagespeed("https://example.com/", strategy="desktop", cache=api)["strategy"] == "desktop"
+    run_pagespeed("https://example.com/", categories=("performance", "seo"), cache=api)
+    assert len(calls) == 3
+
+
+def test_errors_are_raised_and_not_cached(api):
+    for _ in range(2):
+        with pytest.raises(PageSpeedError, match="NO_FCP"):
+            run_pagespeed("https://broken.example/", cache=api)
+    assert len(calls) == 2 and api.stats()["entries"] == 0
@@ -0,0 +1,185 @@
+"""Conformance tests: every installed parser backend must extract the same data."""
+import pytest
+
+from seo_auditor import parsers
+from seo_auditor.document import AuditDocument
+
+BASE_URL = "https://shop.example.com/category/shoes"
+
+PAGES = {
+    "product": """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>
+    Running Shoes &amp; Trainers | Example Shop
+  </title>
+  <meta name="Description" content="  Lightweight running shoes for road and trail.  ">
+  <meta name="keywords" content="running, shoes, trainers">
+  <meta name="description" content="duplicate that must be ignored">
+  <meta property="og:title" content="Not a named meta">
+  <link rel="stylesheet" href="/style.css">
+  <link rel="canonical" href="https://shop.example.com/category/shoes">
+  <script>var title = "<title>not a title</title>";</script>
+</head>
+<body>
+  <!-- <h1>commented out heading</h1> -->
+  <h1>Running <em>Shoes</em></h1>
+  <div class="intro">
+    <p>Find the <strong>perfect</strong> pair.</p>
+    <h2>Road</h2>
+    <h2>Trail &gt; Mountain</h2>
+  </div>
+  <h3>
+     Sizing   guide
+  </h3>
+  <img src="/img/hero.jpg" alt="Hero shoe">
+  <img src="thumb.png">
+  <img alt="no source">
+  <IMG SRC="https://cdn.example.com/a.webp" ALT="">
+  <a href="/category/boots">Boots</a>
+  <a href="https://partner.example.org/" rel="nofollow sponsored">Partner
+     <span>site</span></a>
+  <a href="#top">Back to top</a>
+  <a href="javascript:void(0)">Open menu</a>
+  <a name="anchor-only">No href</a>
+  <A HREF="?page=2" REL="NoFollow">Next &raquo;</A>
+  <iframe src="https://www.youtube.com/embed/abc" width="560" height="315" title="Review"></iframe>
+  <iframe src="https://ads.example.net/frame"></iframe>
+  <video width="640"><source src="/media/clip.mp4" type="video/mp4"></video>
+  <h6>Footer</h6>
+</body>
+</html>""",
+    # Tag soup the backends agree on. Recovery from unclosed headings is not
+    # compared: html.parser doesn't implement HTML5 tree construction.
+    "malformed": """<html><head><title>Broken page</title>
+<meta name=description content=Unquoted>
+</head><body>
+<h1>Heading</h1>
+<p>First paragraph
+<p>Second <a href=/one>one</a>
+<h2>Second level</h2>
+<img src=/x.gif alt=x>
+<a href="/two" rel=nofollow>two</a>
+</body></html>""",
+    "empty": "",
+    "no-head": "<p>Just a paragraph with <a href='https://example.com'>a link</a>.</p>",
+}
+
+
+def _extract(html, backend):
+    doc = AuditDocument(html, BASE_URL, backend=backend)
+    return {
+        "title": doc.title,
+        "meta": doc.meta,
+        "headings": doc.headings,
+        "images": doc.images,
+        "links": doc.links,
+        "canonical": doc.canonical,
+        "videos": doc.videos,
+        "paragraph_count": doc.paragraph_count,
+        "iframes": doc.iframes,
+    }
+
+
+BACKENDS = parsers.available_backends()
+
+
+def test_reference_backend_is_available():
+    assert "html.parser" in BACKENDS
+
+
+@pytest.mark.parametrize("backend", [name for name in BACKENDS if name != "html.parser"])
+@pytest.mark.parametrize("page", sorted(PAGES))
+def test_backend_matches_html_parser(backend, page):
+    expected = _extract(PAGES[page], "html.parser")
+    assert _extract(PAGES[page], backend) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_product_page_extraction(backend):
+    data = _extract(PAGES["product"], backend)
+
+    assert data["title"] == "Running Shoes & Trainers | Example Shop"
+    assert data["meta"] == {
+        "description": "Lightweight running shoes for road and trail.",
+        "keywords": "running, shoes, trainers",
+    }
+    assert data["headings"] == [
+        ("H1", "Running Shoes"),
+        ("H2", "Road"),
+        ("H2", "Trail > Mountain"),
+        ("H3", "Sizing   guide"),
+        ("H6", "Footer"),
+    ]
+    assert data["images"] == [
+        ("https://shop.example.com/img/hero.jpg", "Hero shoe"),
+        ("https://shop.example.com/category/thumb.png", "No Alt Text"),
+        ("https://cdn.example.com/a.webp", ""),
+    ]
+    assert data["canonical"] == "https://shop.example.com/category/shoes"
+    assert data["videos"] == [
+        ("https://www.youtube.com/embed/abc", "Review", "560x315"),
+        ("/media/clip.mp4", "No Title", "640xUnknown"),
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_link_extraction(backend):
+    links = _extract(PAGES["product"], backend)["links"]
+
+    assert [link["href"] for link in links] == [
+        "/category/boots",
+        "https://partner.example.org/",
+        "#top",
+        "javascript:void(0)",
+        None,
+        "?page=2",
+    ]
+    assert links[1]["text"] == "Partner site"
+    assert links[1]["rel"] == ["nofollow", "sponsored"]
+    assert links[5] == {"href": "?page=2", "text": "Next »", "rel": ["nofollow"]}
+
+
+@pytest.mark.parametrize("backend", [name for name in BACKENDS if name != "html.parser"])
+def test_page_text_matches_html_parser(backend):
+    expected = AuditDocument(PAGES["product"], BASE_URL, backend="html.parser").text
+    assert AuditDocument(PAGES["product"], BASE_URL, backend=backend).text == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_document(backend):
+    data = _extract("", backend)
+    assert data["title"] is None
+    assert data["links"] == [] and data["images"] == [] and data["headings"] == []
+
+
+def test_get_backend_honours_env(monkeypatch):
+    monkeypatch.setenv("SEO_AUDITOR_PARSER", "html.parser")
+    assert parsers.get_backend().name == "html.parser"
+
+
+def test_auto_selection_prefers_fastest_installed():
+    assert parsers.get_backend().name == BACKENDS[0]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_visible_text_counts_each_node_once(backend):
+    html = """<html><head><title>Title</title><style>p { color: red }</style></head><body>
+    <div><div><div><span>Deeply <b>nested</b> words.</span></div></div></div>
+    <script>var hidden = "not text";</script>
+    <noscript>Enable JavaScript</noscript>
+    <ul><li>List item</li></ul>
+    </body></html>"""
+    doc = AuditDocument(html, BASE_URL, backend=backend)
+
+    assert list(doc.iter_text()) == ["Deeply nested words.", "List item"]
+    assert doc.text_stats.word_count == 5
+    assert doc.text_stats.sentence_count == 2
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_inline_tags_do_not_split_words(backend):
+    doc = AuditDocument("<p><b>un</b>believable <em>results</em>.</p><p>Next<br>line</p>", BASE_URL, backend=backend)
+    assert list(doc.iter_text()) == ["unbelievable results.", "Next", "line"]
+    assert doc.text_stats.word_count == 4
@@ -0,0 +1,45 @@
+"""Stage ordering, concurrency and progress of the audit pipeline."""
+import threading
+
+import pytest
+
+from seo_auditor.pipeline import DONE, Stage, StageFailed, run_pipeline
+
+
+def test_stages_run_after_their_inputs_and_independent_ones_overlap():
+    both_started = threading.Barrier(2, timeout=5)
+
+    def branch(name):
+        def func(results, report):
+            both_started.wait()  # deadlocks unless the two branches run concurrently
+            report(0.5)
+            return f"{name}:{results['parse']}"
+        return func
+
+    events = []
+    results = run_pipeline([
+        Stage("fetch", "Fetching", lambda results, report: "<html>", weight=2),
+        Stage("parse", "Parsing", lambda results, report: len(results["fetch"]), requires=["fetch"]),
+        Stage("images", "Images", branch("images"), requires=["parse"]),
+        Stage("readability", "Readability", branch("readability"), requires=["parse"]),
+    ], progress=events.append)
+
+    assert results == {"fetch": "<html>", "parse": 6, "images": "images:6", "readability": "readability:6"}
+    fractions = [event.fraction for event in events]
+    assert fractions == sorted(fractions) and fractions[-1] == 1.0
+    assert [event.stage for event in events if event.status == DONE][:2] == ["fetch", "parse"]
+
+
+def test_failure_stops_dependent_stages():
+    ran = []
+
+    def boom(results, report):
+        raise RuntimeError("no route to host")
+
+    with pytest.raises(StageFailed) as excinfo:
+        run_pipeline([
+            Stage("fetch", "Fetching", boom),
+            Stage("parse", "Parsing", lambda results, report: ran.append("parse"), requires=["fetch"]),
+        ])
+    assert excinfo.value.stage == "fetch"
+    assert ran == []
@@ -0,0 +1,89 @@
+"""PageSpeed batch scheduler against a local stub of the PSI API."""
+import gc
+import json
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from seo_auditor import pagespeed
+from seo_auditor.pagespeed import PageSpeedCache
+from seo_auditor.psi_batch import PageSpeedBatch
+
+RESULT = {
+    "lighthouseResult": {
+        "categories": {"performance": {"score": 0.87}},
+        "audits": {"largest-contentful-paint": {"numericValue": 2100.0}, "cumulative-layout-shift": {"numericValue": 0.02}},
+    },
+    "loadingExperience": {"metrics": {"CUMULATIVE_LAYOUT_SHIFT_SCORE": {"percentile": 5}}, "overall_category": "FAST"},
+}
+
+
+served = SimpleNamespace(lock=threading.Lock(), calls=Counter(), times=[], active=0, peak=0)
+
+
+def route(request):
+    query = parse_qs(urlsplit(request.path).query)
+    url, strategy = query["url"][0], query["strategy"][0]
+    with served.lock:
+        served.calls[url] += 1
+        served.times.append(time.monotonic())
+        served.active += 1
+        served.peak = max(served.peak, served.active)
+        attempt = served.calls[url]
+    time.sleep(0.1)
+    if "broken" in url:
+        status, body = 400, {"error": {"code": 400, "message": "Invalid URL"}}
+    elif "flaky" in url and attempt == 1:
+        status, body = 503, {"error": {"code": 503, "message": "Backend unavailable"}}
+    else:
+        status, body = 200, {**RESULT, "id": url, "strategy": strategy}
+    with served.lock:
+        served.active -= 1
+    return status, {"Content-Type": "application/json"}, json.dumps(body)
+
+
+@pytest.fixture
+def api(local_server, monkeypatch, tmp_path):
+    served.calls, served.times, served.active, served.peak = Counter(), [], 0, 0
+    monkeypatch.setattr(pagespeed, "API_URL", f"{local_server(route)}/runPagespeed")
+    return PageSpeedCache(path=str(tmp_path / "psi.sqlite3"))
+
+
+def test_runs_both_strategies_in_parallel_with_retries(api, tmp_path):
+    results = []
+    batch = PageSpeedBatch(str(tmp_path / "state.sqlite3"), qps=0, backoff=0.01, cache=api)
+    counts = batch.run(["https://a.example/", "https://flaky.example/", "https://broken.example/"],
+                       on_result=lambda *result: results.append(result))
+
+    assert counts == {"done": 4, "failed": 2}
+    assert served.peak >= 2
+    # The 503 was retried once per strategy, the 400 never
+    assert served.calls["https://flaky.example/"] == 3 and served.calls["https://broken.example/"] == 2
+    failed = [result for result in results if result[2] == "failed"]
+    assert {result[1] for result in failed} == {"mobile", "desktop"} and failed[0][3] == "Invalid URL"
+    assert batch.state.used() == 7
+
+
+def test_quota_stops_the_batch_and_resume_finishes_it(api, tmp_path):
+    state = str(tmp_path / "state.sqlite3")
+    urls = [f"https://site.example/{i}" for i in range(3)]
+    first = PageSpeedBatch(state, qps=0, daily_quota=2, workers=1, strategies=("mobile",), cache=api)
+    assert first.run(urls) == {"done": 2, "pending": 1} and first.quota_exhausted
+    first.close()
+
+    resumed = PageSpeedBatch(state, qps=0, daily_quota=3, strategies=("mobile",), cache=api)
+    assert resumed.run(urls) == {"done": 3}
+    assert sum(served.calls.values()) == 3
+
+
+def test_rate_limit_spaces_requests(api, tmp_path):
+    # Arrival times are measured at the server, so keep a collection of earlier tests' garbage out of them
+    gc.collect()
+    batch = PageSpeedBatch(str(tmp_path / "state.sqlite3"), qps=20, strategies=("mobile",), cache=api)
+    batch.run([f"https://site.example/{i}" for i in range(5)])
+    gaps = [later - earlier for earlier, later in zip(served.times, served.times[1:])]
+    assert len(gaps) == 4 and min(gaps) >= 0.04
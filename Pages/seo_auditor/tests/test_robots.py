@@ -0,0 +1,76 @@
+"""robots.txt parsing, matching and analysis."""
+from seo_auditor.robots import analyze_robots_txt, parse_robots
+
+ROBOTS = """# Example
+User-agent: *
+Disallow: /admin
+Allow: /admin/public
+Disallow: /*.pdf$
+Disallow: /search?*sort=
+Crawl-delay: 2
+Sitemap: https://example.com/sitemap.xml
+
+User-agent: Googlebot
+User-agent: Bingbot
+Disallow: /private
+Allow: /page
+Disallow: /page
+
+User-agent: Googlebot-Image
+Disallow: /
+"""
+
+
+def test_groups_and_longest_match():
+    robots = parse_robots(ROBOTS)
+    assert [group.user_agents for group in robots.groups] == [["*"], ["googlebot", "bingbot"], ["googlebot-image"]]
+    assert robots.sitemaps == ["https://example.com/sitemap.xml"]
+
+    default = robots.matcher("*")
+    assert default.crawl_delay == 2
+    assert not default.allowed("https://example.com/admin/users")
+    assert default.allowed("https://example.com/admin/public/logo.png")
+    assert not default.allowed("/files/report.pdf")
+    assert default.allowed("/files/report.pdf?download=1")
+    assert not default.allowed("/search?q=x&sort=asc")
+    assert default.allowed("/search?q=x")
+    assert default.allowed("/administrator") is False
+    assert default.allowed("/robots.txt")
+
+
+def test_most_specific_agent_group_applies():
+    robots = parse_robots(ROBOTS)
+    googlebot = robots.matcher("Googlebot/2.1")
+    # Same length Allow and Disallow: Allow wins
+    assert googlebot.allowed("/page") and not googlebot.allowed("/private/x")
+    assert googlebot.allowed("/admin")
+    assert not robots.matcher("Googlebot-Image/1.0").allowed("/page")
+    assert robots.matcher("SomeOtherBot").crawl_delay == 2
+
+
+def test_analysis_only_flags_whole_site_blocks():
+    analysis = analyze_robots_txt({"status": "success", "content": ROBOTS})
+    assert analysis["disallow_count"] == 6 and analysis["allow_count"] == 2
+    assert analysis["crawl_delay"] == 2 and analysis["has_wildcard_agent"]
+    types = [issue["type"] for issue in analysis["issues"]]
+    assert "critical" not in types
+    assert any("googlebot-image" in issue["message"] for issue in analysis["issues"])
+
+    blocked = analyze_robots_txt({"status": "success", "content": "User-agent: *\nDisallow: /\n"})
+    assert [issue["type"] for issue in blocked["issues"]].count("critical") == 1
+
+
+def test_sitemap_line_does_not_split_a_group():
+    # Sitemap is a non-group record (RFC 9309 section 2.3.5), so it doesn't end a run of User-agent lines
+    robots = parse_robots("User-agent: a\nSitemap: https://example.com/s.xml\nUser-agent: b\nDisallow: /b\n")
+    assert [group.user_agents for group in robots.groups] == [["a", "b"]]
+    assert robots.sitemaps == ["https://example.com/s.xml"]
+    assert not robots.matcher("a").allowed("/b") and not robots.matcher("b").allowed("/b")
+
+
+def test_comment_lines_are_not_empty_lines():
+    content = "# one\n# two\n# three\n# four\nUser-agent: *\nDisallow: /private\nAllow: /\n"
+    robots = parse_robots(content)
+    assert robots.empty_lines == 0
+    issues = analyze_robots_txt({"status": "success", "content": content})["issues"]
+    assert not any("empty lines" in issue["message"] for issue in issues)
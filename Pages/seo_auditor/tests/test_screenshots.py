@@ -0,0 +1,32 @@
+"""Screenshot store keys, expiry and eviction."""
+import time
+
+from seo_auditor.screenshots import ScreenshotStore, request_preview, screenshot_key
+
+
+def test_key_depends_on_viewport_and_content():
+    base = screenshot_key("https://Example.com/#top", "1280x1024", "abc")
+    assert base == screenshot_key("https://example.com/", "1280x1024", "abc")
+    assert base != screenshot_key("https://example.com/", "375x812", "abc")
+    assert base != screenshot_key("https://example.com/", "1280x1024", "def")
+
+
+def test_stored_preview_is_served_without_a_browser(tmp_path):
+    store = ScreenshotStore(str(tmp_path / "shots.sqlite3"))
+    key = screenshot_key("https://example.com/", "1280x1024", "abc")
+    store.store(key, "https://example.com/", "1280x1024", "abc", b"png", b"webp")
+
+    assert request_preview("https://example.com/", "abc", store=store).result(timeout=1) == b"webp"
+    assert store.lookup(key, full=True) == b"png"
+
+
+def test_expired_and_oversized_entries_are_dropped(tmp_path):
+    store = ScreenshotStore(str(tmp_path / "shots.sqlite3"), ttl=3600, max_bytes=25)
+    for name in ("a", "b", "c"):
+        store.store(name, f"https://example.com/{name}", "1280x1024", name, b"x" * 8, b"y" * 2)
+        time.sleep(0.01)
+    assert store.lookup("a") is None
+    assert store.lookup("c") == b"yy"
+
+    store.ttl = 0
+    assert store.lookup("c") is None
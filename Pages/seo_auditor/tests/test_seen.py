@@ -0,0 +1,44 @@
+"""Compact seen-URL set."""
+import os
+
+from seo_auditor.seen import SeenSet, fingerprint
+
+
+def urls(count, start=0):
+    return [f"https://example.com/page/{i}" for i in range(start, start + count)]
+
+
+def test_add_reports_new_keys_and_grows():
+    seen = SeenSet()
+    assert all(seen.add(url) for url in urls(5000))
+    assert not any(seen.add(url) for url in urls(5000))
+    assert len(seen) == 5000
+    assert "https://example.com/page/4999" in seen
+    assert "https://example.com/page/5000" not in seen
+    assert seen.stats()["memory_bytes"] < 5000 * 16
+
+
+def test_spills_to_disk_and_still_answers(tmp_path):
+    seen = SeenSet(bloom_capacity=3000, spill_entries=1000, spill_dir=str(tmp_path))
+    for url in urls(2500):
+        seen.add(url)
+    stats = seen.stats()
+    assert stats["spilled_entries"] == 2000 and stats["disk_bytes"] == 2000 * 8
+    assert len(os.listdir(tmp_path)) == 1
+
+    assert all(url in seen for url in urls(2500))
+    assert not any(url in seen for url in urls(500, start=2500))
+    assert not seen.add("https://example.com/page/10")
+    assert sorted(seen.fingerprints()) == sorted(fingerprint(url) for url in urls(2500))
+
+    seen.close()
+    assert os.listdir(tmp_path) == [] and len(seen) == 0
+
+
+def test_fingerprints_round_trip(tmp_path):
+    seen = SeenSet(spill_entries=100, spill_dir=str(tmp_path))
+    seen.update(urls(250))
+    copy = SeenSet()
+    for fp in seen.fingerprints():
+        copy.add_fingerprint(fp)
+    assert len(copy) == 250 and all(url in copy for url in urls(250))
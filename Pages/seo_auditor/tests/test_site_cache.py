@@ -0,0 +1,57 @@
+"""Host-keyed robots.txt/sitemap cache with single-flight loading."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from seo_auditor.site_cache import FAILURE_TTL, MAX_TTL, SingleFlightCache, get_robots, ttl_from_headers
+
+
+def test_concurrent_misses_share_one_load():
+    cache = SingleFlightCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value", 60
+
+    with ThreadPoolExecutor(max_workers=30) as pool:
+        results = list(pool.map(lambda _: cache.get("example.com", load), range(30)))
+    assert results == ["value"] * 30 and len(calls) == 1
+    assert cache.stats()["misses"] == 1 and cache.stats()["coalesced"] + cache.stats()["hits"] == 29
+
+
+def test_failures_and_zero_ttl_are_not_kept():
+    cache = SingleFlightCache()
+    with pytest.raises(ValueError):
+        cache.get("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert cache.get("k", lambda: (1, 0)) == 1
+    assert cache.get("k", lambda: (2, 60)) == 2
+    assert cache.get("k", lambda: (3, 60)) == 2
+
+
+def test_ttl_follows_caching_headers():
+    assert ttl_from_headers({}, 3600) == 3600
+    assert ttl_from_headers({"Cache-Control": "max-age=120"}, 3600) == 120
+    assert ttl_from_headers({"Cache-Control": "max-age=9999999"}, 3600) == MAX_TTL
+    assert ttl_from_headers({"Cache-Control": "no-store"}, 3600) == 0
+    assert ttl_from_headers(None, 3600) == FAILURE_TTL
+
+
+def test_get_robots_fetches_each_host_once(local_server):
+    requests = []
+
+    def serve_robots(request):
+        requests.append(request.path)
+        time.sleep(0.1)
+        return 200, {"Cache-Control": "max-age=300"}, b"User-agent: *\nDisallow: /admin\n"
+
+    base = local_server({"/robots.txt": serve_robots})
+    cache = SingleFlightCache()
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        found = list(pool.map(lambda i: get_robots(f"{base}/page/{i}", cache=cache), range(10)))
+    assert requests == ["/robots.txt"]
+    result, robots, analysis = found[0]
+    assert result["status"] == "success" and not robots.matcher().allowed("/admin/x")
+    assert analysis["disallow_count"] == 1
@@ -0,0 +1,161 @@
+"""Streaming sitemap parsing and analysis."""
+import gzip
+import time
+
+import pytest
+
+from seo_auditor import fetch
+from seo_auditor.cache import ResponseCache
+from seo_auditor.seen import SeenSet
+from seo_auditor.sitemaps import SitemapParser, analyze_sitemap, expand_sitemaps, fetch_sitemap, parse_sitemap
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(count, host="https://example.com"):
+    entries = "".join(
+        f"<url><loc>{host}/p/{i}</loc>{'<lastmod>2024-01-01</lastmod>' if i % 2 else ''}</url>" for i in range(count)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+SITEMAPS = {
+    "/sitemap.xml": urlset(3),
+    "/big.xml.gz": gzip.compress(urlset(5000)),
+    "/broken.xml": b"<urlset><url><loc>https://example.com/</loc></urlset>",
+    "/copy.xml": urlset(3),
+}
+
+
+def index(base, children):
+    entries = "".join(f"<sitemap><loc>{base}{child}</loc></sitemap>" for child in children)
+    return f"<sitemapindex {NS}>{entries}</sitemapindex>".encode()
+
+
+conditional = []
+
+
+def etag(request):
+    conditional.append(request.headers.get("If-None-Match"))
+    if request.headers.get("If-None-Match") == '"s1"':
+        return 304, {}, None
+    return 200, {"Cache-Control": "no-cache", "ETag": '"s1"'}, SITEMAPS["/sitemap.xml"]
+
+
+def route(request):
+    base = request.server.base
+    if request.path == "/etag.xml":
+        return etag(request)
+    if request.path == "/index.xml":
+        body = index(base, [f"/child-{i}.xml" for i in range(10)] + ["/nested.xml", "/missing.xml"])
+    elif request.path == "/overlap.xml":
+        body = index(base, ["/sitemap.xml", "/copy.xml"])
+    elif request.path == "/nested.xml":
+        body = index(base, ["/child-0.xml", "/deep.xml"])
+    elif request.path.startswith(("/child-", "/deep")):
+        time.sleep(0.2)
+        body = urlset(100, host=f"{base}{request.path[:-4]}")
+    else:
+        body = SITEMAPS.get(request.path)
+    return (200, {}, body) if body else (404, {}, b"")
+
+
+@pytest.fixture
+def server(local_server):
+    return local_server(route)
+
+
+def test_parser_streams_entries_in_any_chunking():
+    data = urlset(200)
+    seen = []
+    parser = SitemapParser(on_url=seen.append)
+    for i in range(0, len(data), 7):
+        parser.feed(data[i:i + 7])
+        # Finished entries are dropped as the parse goes
+        assert parser._root is None or len(parser._root) <= 1
+    summary = parser.close()
+    assert summary["url_count"] == 200 and summary["lastmod_count"] == 100
+    assert seen == [f"https://example.com/p/{i}" for i in range(200)]
+
+
+def test_index_and_cross_domain_analysis():
+    index = f'<sitemapindex {NS}><sitemap><loc>https://example.com/a.xml</loc><lastmod>2024-01-01</lastmod></sitemap></sitemapindex>'
+    summary = parse_sitemap(index)
+    assert summary["nested_sitemaps"] == ["https://example.com/a.xml"] and summary["url_count"] == 0
+
+    mixed = urlset(4).replace(b"example.com/p/3", b"example.org/p/3")
+    analysis = analyze_sitemap({"status": "success", "summary": parse_sitemap(mixed)}, "https://example.com/")
+    assert analysis["url_count"] == 4 and analysis["lastmod_coverage"] == 0.5
+    assert any("1 URLs from different domains" in issue["message"] for issue in analysis["issues"])
+
+
+def test_fetch_gzipped_and_invalid_sitemaps(server):
+    result = fetch_sitemap(f"{server}/big.xml.gz")
+    assert result["status"] == "success" and result["summary"]["gzipped"]
+    assert analyze_sitemap(result, server)["url_count"] == 5000
+    assert result["content"].startswith("<?xml")
+
+    assert fetch_sitemap(f"{server}/broken.xml")["message"] == "Invalid XML format in sitemap"
+    assert fetch_sitemap(f"{server}/sitemap.xml")["summary"]["url_count"] == 3
+
+
+def test_unchanged_sitemap_is_revalidated_and_parsed_from_the_cache(server, monkeypatch, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setattr(fetch, "get_cache", lambda: cache)
+    conditional.clear()
+    found = []
+    first = fetch_sitemap(f"{server}/etag.xml")
+    second = fetch_sitemap(f"{server}/etag.xml", on_url=found.append)
+    assert conditional == [None, '"s1"']
+    assert first["summary"] == second["summary"] and len(found) == 3
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_oversized_sitemap_is_truncated():
+    parser = SitemapParser(max_bytes=1000)
+    parser.feed(gzip.compress(urlset(100)))
+    summary = parser.close()
+    assert summary["truncated"] and 0 < summary["url_count"] < 100
+
+
+def test_expand_fetches_children_concurrently_and_merges(server):
+    found = []
+    started = time.monotonic()
+    result = expand_sitemaps([f"{server}/index.xml"], on_url=found.append)
+    elapsed = time.monotonic() - started
+
+    # Ten children plus deep.xml at 0.2 s each, fetched eight at a time
+    assert elapsed < 1.5
+    summary = result["summary"]
+    assert summary["url_count"] == len(found) == 1100
+    assert summary["lastmod_count"] == 550
+    assert {sitemap["status"] for sitemap in result["sitemaps"]} == {"success", "error"}
+    assert sum(1 for sitemap in result["sitemaps"] if sitemap["url"].endswith("/child-0.xml")) == 1
+
+    analysis = analyze_sitemap(result, server)
+    assert analysis["is_index"] and analysis["sitemaps_fetched"] == 13 and analysis["sitemaps_failed"] == 1
+    assert any("1 of 14 sitemaps could not be fetched" in issue["message"] for issue in analysis["issues"])
+
+
+def test_expand_respects_depth_and_url_limits(server):
+    shallow = expand_sitemaps([f"{server}/index.xml"], max_depth=1)
+    assert not any(sitemap["url"].endswith("/deep.xml") for sitemap in shallow["sitemaps"])
+    assert shallow["summary"]["limited"]
+
+    found = []
+    expand_sitemaps([f"{server}/index.xml"], on_url=found.append, max_urls=150)
+    assert len(found) == 150
+
+
+def test_expand_passes_each_url_on_once(server):
+    found = []
+    result = expand_sitemaps([f"{server}/overlap.xml"], on_url=found.append)
+    assert result["summary"]["url_count"] == 6
+    assert found == list(dict.fromkeys(found)) and len(found) == 3
+
+    # URLs the caller has already seen are left out
+    seen = SeenSet()
+    seen.add("https://example.com/p/0")
+    found = []
+    expand_sitemaps([f"{server}/overlap.xml"], on_url=found.append, seen=seen)
+    assert sorted(found) == ["https://example.com/p/1", "https://example.com/p/2"]
@@ -0,0 +1,64 @@
+"""Streaming statistics over a page's visible text.
+
+The walker yields the visible text once, as whitespace-collapsed chunks
+split at block elements (text around inline tags stays in one chunk).
+``TextStats`` consumes those chunks one at a time, so word counts, sentence
+counts and keyword frequencies never need the whole page text as one
+string. Chunks are treated as if joined with a single space.
+"""
+from collections import Counter
+
+STOP_WORDS = {'the', 'and', 'to', 'of', 'a', 'in', 'that', 'is', 'it', 'for', 'with', 'as', 'on', 'was', 'are', 'by', 'this', 'from', 'be'}
+
+# Words longer than this count as "long" in the simple readability formula
+LONG_WORD_LENGTH = 6
+
+# Keywords must be longer than this to be counted
+MIN_KEYWORD_LENGTH = 3
+
+
+class TextStats:
+    """Word, sentence and keyword counts accumulated chunk by chunk."""
+
+    def __init__(self):
+        self.word_count = 0
+        self.long_word_count = 0
+        # Non-empty segments between '.' characters, as in text.split('.')
+        self.sentence_count = 0
+        self.keyword_counts = Counter()
+        self._segment_has_text = False
+
+    def feed(self, chunk):
+        for word in chunk.split():
+            self.word_count += 1
+            if len(word) > LONG_WORD_LENGTH:
+                self.long_word_count += 1
+            word = word.lower()
+            if len(word) > MIN_KEYWORD_LENGTH and word not in STOP_WORDS:
+                self.keyword_counts[word] += 1
+
+        segments = chunk.split(".")
+        for index, segment in enumerate(segments):
+            if index:
+                # A '.' closed the previous segment
+                self.sentence_count += self._segment_has_text
+                self._segment_has_text = False
+            if segment.strip():
+                self._segment_has_text = True
+
+    def close(self):
+        self.sentence_count += self._segment_has_text
+        self._segment_has_text = False
+        return self
+
+    def common_words(self, limit=20):
+        """Most frequent keywords as (word, count), ties in first-seen order."""
+        return self.keyword_counts.most_common(limit)
+
+
+def analyze_text(chunks):
+    """Feed every chunk from an iterable into a new TextStats."""
+    stats = TextStats()
+    for chunk in chunks:
+        stats.feed(chunk)
+    return stats.close()
@@ -0,0 +1,177 @@
+"""Single-pass collection of every page metric the audit pages use.
+
+``parse_html`` used to scan the tree a dozen times (once per heading level,
+then for text containers, paragraphs, links, images, iframes and videos).
+``walk_metrics`` gathers all of it from one depth-first walk of the parsed
+page, so the cost is O(nodes) once.
+"""
+import urllib.parse
+from collections import namedtuple
+
+from seo_auditor.parsers import END, TEXT, collapse_whitespace
+
+VIDEO_HOSTS = ["youtube", "vimeo", "wistia", "dailymotion"]
+
+HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+# Elements whose character data is never text
+SKIPPED_TEXT_TAGS = {"script", "style"}
+
+# Elements whose text isn't visible page content (the title is reported separately)
+INVISIBLE_TAGS = {"head", "title", "noscript", "template"}
+
+# Elements that flow inside a line: text on either side of their tags joins without a break
+INLINE_TAGS = {
+    "a", "abbr", "b", "bdi", "bdo", "cite", "code", "data", "del", "dfn", "em", "font", "i", "ins",
+    "kbd", "label", "mark", "q", "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var",
+}
+
+PageMetrics = namedtuple("PageMetrics", [
+    "title",            # first <title> text, or None
+    "meta",             # lower-cased meta name -> content, first occurrence wins
+    "headings",         # (level, text), all H1s first, then H2s, ...
+    "text_chunks",      # visible text between block boundaries, whitespace-collapsed
+    "paragraph_count",
+    "links",            # dicts with href, text and rel for every <a>
+    "images",           # (absolute src, alt) for each <img> with a src
+    "iframes",          # attribute dicts of every <iframe>
+    "videos",           # (src, title, dimensions) for players and <video> tags
+    "canonical",        # href of the first <link rel="canonical">, or None
+])
+
+
+def video_entry(src, attrs):
+    width = attrs.get("width", "Unknown")
+    height = attrs.get("height", "Unknown")
+    return (src, attrs.get("title", "No Title"), f"{width}x{height}" if width != "Unknown" else "Unknown")
+
+
+def walk_metrics(page, base_url):
+    """Collect all page metrics from a single walk over ``page``."""
+    title_pieces = None
+    meta = {}
+    headings = []       # (level, pieces)
+    text_chunks = []
+    paragraph_count = 0
+    anchors = []        # (attrs, pieces)
+    images = []
+    iframes = []
+    player_videos = []  # (src, attrs) of iframes embedding a video host
+    html5_videos = []   # [src, attrs, source_seen], src may come from a <source>
+    open_videos = []
+    canonical = None
+
+    # One entry per open element: the piece list gathering its text, or None.
+    # Headings, anchors and the title gather their own text; the page text
+    # takes each visible text node exactly once, and text nodes separated
+    # only by inline tags form one chunk ("<b>un</b>believable" is one word).
+    stack = []
+    collecting = []
+    skip_depth = 0
+    hidden_depth = 0
+    line = []
+
+    def end_line():
+        chunk = collapse_whitespace("".join(line))
+        if chunk:
+            text_chunks.append(chunk)
+        line.clear()
+
+    for kind, value in page.walk():
+        if kind == TEXT:
+            if skip_depth:
+                continue
+            for pieces in collecting:
+                pieces.append(value)
+            if not hidden_depth:
+                line.append(value)
+            continue
+
+        if (value if kind == END else value.tag) not in INLINE_TAGS and line:
+            end_line()
+
+        if kind == END:
+            pieces = stack.pop()
+            if pieces is not None:
+                collecting.pop()
+            if value in SKIPPED_TEXT_TAGS:
+                skip_depth -= 1
+            elif value in INVISIBLE_TAGS:
+                hidden_depth -= 1
+            elif value == "video" and open_videos:
+                open_videos.pop()
+            continue
+
+        tag = value.tag
+        pieces = None
+
+        if tag in SKIPPED_TEXT_TAGS:
+            skip_depth += 1
+        elif tag in INVISIBLE_TAGS:
+            hidden_depth += 1
+            if tag == "title" and title_pieces is None:
+                pieces = title_pieces = []
+        elif tag == "p":
+            paragraph_count += 1
+        elif tag in HEADING_LEVELS:
+            pieces = []
+            headings.append((HEADING_LEVELS[tag], pieces))
+        elif tag == "a":
+            pieces = []
+            anchors.append((value.attrs, pieces))
+        elif tag == "meta":
+            name = value.get("name")
+            if name is not None:
+                name = name.strip().lower()
+                if name not in meta:
+                    meta[name] = value.get("content", "").strip()
+        elif tag == "link":
+            if canonical is None and "canonical" in value.get("rel", "").lower().split():
+                canonical = value.get("href") or None
+        elif tag == "img":
+            src = value.get("src")
+            if src:
+                images.append((urllib.parse.urljoin(base_url, src), value.get("alt", "No Alt Text")))
+        elif tag == "iframe":
+            attrs = value.attrs
+            iframes.append(attrs)
+            src = attrs.get("src", "")
+            if any(domain in src for domain in VIDEO_HOSTS):
+                player_videos.append((src, attrs))
+        elif tag == "video":
+            entry = [value.get("src", ""), value.attrs, False]
+            html5_videos.append(entry)
+            open_videos.append(entry)
+        elif tag == "source":
+            # The first <source> inside a <video> without its own src supplies it
+            if open_videos and not open_videos[-1][2]:
+                open_videos[-1][2] = True
+                if not open_videos[-1][0]:
+                    open_videos[-1][0] = value.get("src", "")
+
+        stack.append(pieces)
+        if pieces is not None:
+            collecting.append(pieces)
+
+    end_line()
+    headings.sort(key=lambda heading: heading[0])
+    return PageMetrics(
+        title="".join(title_pieces).strip() if title_pieces is not None else None,
+        meta=meta,
+        headings=[(f"H{level}", "".join(pieces).strip()) for level, pieces in headings],
+        text_chunks=tuple(text_chunks),
+        paragraph_count=paragraph_count,
+        links=[
+            {
+                "href": attrs.get("href"),
+                "text": collapse_whitespace("".join(pieces)),
+                "rel": attrs.get("rel", "").lower().split(),
+            }
+            for attrs, pieces in anchors
+        ],
+        images=images,
+        iframes=iframes,
+        videos=[video_entry(src, attrs) for src, attrs in player_videos]
+        + [video_entry(src, attrs) for src, attrs, _ in html5_videos],
+        canonical=canonical,
+    )